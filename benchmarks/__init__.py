@@ -0,0 +1,4 @@
+"""
+Benchmarks of the flashcards game. Run them from the root of the repository,
+for example: python -m benchmarks.server --help
+"""
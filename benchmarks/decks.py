@@ -0,0 +1,15 @@
+"""
+Decks played by the benchmarks
+"""
+from os import path
+
+
+def write_deck(directory: str, card_count: int) -> str:
+    """
+    :return: the path of a csv deck of card_count flashcards, written in directory
+    """
+    deck_path = path.join(directory, "deck.csv")
+    with open(deck_path, "w", encoding="utf-8") as deck:
+        for index in range(card_count):
+            deck.write(f"key {index},answer {index}\n")
+    return deck_path
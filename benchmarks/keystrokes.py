@@ -0,0 +1,264 @@
+"""
+Measure how long the curses ui takes to show the result of a keystroke.
+
+The game runs in a pseudo-terminal, and is played by a script: it reads the
+flashcard on the screen, types the answer one key at a time, sends it, and
+resizes the window now and then. The output of the game is fed to a terminal
+emulator, and an interaction is over when the screen shows its result: the
+typed character, the next flashcard, or the layout for the new size. The
+latency is the time from sending the key or resizing the terminal to reading
+the output which completed the update. A resize includes the delay the ui
+waits for the window to stop changing size before redrawing.
+"""
+import argparse
+import fcntl
+import os
+import pty
+import re
+import select
+import signal
+import struct
+import sys
+import tempfile
+import termios
+import time
+from collections import defaultdict
+from typing import Callable
+
+from benchmarks.decks import write_deck
+from benchmarks.terminal import Terminal
+
+# Give up on an interaction after this many seconds
+TIMEOUT = 10
+# After an update, the rest of the output is read until there is none for this
+# many seconds
+SETTLE_TIME = 0.02
+SIZES = ((24, 80), (40, 120))
+_KEY = re.compile(r"key (\d+)")
+
+
+def _set_size(terminal_fd: int, size: tuple[int, int]):
+    lines, columns = size
+    fcntl.ioctl(
+        terminal_fd, termios.TIOCSWINSZ, struct.pack("HHHH", lines, columns, 0, 0)
+    )
+
+
+class Session:
+    """
+    A game running in a pseudo-terminal, and the screen it shows
+    """
+
+    def __init__(self, deck_path: str, size: tuple[int, int]):
+        self.terminal = Terminal(*size)
+        self.pid, self._fd = pty.fork()
+        if not self.pid:
+            # The child: its standard streams are the pseudo-terminal
+            _set_size(0, size)
+            os.execve(
+                sys.executable,
+                [sys.executable, "-m", "flashcards", "--ui", "curses", deck_path],
+                dict(os.environ, TERM="xterm-256color", LANG="en"),
+            )
+
+    def close(self):
+        """
+        Stop the game
+        """
+        os.kill(self.pid, signal.SIGTERM)
+        os.waitpid(self.pid, 0)
+        os.close(self._fd)
+
+    def _read(self, timeout: float) -> int:
+        """
+        :return: the number of bytes read, 0 if there was no output in time
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return 0
+        try:
+            data = os.read(self._fd, 65536)
+        except OSError as error:
+            # The game is over, or it crashed
+            raise EOFError(self.screen()) from error
+        self.terminal.feed(data)
+        return len(data)
+
+    def screen(self) -> str:
+        """
+        :return: the text of the screen, for error messages
+        """
+        return "\n".join(
+            self.terminal.text(line) for line in range(self.terminal.lines)
+        )
+
+    def wait_for(self, condition: Callable[[], bool]) -> int:
+        """
+        Read the output until the condition holds, then until there is no more
+        :return: the number of bytes read
+        """
+        deadline = time.monotonic() + TIMEOUT
+        size = 0
+        while not condition():
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"The screen didn't update:\n{self.screen()}")
+            size += self._read(deadline - time.monotonic())
+        return size
+
+    def interact(
+        self, action: Callable[[], None], condition: Callable[[], bool]
+    ) -> tuple[float, int]:
+        """
+        Send a key or resize the terminal, and wait for the screen to update
+        :return: the seconds until the condition holds, and the bytes written
+        by the game
+        """
+        # Skip the output of the clock, which updates every second
+        while self._read(0):
+            pass
+        start = time.monotonic()
+        action()
+        size = self.wait_for(condition)
+        latency = time.monotonic() - start
+        while True:
+            read = self._read(SETTLE_TIME)
+            if not read:
+                break
+            size += read
+        return latency, size
+
+    def send(self, keys: bytes):
+        """
+        Type keys
+        """
+        os.write(self._fd, keys)
+
+    def resize(self, size: tuple[int, int]):
+        """
+        Resize the terminal: the kernel signals the game
+        """
+        self.terminal.resize(*size)
+        _set_size(self._fd, size)
+
+    def flashcard(self) -> int:
+        """
+        :return: the index of the flashcard on the screen, or -1
+        """
+        for line in range(self.terminal.lines):
+            match = _KEY.search(self.terminal.text(line))
+            if match:
+                return int(match.group(1))
+        return -1
+
+    def typed(self, text: str) -> bool:
+        """
+        :return: whether the text was typed, just before the cursor
+        """
+        line, column = self.terminal.cursor
+        return self.terminal.text(line)[column - len(text) : column] == text
+
+    def progress_at_bottom(self) -> bool:
+        """
+        :return: whether the status bar is on the last line
+        """
+        return " of " in self.terminal.text(self.terminal.lines - 1)
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+
+def play(
+    deck_path: str, cards: int, resize_every: int
+) -> dict[str, list[tuple[float, int]]]:
+    """
+    :return: the latencies and output sizes of each kind of interaction
+    """
+    results = defaultdict(list)
+    session = Session(deck_path, SIZES[0])
+    try:
+        start = time.monotonic()
+        session.wait_for(lambda: session.flashcard() >= 0)
+        results["start"].append((time.monotonic() - start, 0))
+        for played in range(cards):
+            card = session.flashcard()
+            # Miss one card out of four
+            answer = f"answer {card}" if played % 4 else "wrong"
+            for length in range(1, len(answer) + 1):
+                results["keystroke"].append(
+                    session.interact(
+                        lambda key=answer[length - 1]: session.send(key.encode()),
+                        lambda text=answer[:length]: session.typed(text),
+                    )
+                )
+            kind = "right guess" if played % 4 else "wrong guess"
+            results[kind].append(
+                session.interact(
+                    lambda: session.send(b"\n"),
+                    lambda previous=card: session.flashcard() not in (-1, previous),
+                )
+            )
+            if resize_every and played % resize_every == resize_every - 1:
+                size = SIZES[(played // resize_every + 1) % len(SIZES)]
+                results["resize"].append(
+                    session.interact(
+                        lambda size=size: session.resize(size),
+                        session.progress_at_bottom,
+                    )
+                )
+    finally:
+        session.close()
+    return results
+
+
+def main():
+    """
+    Print the latency percentiles and the output size of each kind of interaction
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.keystrokes",
+        description="Latency of the curses ui, from a keystroke to the update "
+        "of the screen",
+    )
+    parser.add_argument(
+        "--deck-size",
+        type=int,
+        default=10_000,
+        help="Number of flashcards of the deck. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--cards",
+        type=int,
+        default=40,
+        help="Flashcards to play. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--resize-every",
+        type=int,
+        default=5,
+        help="Resize the terminal after this many flashcards, 0 to never "
+        "resize. Default is %(default)s",
+    )
+    options = parser.parse_args()
+    if options.cards >= options.deck_size:
+        parser.error("--cards must be less than --deck-size")
+    with tempfile.TemporaryDirectory() as directory:
+        deck_path = write_deck(directory, options.deck_size)
+        results = play(deck_path, options.cards, options.resize_every)
+    print(
+        f"{'interaction':<12} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'bytes':>7}"
+    )
+    for kind, measures in results.items():
+        latencies = [latency * 1000 for latency, _ in measures]
+        size = sum(size for _, size in measures) / len(measures)
+        print(
+            f"{kind:<12} {len(measures):>6} {_percentile(latencies, 50):>8.1f} "
+            f"{_percentile(latencies, 90):>8.1f} {_percentile(latencies, 99):>8.1f} "
+            f"{max(latencies):>8.1f} {size:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
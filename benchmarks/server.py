@@ -0,0 +1,145 @@
+"""
+Measure the sessions per second of the pre-forked server against its number of
+workers, and the memory they use.
+
+A session connects, plays a few flashcards and disconnects. The clients run in
+their own processes: on a machine with few cpus, they compete with the workers.
+"""
+import argparse
+import multiprocessing
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.decks import write_deck
+
+
+def _play_sessions(port: int, cards: int, deadline: float) -> int:
+    """
+    :return: the number of sessions played before the deadline
+    """
+    sessions = 0
+    while time.monotonic() < deadline:
+        with socket.create_connection(("127.0.0.1", port)) as connection:
+            reader = connection.makefile("r", encoding="utf-8")
+            writer = connection.makefile("w", encoding="utf-8")
+            for _ in range(cards):
+                # The progress and the flashcard
+                reader.readline()
+                reader.readline()
+                writer.write("guess\n")
+                writer.flush()
+                # Right or wrong
+                reader.readline()
+        sessions += 1
+    return sessions
+
+
+def _memory_kib(pid: int) -> int:
+    """
+    :return: the proportional set size of a process and its children, which
+    counts the shared pages once in total rather than once per process
+    """
+    pids = [pid]
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as children:
+        pids += [int(child) for child in children.read().split()]
+    total = 0
+    for process in pids:
+        with open(f"/proc/{process}/smaps_rollup", encoding="utf-8") as smaps:
+            total += int(re.search(r"^Pss:\s+(\d+)", smaps.read(), re.M).group(1))
+    return total
+
+
+# pylint: disable=too-many-arguments
+def measure(
+    deck_path: str,
+    workers: int,
+    clients: int,
+    cards: int,
+    duration: float,
+    reuse_port: bool,
+) -> tuple[float, int]:
+    """
+    :return: the sessions per second, and the memory used by the server in KiB
+    """
+    command = [sys.executable, "-m", "flashcards", "serve", deck_path]
+    command += ["--port", "0", "--workers", str(workers)]
+    if reuse_port:
+        command.append("--reuse-port")
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as server:
+        try:
+            port = int(re.search(r":(\d+) ", server.stdout.readline()).group(1))
+            # Warm up: wait for every worker to be ready
+            _play_sessions(port, cards, time.monotonic() + 0.5)
+            deadline = time.monotonic() + duration
+            with multiprocessing.Pool(clients) as pool:
+                counts = pool.starmap(
+                    _play_sessions, [(port, cards, deadline)] * clients
+                )
+            memory = _memory_kib(server.pid)
+        finally:
+            server.terminate()
+    return sum(counts) / duration, memory
+
+
+def main():
+    """
+    Print the sessions per second and the memory for each number of workers
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.server",
+        description="Sessions per second of the server against its workers",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Numbers of workers to measure. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--clients",
+        type=int,
+        default=8,
+        help="Number of concurrent clients. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--deck-size",
+        type=int,
+        default=100_000,
+        help="Number of flashcards of the deck. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--cards",
+        type=int,
+        default=5,
+        help="Flashcards played per session. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=5,
+        help="Seconds to measure for each number of workers. Default is %(default)s",
+    )
+    parser.add_argument("--reuse-port", action="store_true")
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        deck_path = write_deck(directory, options.deck_size)
+        print(f"{'workers':>8} {'sessions/s':>11} {'memory MiB':>11}")
+        for workers in options.workers:
+            rate, memory = measure(
+                deck_path,
+                workers,
+                options.clients,
+                options.cards,
+                options.duration,
+                options.reuse_port,
+            )
+            print(f"{workers:>8} {rate:>11.0f} {memory / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+A minimal terminal emulator, keeping the text of the screen up to date from the
+output of a curses program.
+
+curses only sends what changed on the screen, with cursor moves in between: the
+text of the output stream can't be searched as it is. Only the sequences that
+ncurses sends to an xterm are understood. Colors and attributes are ignored,
+and other sequences are skipped.
+"""
+import codecs
+import re
+import unicodedata
+
+_SEQUENCE = re.compile(
+    # Control sequence: parameters and final byte
+    r"\x1b\[([?>=]?)([\d;]*)[ -/]*([@-~])"
+    # Operating system command
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"
+    # Character set designation, other escape sequences
+    r"|\x1b[()*+][\x20-\x7e]|\x1b([\x20-\x7e])"
+    # Control characters
+    r"|([\x00-\x1a\x1c-\x1f\x7f])"
+    # Text
+    r"|([^\x00-\x1f\x7f]+)"
+)
+# What may be the start of a sequence cut at the end of a chunk of output
+_INCOMPLETE = re.compile(r"\x1b(?:\[[?>=]?[\d;]*[ -/]*|\][^\x07\x1b]*|[()*+])?$")
+
+
+def _char_width(char: str) -> int:
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in "WF" else 1
+
+
+class Terminal:
+    """
+    The text of the screen of a terminal, and its cursor
+    """
+
+    def __init__(self, lines: int, columns: int):
+        self.lines, self.columns = lines, columns
+        self.rows = [[" "] * columns for _ in range(lines)]
+        self.cursor = (0, 0)
+        # The cursor is past the last column: the next character wraps
+        self._pending_wrap = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+
+    def resize(self, lines: int, columns: int):
+        """
+        Change the size of the screen, keeping what fits
+        """
+        rows = [[" "] * columns for _ in range(lines)]
+        for row, old_row in zip(rows, self.rows):
+            row[: min(columns, self.columns)] = old_row[:columns]
+        self.rows, self.lines, self.columns = rows, lines, columns
+        self._move(*self.cursor)
+
+    def text(self, line: int) -> str:
+        """
+        :return: the text of a line of the screen
+        """
+        return "".join(self.rows[line])
+
+    def find(self, text: str) -> tuple[int, int]:
+        """
+        :return: the line and column of the first occurrence of the text on the
+        screen, or (-1, -1)
+        """
+        for line in range(self.lines):
+            column = self.text(line).find(text)
+            if column >= 0:
+                return line, column
+        return -1, -1
+
+    def feed(self, data: bytes):
+        """
+        Update the screen with output of the program
+        """
+        text = self._pending + self._decoder.decode(data)
+        incomplete = _INCOMPLETE.search(text)
+        self._pending = text[incomplete.start() :] if incomplete else ""
+        if incomplete:
+            text = text[: incomplete.start()]
+        for match in _SEQUENCE.finditer(text):
+            private, parameters, final, escape, control, printable = match.groups()
+            if final:
+                self._control_sequence(private, parameters, final)
+            elif escape == "M":
+                # Reverse index
+                self._move(max(0, self.cursor[0] - 1), self.cursor[1])
+            elif control:
+                self._control(control)
+            elif printable:
+                self._print(printable)
+
+    def _move(self, line: int, column: int):
+        self.cursor = (
+            min(max(line, 0), self.lines - 1),
+            min(max(column, 0), self.columns - 1),
+        )
+        self._pending_wrap = False
+
+    def _line_feed(self):
+        line, column = self.cursor
+        if line == self.lines - 1:
+            del self.rows[0]
+            self.rows.append([" "] * self.columns)
+        self._move(line + 1, column)
+
+    def _control(self, char: str):
+        line, column = self.cursor
+        if char == "\r":
+            self._move(line, 0)
+        elif char in "\n\x0b\x0c":
+            self._line_feed()
+        elif char == "\b":
+            self._move(line, column - 1)
+        elif char == "\t":
+            self._move(line, (column // 8 + 1) * 8)
+
+    def _print(self, text: str):
+        for char in text:
+            width = _char_width(char)
+            if not width:
+                continue
+            if self._pending_wrap:
+                self._move(self.cursor[0], 0)
+                self._line_feed()
+            line, column = self.cursor
+            row = self.rows[line]
+            row[column] = char
+            if width == 2 and column + 1 < self.columns:
+                row[column + 1] = ""
+            if column + width >= self.columns:
+                self._pending_wrap = True
+            else:
+                self.cursor = (line, column + width)
+
+    def _erase(self, line: int, start: int, end: int):
+        self.rows[line][start:end] = [" "] * (end - start)
+
+    # pylint: disable=too-many-branches
+    def _control_sequence(self, private: str, parameters: str, final: str):
+        if private:
+            # Modes of the terminal
+            return
+        values = [int(value) if value else 0 for value in parameters.split(";")]
+        first = values[0] or 1
+        line, column = self.cursor
+        if final in "Hf":
+            self._move(first - 1, (values[1] if len(values) > 1 else 1) - 1)
+        elif final == "d":
+            self._move(first - 1, column)
+        elif final in "G`":
+            self._move(line, first - 1)
+        elif final == "A":
+            self._move(line - first, column)
+        elif final in "Be":
+            self._move(line + first, column)
+        elif final in "Ca":
+            self._move(line, column + first)
+        elif final == "D":
+            self._move(line, column - first)
+        elif final == "K":
+            start, end = {0: (column, self.columns), 1: (0, column + 1)}.get(
+                values[0], (0, self.columns)
+            )
+            self._erase(line, start, end)
+        elif final == "J":
+            if values[0] == 0:
+                self._erase(line, column, self.columns)
+                lines = range(line + 1, self.lines)
+            elif values[0] == 1:
+                self._erase(line, 0, column + 1)
+                lines = range(line)
+            else:
+                lines = range(self.lines)
+            for erased_line in lines:
+                self._erase(erased_line, 0, self.columns)
+        elif final == "X":
+            self._erase(line, column, min(column + first, self.columns))
+        elif final == "@":
+            row = self.rows[line]
+            row[column:column] = [" "] * first
+            del row[self.columns :]
+        elif final == "P":
+            row = self.rows[line]
+            del row[column : column + first]
+            row.extend([" "] * (self.columns - len(row)))
+        elif final == "b" and column > 0:
+            # Repeat the previous character
+            self._print(self.rows[line][column - 1] * first)
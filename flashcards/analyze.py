@@ -0,0 +1,234 @@
+"""
+Learning analytics over the recorded guesses
+"""
+import argparse
+import datetime
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from os import path
+
+from flashcards.history import EVENTS_FILE, History, load_history, numpy
+
+SECONDS_PER_DAY = 86400
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class CardStats:
+    """
+    How well a flashcard was guessed
+    """
+
+    card: str
+    reviews: int
+    accuracy: float
+
+
+@dataclass
+class DayStats:
+    """
+    How well the flashcards were guessed on a given day (UTC)
+    """
+
+    day: datetime.date
+    reviews: int
+    accuracy: float
+
+
+@dataclass
+class Report:
+    """
+    Summary of the recorded guesses
+    """
+
+    reviews: int
+    accuracy: float
+    latency_percentiles: dict[int, float]
+    days: list[DayStats]
+    hardest_cards: list[CardStats]
+
+
+def _day(day_number: int) -> datetime.date:
+    return datetime.date(1970, 1, 1) + datetime.timedelta(days=day_number)
+
+
+def _numpy_hardest_cards(
+    history: History, correct: "numpy.ndarray", top: int, min_reviews: int
+) -> list[CardStats]:
+    card_count = len(history.cards)
+    reviews = numpy.bincount(history.card, minlength=card_count)
+    correct_counts = numpy.bincount(history.card, weights=correct, minlength=card_count)
+    candidates = numpy.flatnonzero(reviews >= max(min_reviews, 1))
+    accuracies = correct_counts[candidates] / reviews[candidates]
+    # Lowest accuracy first, then the most reviewed cards first
+    hardest = candidates[numpy.lexsort((-reviews[candidates], accuracies))[:top]]
+    return [
+        CardStats(
+            card=history.cards[card_id],
+            reviews=int(reviews[card_id]),
+            accuracy=float(correct_counts[card_id] / reviews[card_id]),
+        )
+        for card_id in hardest
+    ]
+
+
+def _numpy_report(history: History, top: int, min_reviews: int) -> Report:
+    correct = history.correct.astype(numpy.float64)
+    day_numbers = (history.timestamp // SECONDS_PER_DAY).astype(numpy.int64)
+    days, day_index = numpy.unique(day_numbers, return_inverse=True)
+    day_reviews = numpy.bincount(day_index)
+    day_correct = numpy.bincount(day_index, weights=correct)
+
+    percentiles = numpy.percentile(history.latency, LATENCY_PERCENTILES)
+    return Report(
+        reviews=len(history),
+        accuracy=float(correct.mean()),
+        latency_percentiles={
+            percentile: float(value)
+            for percentile, value in zip(LATENCY_PERCENTILES, percentiles)
+        },
+        days=[
+            DayStats(
+                day=_day(int(day)),
+                reviews=int(day_reviews[index]),
+                accuracy=float(day_correct[index] / day_reviews[index]),
+            )
+            for index, day in enumerate(days)
+        ],
+        hardest_cards=_numpy_hardest_cards(history, correct, top, min_reviews),
+    )
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    # Linear interpolation between the closest ranks, like numpy.percentile
+    rank = (len(sorted_values) - 1) * percentile / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def _array_report(history: History, top: int, min_reviews: int) -> Report:
+    reviews = [0] * len(history.cards)
+    correct_counts = [0] * len(history.cards)
+    for card_id, correct in zip(history.card, history.correct):
+        reviews[card_id] += 1
+        correct_counts[card_id] += correct
+
+    day_reviews = defaultdict(int)
+    day_correct = defaultdict(int)
+    for timestamp, correct in zip(history.timestamp, history.correct):
+        day_number = int(timestamp // SECONDS_PER_DAY)
+        day_reviews[day_number] += 1
+        day_correct[day_number] += correct
+
+    candidates = [
+        card_id
+        for card_id, card_reviews in enumerate(reviews)
+        if card_reviews >= max(min_reviews, 1)
+    ]
+    hardest = sorted(
+        candidates,
+        key=lambda card_id: (
+            correct_counts[card_id] / reviews[card_id],
+            -reviews[card_id],
+        ),
+    )[:top]
+    latencies = sorted(history.latency)
+    return Report(
+        reviews=len(history),
+        accuracy=sum(correct_counts) / len(history),
+        latency_percentiles={
+            percentile: _percentile(latencies, percentile)
+            for percentile in LATENCY_PERCENTILES
+        },
+        days=[
+            DayStats(
+                day=_day(day_number),
+                reviews=day_reviews[day_number],
+                accuracy=day_correct[day_number] / day_reviews[day_number],
+            )
+            for day_number in sorted(day_reviews)
+        ],
+        hardest_cards=[
+            CardStats(
+                card=history.cards[card_id],
+                reviews=reviews[card_id],
+                accuracy=correct_counts[card_id] / reviews[card_id],
+            )
+            for card_id in hardest
+        ],
+    )
+
+
+def analyze(history: History, top: int = 10, min_reviews: int = 1) -> Report:
+    """
+    :param history: the recorded guesses. Must contain at least one guess.
+    :param top: how many of the hardest cards to include in the report
+    :param min_reviews: ignore cards reviewed fewer times than this when looking
+    for the hardest cards
+    :return: a summary of the recorded guesses
+    """
+    if numpy is not None and isinstance(history.card, numpy.ndarray):
+        return _numpy_report(history, top, min_reviews)
+    return _array_report(history, top, min_reviews)
+
+
+def format_report(report: Report) -> str:
+    """
+    :return: a text version of the report, for the console
+    """
+    lines = [
+        f"Reviews: {report.reviews}, accuracy: {report.accuracy:.1%}",
+        "Latency: "
+        + ", ".join(
+            f"p{percentile} {value:.2f}s"
+            for percentile, value in report.latency_percentiles.items()
+        ),
+        "",
+        "Accuracy by day (UTC):",
+    ]
+    lines += [
+        f"  {day.day.isoformat()}  {day.reviews:>8}  {day.accuracy:>7.1%}"
+        for day in report.days
+    ]
+    lines += ["", "Hardest cards:"]
+    lines += [
+        f"  {card.accuracy:>7.1%}  {card.reviews:>8}  {card.card}"
+        for card in report.hardest_cards
+    ]
+    return "\n".join(lines)
+
+
+def main(args: list[str]):
+    """
+    Entry point of the analyze command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards analyze", description="Analyze the recorded guesses"
+    )
+    parser.add_argument(
+        "history", metavar="history_dir", help="Path to the history directory"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of hardest cards to show. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--min-reviews",
+        type=int,
+        default=1,
+        help="Ignore cards reviewed fewer times when looking for the hardest "
+        "cards. Default is %(default)s",
+    )
+    options = parser.parse_args(args)
+    if not path.exists(path.join(options.history, EVENTS_FILE)):
+        parser.error(f"No history found in {options.history}")
+    history = load_history(options.history)
+    if len(history) == 0:
+        parser.exit(message="No guesses recorded\n")
+    print(format_report(analyze(history, options.top, options.min_reviews)))
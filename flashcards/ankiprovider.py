@@ -0,0 +1,303 @@
+"""
+Read and write Anki packages.
+
+An .apkg file is a zip archive holding the collection, a sqlite database, and
+the media of the notes. sqlite can't read a database from inside a zip file:
+the collection alone is streamed to a temporary file, then its notes are read
+with a cursor, one at a time. The media are never extracted. Exporting works
+the other way around: the notes are written to a temporary collection, which
+is then streamed into the archive.
+"""
+import hashlib
+import html
+import json
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import weakref
+import zipfile
+from os import path
+from typing import Iterable, Iterator, Optional
+
+from flashcards.sqliteprovider import SqliteFlashcardProvider, write_sqlite_deck
+
+# The collection of the packages exported by Anki 2.1, and by older versions
+_COLLECTIONS = ("collection.anki21", "collection.anki2")
+# The collection of recent Anki versions, compressed with zstd
+_COMPRESSED_COLLECTION = "collection.anki21b"
+_FIELD_SEPARATOR = "\x1f"
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+_TAG = re.compile(r"<[^>]*>")
+_LINE_BREAK = re.compile(r"<br\s*/?>|<div>|</div>", re.IGNORECASE)
+_SOUND = re.compile(r"\[sound:[^\]]*\]")
+_SPACES = re.compile(r"\s+")
+
+COLLECTION_SCHEMA = """
+CREATE TABLE col (
+    id INTEGER PRIMARY KEY, crt INTEGER NOT NULL, mod INTEGER NOT NULL,
+    scm INTEGER NOT NULL, ver INTEGER NOT NULL, dty INTEGER NOT NULL,
+    usn INTEGER NOT NULL, ls INTEGER NOT NULL, conf TEXT NOT NULL,
+    models TEXT NOT NULL, decks TEXT NOT NULL, dconf TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE TABLE notes (
+    id INTEGER PRIMARY KEY, guid TEXT NOT NULL, mid INTEGER NOT NULL,
+    mod INTEGER NOT NULL, usn INTEGER NOT NULL, tags TEXT NOT NULL,
+    flds TEXT NOT NULL, sfld INTEGER NOT NULL, csum INTEGER NOT NULL,
+    flags INTEGER NOT NULL, data TEXT NOT NULL
+);
+CREATE TABLE cards (
+    id INTEGER PRIMARY KEY, nid INTEGER NOT NULL, did INTEGER NOT NULL,
+    ord INTEGER NOT NULL, mod INTEGER NOT NULL, usn INTEGER NOT NULL,
+    type INTEGER NOT NULL, queue INTEGER NOT NULL, due INTEGER NOT NULL,
+    ivl INTEGER NOT NULL, factor INTEGER NOT NULL, reps INTEGER NOT NULL,
+    lapses INTEGER NOT NULL, left INTEGER NOT NULL, odue INTEGER NOT NULL,
+    odid INTEGER NOT NULL, flags INTEGER NOT NULL, data TEXT NOT NULL
+);
+CREATE TABLE revlog (
+    id INTEGER PRIMARY KEY, cid INTEGER NOT NULL, usn INTEGER NOT NULL,
+    ease INTEGER NOT NULL, ivl INTEGER NOT NULL, lastIvl INTEGER NOT NULL,
+    factor INTEGER NOT NULL, time INTEGER NOT NULL, type INTEGER NOT NULL
+);
+CREATE TABLE graves (
+    usn INTEGER NOT NULL, oid INTEGER NOT NULL, type INTEGER NOT NULL
+);
+CREATE INDEX ix_notes_usn ON notes (usn);
+CREATE INDEX ix_cards_usn ON cards (usn);
+CREATE INDEX ix_revlog_usn ON revlog (usn);
+CREATE INDEX ix_cards_nid ON cards (nid);
+CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+CREATE INDEX ix_revlog_cid ON revlog (cid);
+CREATE INDEX ix_notes_csum ON notes (csum);
+"""
+
+
+def html_to_text(field: str) -> str:
+    """
+    :return: the text of an Anki field, without its html markup and sounds
+    """
+    field = _LINE_BREAK.sub(" ", field)
+    field = _SOUND.sub("", _TAG.sub("", field))
+    return _SPACES.sub(" ", html.unescape(field)).strip()
+
+
+def _extract_collection(archive: zipfile.ZipFile, directory: str) -> str:
+    names = set(archive.namelist())
+    for name in _COLLECTIONS:
+        if name in names:
+            break
+    else:
+        if _COMPRESSED_COLLECTION in names:
+            raise ValueError(
+                "The collection is compressed: export the deck from Anki with "
+                '"Support older Anki versions" checked'
+            )
+        raise ValueError("No Anki collection in the package")
+    collection_path = path.join(directory, "collection.db")
+    with archive.open(name) as member, open(collection_path, "wb") as collection:
+        shutil.copyfileobj(member, collection, _COPY_BUFFER_SIZE)
+    return collection_path
+
+
+def read_apkg_deck(apkg_path: str) -> Iterator[tuple[str, str]]:
+    """
+    :return: the key and answer of each card of an Anki package: the first and
+    second fields of the notes, in the order they were added
+    :raise ValueError: if the file isn't an Anki package that can be read
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            with zipfile.ZipFile(apkg_path) as archive:
+                collection_path = _extract_collection(archive, directory)
+        except zipfile.BadZipFile as error:
+            raise ValueError(f"Not an Anki package: {error}") from error
+        connection = sqlite3.connect(collection_path)
+        try:
+            for (fields,) in connection.execute("SELECT flds FROM notes ORDER BY id"):
+                fields = fields.split(_FIELD_SEPARATOR)
+                if len(fields) >= 2:
+                    yield html_to_text(fields[0]), html_to_text(fields[1])
+        finally:
+            connection.close()
+
+
+def _checksum(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _guid(text: str) -> str:
+    # Stable across exports, so that Anki updates the notes imported before
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+
+def _collection_config(deck_name: str, model_id: int, deck_id: int, now: int):
+    model = {
+        "id": model_id,
+        "name": "Basic (flashcards)",
+        "type": 0,
+        "mod": now,
+        "usn": -1,
+        "sortf": 0,
+        "did": deck_id,
+        "tmpls": [
+            {
+                "name": "Card 1",
+                "ord": 0,
+                "qfmt": "{{Front}}",
+                "afmt": "{{FrontSide}}<hr id=answer>{{Back}}",
+                "bqfmt": "",
+                "bafmt": "",
+                "did": None,
+            }
+        ],
+        "flds": [
+            {
+                "name": name,
+                "ord": ordinal,
+                "sticky": False,
+                "rtl": False,
+                "font": "Arial",
+                "size": 20,
+                "media": [],
+            }
+            for ordinal, name in enumerate(("Front", "Back"))
+        ],
+        "css": ".card { font-family: arial; font-size: 20px; text-align: center; }",
+        "latexPre": "",
+        "latexPost": "",
+        "tags": [],
+        "vers": [],
+        "req": [[0, "all", [0]]],
+    }
+    deck = {
+        "id": deck_id,
+        "name": deck_name,
+        "desc": "",
+        "mod": now,
+        "usn": -1,
+        "collapsed": False,
+        "newToday": [0, 0],
+        "revToday": [0, 0],
+        "lrnToday": [0, 0],
+        "timeToday": [0, 0],
+        "dyn": 0,
+        "conf": 1,
+        "extendNew": 10,
+        "extendRev": 50,
+    }
+    default_deck = dict(deck, id=1, name="Default")
+    deck_config = {
+        "id": 1,
+        "name": "Default",
+        "mod": 0,
+        "usn": 0,
+        "maxTaken": 60,
+        "autoplay": True,
+        "timer": 0,
+        "replayq": True,
+        "dyn": False,
+        "new": {
+            "delays": [1, 10],
+            "ints": [1, 4, 7],
+            "initialFactor": 2500,
+            "order": 1,
+            "perDay": 20,
+        },
+        "rev": {"perDay": 200, "ease4": 1.3, "ivlFct": 1, "maxIvl": 36500},
+        "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8},
+    }
+    return (
+        json.dumps({"nextPos": 1, "curDeck": deck_id, "curModel": model_id}),
+        json.dumps({str(model_id): model}),
+        json.dumps({"1": default_deck, str(deck_id): deck}),
+        json.dumps({"1": deck_config}),
+    )
+
+
+def write_apkg_deck(
+    apkg_path: str,
+    cards: Iterable[tuple[str, str]],
+    deck_name: Optional[str] = None,
+):
+    """
+    Write flashcards to an Anki package, as notes of a basic note type with a
+    Front and a Back field
+    :param deck_name: the name of the deck in Anki. Default is the file name.
+    """
+    deck_name = deck_name or path.splitext(path.basename(apkg_path))[0]
+    now = int(time.time())
+    # Anki's ids are timestamps in milliseconds
+    first_id = now * 1000
+    model_id, deck_id = first_id, first_id + 1
+    with tempfile.TemporaryDirectory() as directory:
+        collection_path = path.join(directory, "collection.anki2")
+        with sqlite3.connect(collection_path) as connection:
+            connection.executescript(COLLECTION_SCHEMA)
+            conf, models, decks, dconf = _collection_config(
+                deck_name, model_id, deck_id, now
+            )
+            connection.execute(
+                "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+                (now, now * 1000, now * 1000, conf, models, decks, dconf),
+            )
+            connection.executemany(
+                "INSERT INTO notes VALUES (?, ?, ?, ?, -1, '', ?, ?, ?, 0, '')",
+                (
+                    (
+                        first_id + index,
+                        _guid(key),
+                        model_id,
+                        now,
+                        html.escape(key, quote=False)
+                        + _FIELD_SEPARATOR
+                        + html.escape(answer, quote=False),
+                        key,
+                        _checksum(key),
+                    )
+                    for index, (key, answer) in enumerate(cards, start=2)
+                ),
+            )
+            # One new card per note, in the order of the notes
+            connection.execute(
+                "INSERT INTO cards SELECT id, id, ?, 0, ?, -1, 0, 0,"
+                " row_number() OVER (ORDER BY id), 0, 0, 0, 0, 0, 0, 0, 0, ''"
+                " FROM notes",
+                (deck_id, now),
+            )
+        connection.close()
+        with zipfile.ZipFile(apkg_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(collection_path, "collection.anki2")
+            archive.writestr("media", "{}")
+
+
+class AnkiFlashcardProvider(SqliteFlashcardProvider):
+    """
+    Provide flashcards from an Anki package.
+
+    The notes are streamed to a temporary flashcards database, which is then
+    read on demand like any sqlite deck.
+    """
+
+    def __init__(self, apkg_path: str):
+        directory = tempfile.mkdtemp()
+        # Removed when the provider is closed or garbage collected, or at exit
+        self._remove_directory = weakref.finalize(
+            self, shutil.rmtree, directory, ignore_errors=True
+        )
+        database_path = path.join(directory, "deck.db")
+        try:
+            write_sqlite_deck(database_path, read_apkg_deck(apkg_path))
+            super().__init__(database_path)
+        except BaseException:
+            self._remove_directory()
+            raise
+
+    def close(self):
+        """
+        Close the temporary database, and remove it
+        """
+        super().close()
+        self._remove_directory()
@@ -0,0 +1,104 @@
+"""
+Convert flashcards between the supported file formats
+"""
+import argparse
+import csv
+from os import path
+from typing import Callable, Iterable, Iterator, Optional
+
+from flashcards.ankiprovider import read_apkg_deck, write_apkg_deck
+from flashcards.extensions import APKG_EXTENSIONS, SQLITE_EXTENSIONS
+from flashcards.sqliteprovider import read_sqlite_deck, write_sqlite_deck
+
+Cards = Iterable[tuple[str, str]]
+Tags = dict[str, list[str]]
+
+
+def read_csv_deck(
+    csv_path: str, tags: Optional[Tags] = None
+) -> Iterator[tuple[str, str]]:
+    """
+    :param tags: if given, filled with the tags of each card before the card
+    is returned
+    :return: the key and answer of each card of a csv file
+    """
+    with open(csv_path, encoding="utf-8", newline="") as csv_file:
+        for row in csv.reader(csv_file):
+            if tags is not None and len(row) > 2:
+                tags[row[0]] = [tag for tag in row[2:] if tag]
+            yield row[0], row[1]
+
+
+def write_csv_deck(csv_path: str, cards: Cards, tags: Optional[Tags] = None):
+    """
+    Write flashcards to a csv file
+    :param tags: the tags of the cards, written in the columns after the answer
+    """
+    if tags is None:
+        tags = {}
+    with open(csv_path, "w", encoding="utf-8", newline="") as csv_file:
+        csv.writer(csv_file).writerows(
+            (key, answer, *tags.get(key, ())) for key, answer in cards
+        )
+
+
+READERS: dict[str, Callable[[str], Cards]] = {".csv": read_csv_deck}
+READERS.update({extension: read_sqlite_deck for extension in SQLITE_EXTENSIONS})
+WRITERS: dict[str, Callable[[str, Cards], None]] = {".csv": write_csv_deck}
+WRITERS.update({extension: write_sqlite_deck for extension in SQLITE_EXTENSIONS})
+READERS.update({extension: read_apkg_deck for extension in APKG_EXTENSIONS})
+WRITERS.update({extension: write_apkg_deck for extension in APKG_EXTENSIONS})
+# The formats keeping the tags of the cards. The deck of the cards of a sqlite
+# database is read as one of their tags.
+TAG_FORMATS = (".csv",) + SQLITE_EXTENSIONS
+
+
+def convert(input_path: str, output_path: str, deck: Optional[str] = None):
+    """
+    Convert a file of flashcards to another format. The formats are deduced from
+    the file extensions. The cards are streamed from one file to the other, with
+    their tags if both formats have tags.
+    :param deck: the deck or chapter of the cards, written to a sqlite database
+    """
+    input_extension = path.splitext(input_path)[1].lower()
+    output_extension = path.splitext(output_path)[1].lower()
+    reader_options, writer_options = {}, {}
+    if input_extension in TAG_FORMATS and output_extension in TAG_FORMATS:
+        # Filled by the reader as the cards are read
+        reader_options["tags"] = writer_options["tags"] = {}
+    if output_extension in SQLITE_EXTENSIONS:
+        writer_options["deck"] = deck
+    reader = READERS[input_extension]
+    writer = WRITERS[output_extension]
+    writer(output_path, reader(input_path, **reader_options), **writer_options)
+
+
+def main(args: list[str]):
+    """
+    Entry point of the convert command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards convert",
+        description="Convert flashcards between formats. "
+        f"Supported file extensions: {', '.join(READERS)}",
+    )
+    parser.add_argument("input", help="Path to the file to convert")
+    parser.add_argument("output", help="Path to the converted file")
+    parser.add_argument(
+        "--deck",
+        help="Deck or chapter of the flashcards, for a sqlite database. Games "
+        "filter on it like on a tag",
+    )
+    options = parser.parse_args(args)
+    if (
+        options.deck
+        and path.splitext(options.output)[1].lower() not in SQLITE_EXTENSIONS
+    ):
+        parser.error("--deck is only supported for sqlite databases")
+    for file_path, formats in ((options.input, READERS), (options.output, WRITERS)):
+        if path.splitext(file_path)[1].lower() not in formats:
+            parser.error(f"Unsupported file format: {file_path}")
+    try:
+        convert(options.input, options.output, options.deck)
+    except ValueError as error:
+        parser.error(str(error))
@@ -2,11 +2,15 @@
 Read flashcards from a csv file
 """
 import csv
+import io
+import os
+from collections import Counter
+from typing import Optional
 
-from flashcards.provider import FlashcardProvider
+from flashcards.provider import DeckChanges, FlashcardProvider
+from flashcards.tags import TagIndex
 
 
-# pylint: disable=too-few-public-methods
 class CsvFlashcardProvider(FlashcardProvider):
     """
     Provide flashcards from a csv file
@@ -14,9 +18,130 @@ class CsvFlashcardProvider(FlashcardProvider):
 
     def __init__(self, file):
         self.cards = {}
+        tags = {}
         with file as csvfile:
             reader = csv.reader(csvfile)
-            self.cards = {row[0]: row[1] for row in reader}
+            for row in reader:
+                self.cards[row[0]] = row[1]
+                # Any column after the answer is a tag
+                if len(row) > 2:
+                    tags[row[0]] = [tag for tag in row[2:] if tag]
+        self._tag_index = TagIndex(list(self.cards), tags) if tags else None
 
     def flashcards(self) -> dict[str, str]:
         return self.cards
+
+    def tag_index(self) -> Optional[TagIndex]:
+        return self._tag_index
+
+
+class WatchingCsvFlashcardProvider(CsvFlashcardProvider):
+    """
+    Provide flashcards from a csv file, and pick up the changes made to the file
+    while the game is running.
+
+    The file is polled with a stat call. When it changed, only the rows which
+    were added or removed since the previous poll are parsed.
+    """
+
+    def __init__(self, file):
+        self._path = file.name
+        self._encoding = file.encoding
+        self._signature = self._stat_signature()
+        with file:
+            text = file.read()
+        super().__init__(io.StringIO(text))
+        self._lines = Counter(text.splitlines())
+        # The answers of the rows of each key
+        self._key_answers: dict[str, Counter] = {}
+        for row in csv.reader(self._lines.elements()):
+            if len(row) >= 2:
+                self._key_answers.setdefault(row[0], Counter())[row[1]] += 1
+
+    def flashcards(self) -> dict[str, str]:
+        # The engine plays its own copy, and applies the changes to it
+        return dict(self.cards)
+
+    def _stat_signature(self) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            # The file may be briefly missing while an editor replaces it.
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def poll_changes(self) -> Optional[DeckChanges]:
+        signature = self._stat_signature()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        with open(self._path, encoding=self._encoding, newline="") as csvfile:
+            text = csvfile.read()
+        lines = Counter(text.splitlines())
+        added_lines = lines - self._lines
+        removed_lines = self._lines - lines
+        self._lines = lines
+
+        if any(line.count('"') % 2 for line in added_lines + removed_lines):
+            # A quoted field spans several lines: the changed lines can't be
+            # parsed on their own.
+            return self._reload(text)
+
+        changed_keys = set()
+        for row in csv.reader(removed_lines.elements()):
+            if len(row) >= 2:
+                self._key_answers[row[0]][row[1]] -= 1
+                changed_keys.add(row[0])
+        for row in csv.reader(added_lines.elements()):
+            if len(row) >= 2:
+                self._key_answers.setdefault(row[0], Counter())[row[1]] += 1
+                changed_keys.add(row[0])
+        for key in changed_keys:
+            # Drop the answers of the removed rows
+            self._key_answers[key] = +self._key_answers[key]
+            if len(self._key_answers[key]) > 1:
+                # The key is on rows with different answers: the last row wins,
+                # and the order of the rows is only in the file
+                return self._reload(text)
+        return self._update_cards(changed_keys)
+
+    def _update_cards(self, keys: set[str]) -> DeckChanges:
+        """
+        Set the keys to the answer of their rows left, or remove them
+        :return: the changes made to the flashcards
+        """
+        changes = DeckChanges()
+        for key in keys:
+            answers = self._key_answers[key]
+            if not answers:
+                del self._key_answers[key]
+                if key in self.cards:
+                    changes.removed.add(key)
+                    del self.cards[key]
+                continue
+            answer = next(iter(answers))
+            if key not in self.cards:
+                changes.added[key] = answer
+            elif self.cards[key] != answer:
+                changes.updated[key] = answer
+            self.cards[key] = answer
+        return changes
+
+    def _reload(self, text: str) -> DeckChanges:
+        cards = {}
+        self._key_answers = {}
+        for row in csv.reader(io.StringIO(text)):
+            if len(row) >= 2:
+                cards[row[0]] = row[1]
+                self._key_answers.setdefault(row[0], Counter())[row[1]] += 1
+        changes = DeckChanges(
+            added={key: cards[key] for key in cards.keys() - self.cards.keys()},
+            updated={
+                key: cards[key]
+                for key in cards.keys() & self.cards.keys()
+                if cards[key] != self.cards[key]
+            },
+            removed=self.cards.keys() - cards.keys(),
+        )
+        self.cards = cards
+        return changes
@@ -2,24 +2,34 @@
 Curses-based console user interface
 """
 import curses
+import math
+from curses.ascii import BEL
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Mapping, Optional
 
-from flashcards.cursesui.safe_curses import (
-    safe_curses_curs_set,
-    safe_curses_endwin,
-    safe_curses_nocbreak,
-)
+from flashcards.cursesui.eventloop import EventLoop, Timer
+from flashcards.cursesui.screen import CursesScreen, Screen
 from flashcards.cursesui.widgets import (
     Background,
     Label,
     Card,
+    Choices,
     Input,
     InputBorder,
     StatusBar,
+    text_width,
 )
+from flashcards.hints import AnswerIndex
 from flashcards.ui import Ui
 
+# Wait for the terminal to stop changing size before redrawing
+RESIZE_REDRAW_DELAY = 0.1
+CLOCK_INTERVAL = 1
+# Tab completes the guess with the answers of the deck. With candidates, the
+# answers starting with the guess are also shown under it as it's typed.
+HINT_MODES = ("prefix", "candidates")
+CANDIDATES_SHOWN = 5
+
 
 @dataclass
 class Palette:
@@ -32,22 +42,22 @@ class Palette:
     statusbar_color: int
     input_color: int
 
-    def __init__(self):
-        curses.start_color()
-        if curses.has_colors():
+    def __init__(self, screen: Screen):
+        screen.start_color()
+        if screen.has_colors():
             white = curses.COLOR_WHITE
             gray = curses.COLOR_BLACK
-            if curses.COLORS >= 16:
+            if screen.colors >= 16:
                 white += 8
                 gray += 8
-            curses.init_pair(1, white, curses.COLOR_BLUE)
-            curses.init_pair(2, curses.COLOR_BLACK, white)
-            curses.init_pair(3, white, gray)
-            curses.init_pair(4, white, curses.COLOR_BLACK)
-        self.default_color = curses.color_pair(1)
-        self.card_color = curses.color_pair(2)
-        self.statusbar_color = curses.color_pair(3)
-        self.input_color = curses.color_pair(4)
+            screen.init_pair(1, white, curses.COLOR_BLUE)
+            screen.init_pair(2, curses.COLOR_BLACK, white)
+            screen.init_pair(3, white, gray)
+            screen.init_pair(4, white, curses.COLOR_BLACK)
+        self.default_color = screen.color_pair(1)
+        self.card_color = screen.color_pair(2)
+        self.statusbar_color = screen.color_pair(3)
+        self.input_color = screen.color_pair(4)
 
 
 # pylint: disable=too-few-public-methods,too-many-instance-attributes
@@ -57,50 +67,65 @@ class Widgets:
     Collection of the different widgets used in the app
     """
 
-    def __init__(self, key_input_callback: KeyInputCallback):
-        # pylint: disable=no-member
-        root_window = curses.initscr()
-        palette = Palette()
-        self.main = Background(root_window, color_pair=palette.default_color)
+    def __init__(
+        self,
+        key_input_callback: KeyInputCallback,
+        screen: Screen,
+        event_loop: EventLoop,
+        hints: bool = False,
+    ):
+        """
+        :param hints: whether to show hints under the input
+        """
+        palette = Palette(screen)
+        self.main = Background(screen, color_pair=palette.default_color)
         self.guess_result = Label(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.default_color,
             offset_y=lambda lines: lines // 2 - 8,
         )
         self.statusbar = StatusBar(
-            parent_win=root_window,
+            screen=screen,
             background_color_pair=palette.default_color,
             status_bar_color_pair=palette.statusbar_color,
         )
         self.card_bkgd = Card(
-            parent_win=root_window,
+            screen=screen,
             background_color_pair=palette.default_color,
             card_color_pair=palette.card_color,
         )
         self.card_text = Label(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.card_color,
             offset_y=lambda lines: lines // 2 - 3,
         )
         self.input_label = Label(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.default_color,
             color_attrs=curses.A_BLINK,
             offset_y=lambda lines: lines // 2 + 3,
         )
         self.input = Input(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.default_color,
             input_color_pair=palette.input_color,
             callback=key_input_callback,
+            event_loop=event_loop,
         )
         self.input_border = InputBorder(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.default_color,
             input_color_pair=palette.input_color,
         )
+        self.hints = Label(
+            screen=screen,
+            color_pair=palette.default_color,
+            color_attrs=curses.A_NORMAL,
+            offset_y=lambda lines: lines // 2 + 4,
+        )
+        self.choices = Choices(screen=screen, color_pair=palette.default_color)
         self.score = Label(
-            parent_win=root_window,
+            screen=screen,
             color_pair=palette.default_color,
             color_attrs=curses.A_UNDERLINE,
             offset_y=lambda lines: lines // 2 + 6,
@@ -112,31 +137,122 @@ class Widgets:
             self.input_label,
             self.input_border,
             self.input,
+            self.choices,
             self.score,
             self.card_bkgd,
             self.card_text,
         ]
+        if hints:
+            self.all.append(self.hints)
 
 
 Translator = Callable[[str], str]
 
 
+def _format_duration(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}:{seconds:02}"
+
+
 class CursesUi(Ui):
     """
     Interact with the user in the flashcard game, in a console using curses
     """
 
-    def __init__(self, translations: Translator):
+    def __init__(
+        self,
+        translations: Translator,
+        screen: Optional[Screen] = None,
+        time_limit: Optional[float] = None,
+        hints: Optional[str] = None,
+    ):
+        """
+        :param time_limit: the time allowed to answer each flashcard, in seconds
+        :param hints: one of HINT_MODES, to help typing the answers
+        """
         self._ = translations
-        self._widgets = Widgets(self._on_key_input)
-        curses.noecho()
+        self._screen = screen or CursesScreen()
+        self._event_loop = EventLoop(self._screen)
+        self._widgets = Widgets(
+            self._on_key_input, self._screen, self._event_loop, hints=bool(hints)
+        )
+        self._screen.noecho()
+        self._time_limit = time_limit
+        self._game_start = self._screen.monotonic()
+        self._deadline: Optional[float] = None
+        self._redraw_timer: Optional[Timer] = None
+        self._clock_timer: Optional[Timer] = None
+        self._hints = hints
+        self._answer_index: Optional[AnswerIndex] = None
+        self._start_clock()
 
     # Ignore invalid name for ch (we're reusing the existing name from the curses module)
     # pylint: disable=invalid-name
     def _on_key_input(self, ch):
         if ch == curses.KEY_RESIZE:
-            for win in self._widgets.all:
-                win.redraw()
+            # Resizing a terminal sends many events: only redraw after the last
+            if self._redraw_timer:
+                self._redraw_timer.cancel()
+            self._redraw_timer = self._event_loop.call_later(
+                RESIZE_REDRAW_DELAY, self._redraw
+            )
+
+    def _redraw(self):
+        self._redraw_timer = None
+        for win in self._widgets.all:
+            win.redraw()
+
+    def _start_clock(self):
+        """
+        (Re)start the clock of the status bar, so that it ticks in step with
+        the game or with the countdown of the flashcard
+        """
+        if self._clock_timer:
+            self._clock_timer.cancel()
+        self._update_clock()
+        self._clock_timer = self._event_loop.call_every(
+            CLOCK_INTERVAL, self._update_clock
+        )
+
+    def _update_clock(self):
+        now = self._screen.monotonic()
+        if self._deadline is None:
+            # The time played so far
+            seconds = int(now - self._game_start)
+        else:
+            # The time left to answer
+            seconds = max(0, math.ceil(self._deadline - now))
+        self._widgets.statusbar.set_clock(_format_duration(seconds))
+        # Refreshing the bar left the cursor on it
+        self._widgets.input.focus()
+
+    def _on_time_up(self):
+        # End the input, as if the user pressed ctrl-g
+        self._event_loop.post_key(BEL)
+
+    def _show_candidates(self, text: str):
+        if not text.strip():
+            self._widgets.hints.set_text("")
+            return
+        candidates = self._answer_index.candidates(text, CANDIDATES_SHOWN)
+        count = self._answer_index.count(text)
+        _, screen_cols = self._screen.stdscr.getmaxyx()
+        while True:
+            hint = "   ".join(candidates)
+            if len(candidates) < count:
+                hint += f"   +{count - len(candidates)}"
+            if not candidates or text_width(hint) < screen_cols:
+                break
+            candidates.pop()
+        self._widgets.hints.set_text(hint)
+
+    def prepare(self, flashcards: Mapping[str, str]):
+        if self._hints:
+            self._answer_index = AnswerIndex(flashcards.values())
+
+    def add_flashcards(self, flashcards: Mapping[str, str]):
+        if self._answer_index:
+            self._answer_index.add(flashcards.values())
 
     def display_flashcard(
         self, index: int, total: int, flashcard: str, max_key_length: int
@@ -162,10 +278,59 @@ class CursesUi(Ui):
         if input_width % 2 != 0:
             input_width += 1
         self._widgets.input_border.width = input_width
+        self._widgets.input_border.show()
         self._widgets.input_border.redraw()
         self._widgets.input.width = input_width
+        self._widgets.input.show()
         self._widgets.input.redraw(text="")
-        return self._widgets.input.wait_for_string()
+        return self._within_time_limit(self._wait_for_guess)
+
+    def _within_time_limit(self, wait: Callable[[], str]) -> str:
+        """
+        :return: what wait returns, once the user answered or the time is up
+        """
+        if not self._time_limit:
+            return wait()
+        self._deadline = self._screen.monotonic() + self._time_limit
+        time_up_timer = self._event_loop.call_later(self._time_limit, self._on_time_up)
+        self._start_clock()
+        try:
+            return wait()
+        finally:
+            time_up_timer.cancel()
+            self._deadline = None
+            self._start_clock()
+
+    def _wait_for_guess(self) -> str:
+        if not self._answer_index:
+            return self._widgets.input.wait_for_string()
+        try:
+            return self._widgets.input.wait_for_string(
+                complete=self._answer_index.completion,
+                on_edit=self._show_candidates if self._hints == "candidates" else None,
+            )
+        finally:
+            self._widgets.hints.set_text("")
+
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        self._widgets.input.hide()
+        self._widgets.input_border.hide()
+        self._widgets.choices.set_choices(choices)
+        self._screen.curs_set(0)
+        try:
+            return self._within_time_limit(lambda: self._wait_for_choice(choices))
+        finally:
+            self._widgets.choices.set_choices([])
+            self._screen.curs_set(1)
+
+    def _wait_for_choice(self, choices: list[str]) -> str:
+        while True:
+            key = self._widgets.input.wait_for_key()
+            if key == chr(BEL):
+                # The time is up
+                return ""
+            if key.isdecimal() and 1 <= int(key) <= len(choices):
+                return choices[int(key) - 1]
 
     def input_replay_missed_cards(self) -> bool:
         self._widgets.input_label.set_text(text=self._("play_again"))
@@ -173,10 +338,10 @@ class CursesUi(Ui):
         self._widgets.input_border.hide()
         self._widgets.input_label.win.move(0, 0)
         self._widgets.input_label.redraw()
-        safe_curses_curs_set(0)
+        self._screen.curs_set(0)
         key = self._widgets.input.wait_for_key()
         do_replay = key.casefold() == self._("answer_yes").casefold()
-        safe_curses_curs_set(1)
+        self._screen.curs_set(1)
         self._widgets.score.hide()
         self._widgets.input_label.hide()
         self._widgets.guess_result.hide()
@@ -201,12 +366,10 @@ class CursesUi(Ui):
         )
 
     def game_over(self):
-        safe_curses_curs_set(0)
+        self._screen.curs_set(0)
         try:
             self._widgets.input.wait_for_key()
         except (KeyboardInterrupt, EOFError):
             pass
-        safe_curses_curs_set(1)
-        safe_curses_nocbreak()
-        curses.echo()
-        safe_curses_endwin()
+        self._screen.curs_set(1)
+        self._screen.end()
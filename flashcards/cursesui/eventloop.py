@@ -0,0 +1,119 @@
+"""
+Event loop of the curses ui, waiting for keys while running timers.
+
+Instead of blocking in getch, the loop sets the input timeout of the window to
+the time left before the next timer: timers run on time, in the same thread as
+the ui, without busy waiting.
+"""
+import curses
+import heapq
+import itertools
+import math
+from collections import deque
+from typing import Callable, Optional
+
+from flashcards.cursesui.screen import Screen
+
+
+# Ignore too few public methods: the event loop reads the attributes
+# pylint: disable=too-few-public-methods
+class Timer:
+    """
+    A callback scheduled by the event loop
+    """
+
+    def __init__(
+        self, when: float, callback: Callable[[], None], interval: Optional[float]
+    ):
+        self.when = when
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Don't run the callback anymore
+        """
+        self.cancelled = True
+
+
+class EventLoop:
+    """
+    Read keys from the windows of a screen, and run the timers which are due
+    in the meantime
+    """
+
+    def __init__(self, screen: Screen):
+        self._screen = screen
+        # Heap of (when, sequence, timer): the sequence keeps timers due at the
+        # same time in the order they were scheduled
+        self._timers = []
+        self._sequence = itertools.count()
+        self._posted_keys = deque()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """
+        Run a callback once, after delay seconds
+        """
+        return self._schedule(Timer(self._screen.monotonic() + delay, callback, None))
+
+    def call_every(self, interval: float, callback: Callable[[], None]) -> Timer:
+        """
+        Run a callback every interval seconds, until the timer is cancelled
+        """
+        return self._schedule(
+            Timer(self._screen.monotonic() + interval, callback, interval)
+        )
+
+    def _schedule(self, timer: Timer) -> Timer:
+        heapq.heappush(self._timers, (timer.when, next(self._sequence), timer))
+        return timer
+
+    # Ignore invalid name for ch (we're reusing the existing name from the curses module)
+    # pylint: disable=invalid-name
+    def post_key(self, ch: int):
+        """
+        Make the next read return this key, before the keys typed by the user.
+        This lets timers end an input.
+        """
+        self._posted_keys.append(ch)
+
+    def run_due_timers(self):
+        """
+        Run the callbacks of the timers which are due
+        """
+        now = self._screen.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            timer.callback()
+            if timer.interval and not timer.cancelled:
+                # If we're late, skip the runs we missed rather than catching up
+                timer.when += timer.interval
+                if timer.when <= now:
+                    timer.when = now + timer.interval
+                self._schedule(timer)
+
+    def _timeout_ms(self) -> int:
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if not self._timers:
+            return -1
+        delay = self._timers[0][0] - self._screen.monotonic()
+        return max(0, math.ceil(delay * 1000))
+
+    def getch(self, win) -> int:
+        """
+        :return: the next key typed in the window, running the timers which are
+        due while waiting for it
+        """
+        while True:
+            self.run_due_timers()
+            if self._posted_keys:
+                return self._posted_keys.popleft()
+            win.timeout(self._timeout_ms())
+            # pylint: disable=invalid-name
+            ch = win.getch()
+            if ch != curses.ERR:
+                return ch
@@ -0,0 +1,152 @@
+"""
+Access to the terminal screen used by the curses ui
+"""
+import abc
+import curses
+import time
+from curses.textpad import rectangle
+
+from flashcards.cursesui.safe_curses import (
+    safe_curses_curs_set,
+    safe_curses_endwin,
+    safe_curses_nocbreak,
+)
+
+
+class Screen(metaclass=abc.ABCMeta):
+    """
+    The screen which the widgets draw to: creates windows and wraps the
+    global curses functions.
+    """
+
+    stdscr = None
+
+    @abc.abstractmethod
+    def newwin(self, lines: int, cols: int):
+        """
+        :return: a new window of the given size, at the top left of the screen
+        """
+
+    @abc.abstractmethod
+    def start_color(self):
+        """
+        Initialize the colors
+        """
+
+    @abc.abstractmethod
+    def has_colors(self) -> bool:
+        """
+        :return: True if the terminal can display colors
+        """
+
+    @property
+    @abc.abstractmethod
+    def colors(self) -> int:
+        """
+        :return: the number of colors supported by the terminal
+        """
+
+    @abc.abstractmethod
+    def init_pair(self, pair_number: int, foreground: int, background: int):
+        """
+        Define a color pair
+        """
+
+    @abc.abstractmethod
+    def color_pair(self, pair_number: int) -> int:
+        """
+        :return: the attribute value to display text in the given color pair
+        """
+
+    @abc.abstractmethod
+    def curs_set(self, visibility: int):
+        """
+        Show or hide the cursor
+        """
+
+    @abc.abstractmethod
+    def noecho(self):
+        """
+        Stop echoing the typed characters
+        """
+
+    # Ignore invalid name for ch (we're reusing the existing name from the curses module)
+    # pylint: disable=invalid-name
+    @abc.abstractmethod
+    def ungetch(self, ch: int):
+        """
+        Push a key back onto the input queue
+        """
+
+    # Ignore too many arguments: they're the coordinates of the corners
+    # pylint: disable=too-many-arguments
+    @abc.abstractmethod
+    def rectangle(self, win, uly: int, ulx: int, lry: int, lrx: int):
+        """
+        Draw a rectangle in a window
+        """
+
+    @abc.abstractmethod
+    def monotonic(self) -> float:
+        """
+        :return: the time in seconds of the clock used to schedule timers
+        """
+
+    @abc.abstractmethod
+    def end(self):
+        """
+        Restore the terminal to its state before the game
+        """
+
+
+class CursesScreen(Screen):
+    """
+    The real terminal
+    """
+
+    def __init__(self):
+        # pylint: disable=no-member
+        self.stdscr = curses.initscr()
+
+    def newwin(self, lines: int, cols: int):
+        return curses.newwin(lines, cols)
+
+    def start_color(self):
+        curses.start_color()
+
+    def has_colors(self) -> bool:
+        return curses.has_colors()
+
+    @property
+    def colors(self) -> int:
+        # pylint: disable=no-member
+        return curses.COLORS
+
+    def init_pair(self, pair_number: int, foreground: int, background: int):
+        curses.init_pair(pair_number, foreground, background)
+
+    def color_pair(self, pair_number: int) -> int:
+        return curses.color_pair(pair_number)
+
+    def curs_set(self, visibility: int):
+        safe_curses_curs_set(visibility)
+
+    def noecho(self):
+        curses.noecho()
+
+    # Ignore invalid name for ch (we're reusing the existing name from the curses module)
+    # pylint: disable=invalid-name
+    def ungetch(self, ch: int):
+        curses.ungetch(ch)
+
+    # pylint: disable=too-many-arguments
+    def rectangle(self, win, uly: int, ulx: int, lry: int, lrx: int):
+        rectangle(win, uly, ulx, lry, lrx)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def end(self):
+        safe_curses_nocbreak()
+        curses.echo()
+        safe_curses_endwin()
@@ -4,6 +4,7 @@ Add some support for unicode to Textbox
 import curses
 from curses.ascii import isprint, iscntrl
 from curses.textpad import Textbox
+from typing import Callable, Optional
 
 from flashcards.cursesui.safe_curses import safe_win_addch
 
@@ -28,3 +29,29 @@ class UnicodeTextbox(Textbox):
 
     def gather(self) -> str:
         return self.win.instr(0, 0).decode("utf-8")
+
+    def edit(
+        self,
+        validate: Optional[Callable[[int], int]] = None,
+        getch: Optional[Callable[[], int]] = None,
+        on_edit: Optional[Callable[[], None]] = None,
+    ) -> str:
+        """
+        Like Textbox.edit, reading the keys with the given getch function
+        instead of blocking in the getch of the window
+        :param on_edit: called after each key is handled
+        """
+        getch = getch or self.win.getch
+        while True:
+            # pylint: disable=invalid-name
+            ch = getch()
+            if validate:
+                ch = validate(ch)
+            if not ch:
+                continue
+            if not self.do_command(ch):
+                break
+            if on_edit:
+                on_edit()
+            self.win.refresh()
+        return self.gather()
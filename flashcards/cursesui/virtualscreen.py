@@ -0,0 +1,547 @@
+"""
+In-memory screen, to run the curses ui without a terminal.
+
+Besides keeping the contents of the screen, it measures what a terminal would
+have to do to display the ui: the cells written, the calls to refresh, and an
+estimate of the bytes sent to the terminal (cursor moves, attribute changes and
+characters). The measures are grouped in frames: a frame is everything drawn
+between two reads of a key.
+
+Time is virtual too: it only passes during the pauses added to the input queue,
+so tests of timers don't have to wait.
+"""
+import curses
+from collections import deque
+from dataclasses import dataclass
+
+import unicodedata
+
+from flashcards.cursesui.screen import Screen
+
+_BLANK = (" ", 0)
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+# Content of the cell covered by the right half of a wide character
+_WIDE_CONTINUATION = ""
+
+_SGR_ATTRIBUTES = (
+    (curses.A_BOLD, "1"),
+    (curses.A_UNDERLINE, "4"),
+    (curses.A_BLINK, "5"),
+    (curses.A_REVERSE, "7"),
+)
+
+
+def _char_width(char: str) -> int:
+    return 2 if unicodedata.east_asian_width(char) == "W" else 1
+
+
+@dataclass
+class FrameStats:
+    """
+    The cost of drawing a frame
+    """
+
+    cells_written: int = 0
+    refreshes: int = 0
+    bytes_emitted: int = 0
+
+    def __add__(self, other: "FrameStats") -> "FrameStats":
+        return FrameStats(
+            cells_written=self.cells_written + other.cells_written,
+            refreshes=self.refreshes + other.refreshes,
+            bytes_emitted=self.bytes_emitted + other.bytes_emitted,
+        )
+
+
+class VirtualWindow:
+    """
+    In-memory implementation of the subset of the curses window api used by the
+    widgets. Like curses, errors are raised as curses.error.
+    """
+
+    # Ignore invalid names (we're reusing the existing names from the curses module)
+    # pylint: disable=invalid-name,too-many-instance-attributes,too-many-public-methods
+
+    def __init__(self, screen: "VirtualScreen", lines: int, cols: int):
+        self._screen = screen
+        self._lines = lines
+        self._cols = cols
+        self._begin_y = 0
+        self._begin_x = 0
+        self._y = 0
+        self._x = 0
+        self._background = _BLANK
+        self._cells = self._blank_rows(lines, cols)
+        self._delay = -1
+        self.clear_pending = False
+
+    def _blank_rows(self, lines: int, cols: int) -> list[list[tuple[str, int]]]:
+        return [[self._background] * cols for _ in range(lines)]
+
+    @property
+    def cells(self) -> list[list[tuple[str, int]]]:
+        """
+        :return: the (character, attributes) of each cell of the window
+        """
+        return self._cells
+
+    def getmaxyx(self) -> tuple[int, int]:
+        """
+        :return: the size of the window
+        """
+        return self._lines, self._cols
+
+    def getbegyx(self) -> tuple[int, int]:
+        """
+        :return: the position of the window on the screen
+        """
+        return self._begin_y, self._begin_x
+
+    def getyx(self) -> tuple[int, int]:
+        """
+        :return: the position of the cursor in the window
+        """
+        return self._y, self._x
+
+    def keypad(self, flag: bool):
+        """
+        Keypad mode is always on
+        """
+
+    def timeout(self, delay: int):
+        """
+        Set how long getch waits for a key, in milliseconds. -1 waits forever.
+        """
+        self._delay = delay
+
+    def nodelay(self, flag: bool):
+        """
+        Make getch return immediately if there is no key
+        """
+        self._delay = 0 if flag else -1
+
+    def getch(self) -> int:
+        """
+        :return: the next key of the screen's input queue
+        """
+        return self._screen.getch(self._delay)
+
+    def move(self, y: int, x: int):
+        """
+        Move the cursor
+        """
+        if not (0 <= y < self._lines and 0 <= x < self._cols):
+            raise curses.error("wmove() returned ERR")
+        self._y, self._x = y, x
+
+    def resize(self, lines: int, cols: int):
+        """
+        Resize the window, keeping the content which still fits
+        """
+        if lines <= 0 or cols <= 0:
+            raise curses.error("wresize() returned ERR")
+        rows = [
+            row[:cols] + [self._background] * (cols - len(row))
+            for row in self._cells[:lines]
+        ]
+        rows += self._blank_rows(lines - len(rows), cols)
+        self._cells = rows
+        self._lines, self._cols = lines, cols
+        self._y = min(self._y, lines - 1)
+        self._x = min(self._x, cols - 1)
+
+    def mvwin(self, y: int, x: int):
+        """
+        Move the window. The whole window must fit on the screen.
+        """
+        screen_lines, screen_cols = self._screen.stdscr.getmaxyx()
+        if (
+            y < 0
+            or x < 0
+            or y + self._lines > screen_lines
+            or x + self._cols > screen_cols
+        ):
+            raise curses.error("mvwin() returned ERR")
+        self._begin_y, self._begin_x = y, x
+
+    def bkgd(self, ch, attr: int = 0):
+        """
+        Set the background of the window, and apply it to the existing content
+        """
+        old_char, old_attr = self._background
+        background = (ch if isinstance(ch, str) else chr(ch), attr)
+        self._cells = [
+            [
+                background
+                if char == old_char and char_attr == old_attr
+                else (char, (char_attr & ~old_attr) | attr)
+                for char, char_attr in row
+            ]
+            for row in self._cells
+        ]
+        self._background = background
+
+    def erase(self):
+        """
+        Fill the window with its background
+        """
+        self._cells = self._blank_rows(self._lines, self._cols)
+        self._y = self._x = 0
+
+    def clear(self):
+        """
+        Like erase, but the whole screen is repainted on the next refresh
+        """
+        self.erase()
+        self.clear_pending = True
+
+    def clrtoeol(self):
+        """
+        Erase from the cursor to the end of the line
+        """
+        row = self._cells[self._y]
+        row[self._x :] = [self._background] * (self._cols - self._x)
+
+    def _put(self, char: str, attr: int):
+        if char == "\n":
+            self.clrtoeol()
+            if self._y + 1 >= self._lines:
+                raise curses.error("addch() returned ERR")
+            self._y, self._x = self._y + 1, 0
+            return
+        attr = attr or self._background[1]
+        width = _char_width(char)
+        if self._x + width > self._cols:
+            if self._y + 1 >= self._lines:
+                raise curses.error("addch() returned ERR")
+            self._y, self._x = self._y + 1, 0
+        row = self._cells[self._y]
+        row[self._x] = (char, attr)
+        if width == 2:
+            row[self._x + 1] = (_WIDE_CONTINUATION, attr)
+        self._x += width
+        if self._x >= self._cols:
+            if self._y + 1 >= self._lines:
+                # Like curses, writing to the bottom right corner is an error,
+                # even though the character is written.
+                self._x = self._cols - 1
+                raise curses.error("addch() returned ERR")
+            self._y, self._x = self._y + 1, 0
+
+    @staticmethod
+    def _split_args(args: tuple) -> tuple:
+        # Split the optional coordinates and attributes of addstr/addch
+        if len(args) in (3, 4):
+            return args[0], args[1], args[2], args[3] if len(args) == 4 else 0
+        return None, None, args[0], args[1] if len(args) == 2 else 0
+
+    def addstr(self, *args):
+        """
+        addstr([y, x,] text[, attr])
+        """
+        y, x, text, attr = self._split_args(args)
+        if y is not None:
+            self.move(y, x)
+        for char in text:
+            self._put(char, attr)
+
+    def addch(self, *args):
+        """
+        addch([y, x,] ch[, attr])
+        """
+        y, x, ch, attr = self._split_args(args)
+        if y is not None:
+            self.move(y, x)
+        self._put(ch if isinstance(ch, str) else chr(ch), attr)
+
+    def insch(self, ch, attr: int = 0):
+        """
+        Insert a character at the cursor, shifting the rest of the line right
+        """
+        row = self._cells[self._y]
+        char = ch if isinstance(ch, str) else chr(ch)
+        row.insert(self._x, (char, attr or self._background[1]))
+        row.pop()
+
+    def delch(self, *args):
+        """
+        delch([y, x]): delete the character at the cursor, shifting the rest of
+        the line left
+        """
+        if args:
+            self.move(*args)
+        row = self._cells[self._y]
+        del row[self._x]
+        row.append(self._background)
+
+    def inch(self, *args) -> int:
+        """
+        inch([y, x]): :return: the character and attributes at the cursor
+        """
+        if args:
+            self.move(*args)
+        char, attr = self._cells[self._y][self._x]
+        return ord(char or " ") | attr
+
+    def instr(self, *args) -> bytes:
+        """
+        instr([y, x]): :return: the text from the cursor to the end of the line
+        """
+        if args:
+            self.move(*args[:2])
+        text = "".join(char for char, _ in self._cells[self._y][self._x :])
+        return text.encode("utf-8")
+
+    def deleteln(self):
+        """
+        Delete the line at the cursor, shifting the following lines up
+        """
+        del self._cells[self._y]
+        self._cells += self._blank_rows(1, self._cols)
+
+    def insertln(self):
+        """
+        Insert a blank line at the cursor, shifting the following lines down
+        """
+        self._cells.insert(self._y, [self._background] * self._cols)
+        self._cells.pop()
+
+    def hline(self, y: int, x: int, ch: str, length: int):
+        """
+        Draw a horizontal line
+        """
+        for col in range(x, min(x + length, self._cols)):
+            self._cells[y][col] = (ch, self._background[1])
+
+    def vline(self, y: int, x: int, ch: str, length: int):
+        """
+        Draw a vertical line
+        """
+        for line in range(y, min(y + length, self._lines)):
+            self._cells[line][x] = (ch, self._background[1])
+
+    def box(self):
+        """
+        Draw a border around the window
+        """
+        self._screen.rectangle(self, 0, 0, self._lines - 1, self._cols - 1)
+
+    def refresh(self):
+        """
+        Copy the window to the screen
+        """
+        self._screen.refresh(self)
+
+
+class VirtualScreen(Screen):
+    """
+    In-memory screen, with a queue of keys to use as input
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+
+    def __init__(self, lines: int = 24, cols: int = 80):
+        self._lines = lines
+        self._cols = cols
+        self._keys = deque()
+        self._now = 0.0
+        self._pairs = {}
+        self._cursor_visible = True
+        # What the windows drew, and what the terminal would display
+        self._virtual = [[_BLANK] * cols for _ in range(lines)]
+        self._physical = [[_BLANK] * cols for _ in range(lines)]
+        self._repaint_pending = False
+        self._terminal_cursor = (0, 0)
+        self._terminal_attr = 0
+        self.frames = [FrameStats()]
+        self.stdscr = VirtualWindow(self, lines, cols)
+
+    def newwin(self, lines: int, cols: int) -> VirtualWindow:
+        return VirtualWindow(self, lines, cols)
+
+    def start_color(self):
+        pass
+
+    def has_colors(self) -> bool:
+        return True
+
+    @property
+    def colors(self) -> int:
+        return 256
+
+    def init_pair(self, pair_number: int, foreground: int, background: int):
+        self._pairs[pair_number] = (foreground, background)
+
+    def color_pair(self, pair_number: int) -> int:
+        return pair_number << 8
+
+    def curs_set(self, visibility: int):
+        self._cursor_visible = bool(visibility)
+
+    def noecho(self):
+        pass
+
+    # Ignore invalid name for ch (we're reusing the existing name from the curses module)
+    # pylint: disable=invalid-name
+    def ungetch(self, ch: int):
+        self._keys.appendleft(ch)
+
+    # pylint: disable=too-many-arguments
+    def rectangle(self, win, uly: int, ulx: int, lry: int, lrx: int):
+        win.vline(uly + 1, ulx, "│", lry - uly - 1)
+        win.hline(uly, ulx + 1, "─", lrx - ulx - 1)
+        win.hline(lry, ulx + 1, "─", lrx - ulx - 1)
+        win.vline(uly + 1, lrx, "│", lry - uly - 1)
+        win.addch(uly, ulx, "┌")
+        win.addch(uly, lrx, "┐")
+        try:
+            win.addch(lry, lrx, "┘")
+        except curses.error:
+            pass
+        win.addch(lry, ulx, "└")
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def end(self):
+        pass
+
+    def type_keys(self, keys):
+        """
+        Add keys at the end of the input queue
+        :param keys: a string, or key codes such as curses.KEY_RESIZE
+        """
+        for key in keys:
+            self._keys.append(ord(key) if isinstance(key, str) else key)
+
+    def pause(self, seconds: float):
+        """
+        Add a pause at the end of the input queue: the user types nothing
+        for this long
+        """
+        self._keys.append(float(seconds))
+
+    def getch(self, delay: int = -1) -> int:
+        """
+        Read the next key from the input queue, starting a new frame. The
+        virtual time passes during the pauses before the key.
+        :param delay: how long to wait for a key in milliseconds, -1 for ever
+        :return: the key, or curses.ERR if the delay ran out during a pause
+        :raise EOFError: if there are no more keys
+        """
+        self.frames.append(FrameStats())
+        while self._keys and isinstance(self._keys[0], float):
+            pause = self._keys[0]
+            if 0 <= delay / 1000 < pause:
+                self._now += delay / 1000
+                self._keys[0] = pause - delay / 1000
+                return curses.ERR
+            self._now += pause
+            self._keys.popleft()
+        if not self._keys:
+            raise EOFError("No more keys in the input queue")
+        return self._keys.popleft()
+
+    def resize(self, lines: int, cols: int):
+        """
+        Simulate the user resizing the terminal
+        """
+        self._lines, self._cols = lines, cols
+        self.stdscr.resize(lines, cols)
+        self._virtual = [
+            row[:cols] + [_BLANK] * (cols - len(row)) for row in self._virtual[:lines]
+        ]
+        self._virtual += [[_BLANK] * cols for _ in range(lines - len(self._virtual))]
+        # Like curses, repaint everything after a resize
+        self._repaint_pending = True
+        self._keys.append(curses.KEY_RESIZE)
+
+    def reset_stats(self):
+        """
+        Forget the frames drawn so far
+        """
+        self.frames = [FrameStats()]
+
+    def total_stats(self) -> FrameStats:
+        """
+        :return: the cost of all the frames drawn since the last reset
+        """
+        return sum(self.frames, FrameStats())
+
+    @property
+    def cursor(self) -> tuple[int, int]:
+        """
+        :return: the line and column of the cursor of the terminal
+        """
+        return self._terminal_cursor
+
+    def lines(self) -> list[str]:
+        """
+        :return: the text displayed on each line of the screen
+        """
+        return ["".join(char for char, _ in row) for row in self._physical]
+
+    def refresh(self, win: VirtualWindow):
+        """
+        Copy a window to the screen, and update the terminal where it differs
+        """
+        frame = self.frames[-1]
+        frame.refreshes += 1
+        begin_y, begin_x = win.getbegyx()
+        win_lines, win_cols = win.getmaxyx()
+        for y, row in enumerate(win.cells[: self._lines - begin_y]):
+            self._virtual[begin_y + y][begin_x : begin_x + win_cols] = row[
+                : self._cols - begin_x
+            ]
+
+        if win.clear_pending or self._repaint_pending:
+            win.clear_pending = self._repaint_pending = False
+            frame.bytes_emitted += len(_CLEAR_SCREEN)
+            self._physical = [[_BLANK] * self._cols for _ in range(self._lines)]
+            self._terminal_cursor = (0, 0)
+            self._terminal_attr = 0
+            self._update_terminal(0, self._lines, 0, self._cols)
+        else:
+            self._update_terminal(
+                begin_y, begin_y + win_lines, begin_x, begin_x + win_cols
+            )
+        if self._cursor_visible:
+            cursor_y, cursor_x = win.getyx()
+            self._move_terminal_cursor(begin_y + cursor_y, begin_x + cursor_x)
+
+    # pylint: disable=too-many-arguments
+    def _update_terminal(self, top: int, bottom: int, left: int, right: int):
+        frame = self.frames[-1]
+        for y in range(top, min(bottom, self._lines)):
+            virtual_row = self._virtual[y]
+            physical_row = self._physical[y]
+            for x in range(left, min(right, self._cols)):
+                cell = virtual_row[x]
+                if cell == physical_row[x]:
+                    continue
+                physical_row[x] = cell
+                char, attr = cell
+                if char == _WIDE_CONTINUATION:
+                    continue
+                self._move_terminal_cursor(y, x)
+                if attr != self._terminal_attr:
+                    frame.bytes_emitted += len(self._sgr(attr))
+                    self._terminal_attr = attr
+                frame.bytes_emitted += len(char.encode("utf-8"))
+                frame.cells_written += 1
+                self._terminal_cursor = (y, x + _char_width(char))
+
+    def _move_terminal_cursor(self, y: int, x: int):
+        if (y, x) != self._terminal_cursor:
+            self.frames[-1].bytes_emitted += len(f"\x1b[{y + 1};{x + 1}H")
+            self._terminal_cursor = (y, x)
+
+    def _sgr(self, attr: int) -> str:
+        # The escape sequence to select the attributes and colors
+        codes = ["0"] + [code for flag, code in _SGR_ATTRIBUTES if attr & flag]
+        pair = (attr & curses.A_COLOR) >> 8
+        if pair in self._pairs:
+            foreground, background = self._pairs[pair]
+            codes.append(str(30 + foreground if foreground < 8 else 82 + foreground))
+            codes.append(str(40 + background if background < 8 else 92 + background))
+        return f"\x1b[{';'.join(codes)}m"
@@ -6,26 +6,36 @@ hasn't been updated for over 1.5 years, and it has 145 open issues.
 """
 import abc
 import curses
-from curses.textpad import rectangle
-from typing import Callable
+from curses.ascii import TAB
+from typing import Callable, Optional
 
 import unicodedata
 
+from flashcards.cursesui.eventloop import EventLoop
+from flashcards.cursesui.screen import Screen
 from flashcards.cursesui.unicodetextbox import UnicodeTextbox
-from flashcards.cursesui.safe_curses import safe_win_addstr, safe_curses_curs_set
+from flashcards.cursesui.safe_curses import safe_win_addstr
 
 
-def _text_width(text: str) -> int:
+def text_width(text: str) -> int:
+    """
+    :return: the number of columns the text takes on the screen
+    """
     wide_char_count = sum([1 for ch in text if unicodedata.east_asian_width(ch) == "W"])
     return wide_char_count + len(text)
 
 
 class _BaseWidget:
     def __init__(
-        self, parent_win, color_pair: int, initial_lines: int = 1, initial_cols: int = 1
+        self,
+        screen: Screen,
+        color_pair: int,
+        initial_lines: int = 1,
+        initial_cols: int = 1,
     ):
-        self._parent_win = parent_win
-        self.win = curses.newwin(initial_lines, initial_cols)
+        self._screen = screen
+        self._parent_win = screen.stdscr
+        self.win = screen.newwin(initial_lines, initial_cols)
         self._visible = True
         self.color_pair = color_pair
 
@@ -56,7 +66,7 @@ class _BaseWidget:
         Hide the widget
         """
         self._visible = False
-        self.win.clear()
+        self.win.erase()
         self.win.bkgd(" ", self.color_pair)
         self.win.refresh()
 
@@ -66,10 +76,10 @@ class Background(_BaseWidget):
     Displays the background of the screen
     """
 
-    def __init__(self, parent_win, color_pair: int):
-        screen_lines, screen_cols = parent_win.getmaxyx()
+    def __init__(self, screen: Screen, color_pair: int):
+        screen_lines, screen_cols = screen.stdscr.getmaxyx()
         super().__init__(
-            parent_win=parent_win,
+            screen=screen,
             color_pair=color_pair,
             initial_lines=screen_lines,
             initial_cols=screen_cols,
@@ -92,12 +102,12 @@ class Label(_BaseWidget):
 
     def __init__(
         self,
-        parent_win,
+        screen: Screen,
         color_pair: int,
         offset_y: Callable[[int], int],
         color_attrs: int = curses.A_BOLD,
     ):
-        super().__init__(parent_win, color_pair)
+        super().__init__(screen, color_pair)
         self._offset_y = offset_y
         self._color_attrs = color_attrs
 
@@ -108,7 +118,7 @@ class Label(_BaseWidget):
         """
         self.show()
         screen_lines, screen_cols = self._parent_win.getmaxyx()
-        begin_x = (screen_cols - _text_width(text)) // 2
+        begin_x = (screen_cols - text_width(text)) // 2
         begin_y = self._offset_y(screen_lines)
 
         self.clear()
@@ -116,7 +126,7 @@ class Label(_BaseWidget):
         if not self._visible:
             return
 
-        self.win.resize(1, max(_text_width(text), 1))
+        self.win.resize(1, max(text_width(text), 1))
         self.win.mvwin(begin_y, begin_x)
         self.win.bkgd(" ", self.color_pair)
         safe_win_addstr(self.win, 0, 0, text, self.color_pair | self._color_attrs)
@@ -132,8 +142,10 @@ class Card(_BaseWidget):
     Displays the flashcard background
     """
 
-    def __init__(self, parent_win, background_color_pair: int, card_color_pair: int):
-        super().__init__(parent_win=parent_win, color_pair=background_color_pair)
+    def __init__(
+        self, screen: Screen, background_color_pair: int, card_color_pair: int
+    ):
+        super().__init__(screen=screen, color_pair=background_color_pair)
         self._card_color_pair = card_color_pair
         self.width = 0
 
@@ -155,11 +167,12 @@ class StatusBar(_BaseWidget):
     """
 
     def __init__(
-        self, parent_win, background_color_pair: int, status_bar_color_pair: int
+        self, screen: Screen, background_color_pair: int, status_bar_color_pair: int
     ):
-        super().__init__(parent_win=parent_win, color_pair=background_color_pair)
+        super().__init__(screen=screen, color_pair=background_color_pair)
         self._status_bar_color_pair = status_bar_color_pair
         self._text = ""
+        self._clock = ""
 
     def set_text(self, text: str):
         """
@@ -168,6 +181,15 @@ class StatusBar(_BaseWidget):
         self._text = text
         self.redraw()
 
+    def set_clock(self, clock: str):
+        """
+        Update the clock displayed on the left of the status bar
+        """
+        if clock == self._clock:
+            return
+        self._clock = clock
+        self.redraw()
+
     def redraw(self):
         """
         Redraw the widget
@@ -175,11 +197,19 @@ class StatusBar(_BaseWidget):
         if not self._visible:
             return
         screen_lines, screen_cols = self._parent_win.getmaxyx()
-        self.clear()
-        self.win.resize(1, screen_cols)
+        # The bar is redrawn every time the clock ticks: only clear it if
+        # it moves, so the unchanged cells aren't sent to the terminal again
+        if self.win.getbegyx() != (screen_lines - 1, 0) or self.win.getmaxyx() != (
+            1,
+            screen_cols,
+        ):
+            self.clear()
+            self.win.resize(1, screen_cols)
+            self.win.mvwin(screen_lines - 1, 0)
         self.win.bkgd(" ", self._status_bar_color_pair)
-        self.win.mvwin(screen_lines - 1, 0)
-        text_col_start = screen_cols - _text_width(self._text) - 1
+        self.win.erase()
+        safe_win_addstr(self.win, 0, 1, self._clock)
+        text_col_start = screen_cols - text_width(self._text) - 1
         safe_win_addstr(self.win, 0, text_col_start, self._text)
         self.win.refresh()
 
@@ -189,8 +219,8 @@ class InputBorder(_BaseWidget):
     Displays a border around the input field
     """
 
-    def __init__(self, parent_win, color_pair: int, input_color_pair: int):
-        super().__init__(parent_win=parent_win, color_pair=color_pair)
+    def __init__(self, screen: Screen, color_pair: int, input_color_pair: int):
+        super().__init__(screen=screen, color_pair=color_pair)
         self._input_color_pair = input_color_pair
         self.width = 0
 
@@ -204,7 +234,43 @@ class InputBorder(_BaseWidget):
         self.win.resize(3, self.width + 3)
         self.win.bkgd(" ", self._input_color_pair)
         self.win.mvwin(begin_y - 1, begin_x - 1)
-        rectangle(self.win, 0, 0, 2, self.width + 1)
+        self._screen.rectangle(self.win, 0, 0, 2, self.width + 1)
+        self.win.refresh()
+
+
+class Choices(_BaseWidget):
+    """
+    Displays the numbered answers to choose from
+    """
+
+    def __init__(self, screen: Screen, color_pair: int):
+        super().__init__(screen=screen, color_pair=color_pair)
+        self._lines: list[str] = []
+
+    def set_choices(self, choices: list[str]):
+        """
+        Display the choices, or hide the widget if there are none
+        """
+        self._lines = [
+            f"{number}  {choice}" for number, choice in enumerate(choices, 1)
+        ]
+        if not self._lines:
+            self.hide()
+            return
+        self.show()
+        self.redraw()
+
+    def redraw(self):
+        if not self._visible or not self._lines:
+            return
+        screen_lines, screen_cols = self._parent_win.getmaxyx()
+        width = min(max(map(text_width, self._lines)) + 1, screen_cols)
+        self.clear()
+        self.win.resize(len(self._lines), width)
+        self.win.bkgd(" ", self.color_pair)
+        self.win.mvwin(screen_lines // 2 + 1, (screen_cols - width) // 2)
+        for line, text in enumerate(self._lines):
+            safe_win_addstr(self.win, line, 0, text, self.color_pair | curses.A_BOLD)
         self.win.refresh()
 
 
@@ -213,16 +279,20 @@ class Input(_BaseWidget):
     Displays the input field
     """
 
+    # Ignore too many arguments: the input needs its colors and where to send keys
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
-        parent_win,
+        screen: Screen,
         color_pair: int,
         input_color_pair: int,
         callback: Callable[[int], None],
+        event_loop: EventLoop,
     ):
-        super().__init__(parent_win=parent_win, color_pair=color_pair)
+        super().__init__(screen=screen, color_pair=color_pair)
         self._input_color_pair = input_color_pair
         self._callback = callback
+        self._event_loop = event_loop
         self.width = 0
 
     def redraw(self, text: str = None):
@@ -230,7 +300,7 @@ class Input(_BaseWidget):
             return
         if text is None:
             text = self.win.instr(0, 0).decode("utf-8").strip()
-        self.win.clear()
+        self.win.erase()
         screen_lines, screen_cols = self._parent_win.getmaxyx()
         begin_x = (screen_cols - self.width) // 2
         begin_y = screen_lines // 2 + 2
@@ -242,7 +312,7 @@ class Input(_BaseWidget):
         self.win.mvwin(begin_y, begin_x)
         self.win.move(0, 0)
         safe_win_addstr(self.win, 0, 0, text)
-        safe_curses_curs_set(1)
+        self._screen.curs_set(1)
         self.win.refresh()
 
     # Ignore invalid name for ch (we're reusing the existing name from the curses module)
@@ -253,12 +323,53 @@ class Input(_BaseWidget):
             return curses.KEY_BACKSPACE
         return ch
 
-    def wait_for_string(self) -> str:
+    def _text_before_cursor(self) -> str:
+        cursor_y, cursor_x = self.win.getyx()
+        text = self.win.instr(0, 0).decode("utf-8")
+        self.win.move(cursor_y, cursor_x)
+        width = 0
+        for index, char in enumerate(text):
+            if width >= cursor_x:
+                return text[:index]
+            width += text_width(char)
+        return text
+
+    def wait_for_string(
+        self,
+        complete: Optional[Callable[[str], str]] = None,
+        on_edit: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
+        :param complete: called with the text before the cursor when the user
+        presses tab, returns the text to insert
+        :param on_edit: called with the text before the cursor after each key
         :return: the string input by the user
         """
         text_box = UnicodeTextbox(self.win, length=self.width)
-        return text_box.edit(validate=self._input_validator)
+
+        # pylint: disable=invalid-name
+        def validate(ch):
+            ch = self._input_validator(ch)
+            if ch == TAB and complete:
+                for char in complete(self._text_before_cursor()):
+                    text_box.do_command(ord(char))
+            return ch
+
+        def edited():
+            on_edit(self._text_before_cursor())
+
+        return text_box.edit(
+            validate=validate,
+            getch=lambda: self._event_loop.getch(self.win),
+            on_edit=edited if on_edit else None,
+        )
+
+    def focus(self):
+        """
+        Put the cursor back in the input field
+        """
+        if self._visible:
+            self.win.refresh()
 
     def wait_for_key(self) -> str:
         """
@@ -267,7 +378,7 @@ class Input(_BaseWidget):
         while True:
             # Ignore invalid name for ch (we're reusing the existing name from the curses module)
             # pylint: disable=invalid-name
-            ch = self.win.getch()
+            ch = self._event_loop.getch(self.win)
             self._callback(ch)
             if ch > 0 and ch != curses.KEY_RESIZE:
                 return chr(ch)
@@ -0,0 +1,256 @@
+"""
+Keep decks loaded in memory, so that games start without parsing them.
+
+The daemon listens on a unix socket. A game sends it the path of its deck: the
+daemon packs the flashcards in a memory file, the first time or when the deck
+changed, and sends the file descriptor back over the socket. The game maps the
+file, and plays the flashcards straight from the memory of the daemon, without
+parsing or copying them.
+
+When the decks take more memory than the cap, the least recently used ones are
+dropped. A game which mapped a dropped deck keeps it until it's over.
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import path
+
+from flashcards.convert import READERS
+from flashcards.daemonclient import (
+    SOCKET_ENVIRONMENT_VARIABLE,
+    WARM_EXTENSIONS,
+    default_socket_path,
+)
+from flashcards.shareddeck import SharedDeck
+
+DEFAULT_MEMORY_CAP_MIB = 512
+
+
+def _signature(deck_path: str) -> tuple[int, int, int]:
+    stat = os.stat(deck_path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _memory_file() -> int:
+    if hasattr(os, "memfd_create"):
+        return os.memfd_create("flashcards-deck", os.MFD_CLOEXEC)
+    # Where there are no memory files, a temporary file without a name
+    with tempfile.TemporaryFile() as file:
+        return os.dup(file.fileno())
+
+
+@dataclass
+class WarmDeck:
+    """
+    A deck packed in a memory file
+    """
+
+    signature: tuple[int, int, int]
+    memory_fd: int
+    size: int
+    max_lengths: tuple[int, int]
+
+
+def load_warm_deck(deck_path: str) -> WarmDeck:
+    """
+    Read a deck, and pack it in a memory file
+    :raise OSError, ValueError: if the deck can't be read
+    """
+    signature = _signature(deck_path)
+    reader = READERS[path.splitext(deck_path)[1].lower()]
+    try:
+        cards = dict(reader(deck_path))
+    except (IndexError, UnicodeDecodeError) as error:
+        raise ValueError(f"Invalid deck {deck_path}: {error}") from error
+    max_lengths = (
+        max(map(len, cards.keys()), default=0),
+        max(map(len, cards.values()), default=0),
+    )
+    deck_fd = _memory_file()
+    with open(os.dup(deck_fd), "wb") as file:
+        SharedDeck(cards).write(file)
+    return WarmDeck(signature, deck_fd, os.fstat(deck_fd).st_size, max_lengths)
+
+
+class DeckCache:
+    """
+    The decks loaded so far, the least recently used first
+    """
+
+    def __init__(self, memory_cap: int):
+        """
+        :param memory_cap: how many bytes the packed decks may take
+        """
+        self._memory_cap = memory_cap
+        self._decks: OrderedDict[str, WarmDeck] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def paths(self) -> list[str]:
+        """
+        :return: the paths of the decks in memory, the least recently used first
+        """
+        with self._lock:
+            return list(self._decks)
+
+    @property
+    def size(self) -> int:
+        """
+        :return: how many bytes the decks in memory take
+        """
+        return self._size
+
+    def open(self, deck_path: str) -> tuple[int, tuple[int, int]]:
+        """
+        Load a deck, unless it's in memory and the file didn't change since
+        :return: a new file descriptor of the memory file of the deck, to be
+        closed by the caller, and the length of its longest key and answer
+        :raise OSError, ValueError: if the deck can't be read
+        """
+        deck_path = path.abspath(deck_path)
+        signature = _signature(deck_path)
+        with self._lock:
+            deck = self._decks.get(deck_path)
+            if deck and deck.signature == signature:
+                self._decks.move_to_end(deck_path)
+                return os.dup(deck.memory_fd), deck.max_lengths
+        # Other games get their decks while this one loads
+        deck = load_warm_deck(deck_path)
+        deck_fd = os.dup(deck.memory_fd)
+        with self._lock:
+            self._add(deck_path, deck)
+        return deck_fd, deck.max_lengths
+
+    def _add(self, deck_path: str, deck: WarmDeck):
+        self._remove(deck_path)
+        if deck.size > self._memory_cap:
+            os.close(deck.memory_fd)
+            return
+        self._decks[deck_path] = deck
+        self._size += deck.size
+        while self._size > self._memory_cap:
+            self._remove(next(iter(self._decks)))
+
+    def _remove(self, deck_path: str):
+        deck = self._decks.pop(deck_path, None)
+        if deck:
+            self._size -= deck.size
+            os.close(deck.memory_fd)
+
+    def close(self):
+        """
+        Drop all the decks
+        """
+        with self._lock:
+            for deck_path in list(self._decks):
+                self._remove(deck_path)
+
+
+class _DeckRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # The client went away without asking for a deck
+            return
+        try:
+            request = json.loads(line)
+            deck_fd, max_lengths = self.server.cache.open(request["path"])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            reply = json.dumps({"error": str(error)}).encode() + b"\n"
+            # The client may have gone away already
+            with contextlib.suppress(OSError):
+                self.wfile.write(reply)
+            return
+        try:
+            reply = json.dumps({"max_lengths": max_lengths}).encode() + b"\n"
+            with contextlib.suppress(OSError):
+                socket.send_fds(self.request, [reply], [deck_fd])
+        finally:
+            os.close(deck_fd)
+
+
+class DeckDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Send the decks kept in memory to the games, over a unix socket
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, memory_cap: int):
+        self.cache = DeckCache(memory_cap)
+        super().__init__(socket_path, _DeckRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.cache.close()
+
+
+def _is_running(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def main(args: list[str]):
+    """
+    Entry point of the daemon command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards daemon",
+        description="Keep the decks played recently in memory, so that the next "
+        "games start without loading them. Games use the daemon when it's "
+        f"running, for {', '.join(WARM_EXTENSIONS)} decks played without --watch "
+        "or --filter",
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Path of the unix socket to listen on. Games find it in the "
+        f"{SOCKET_ENVIRONMENT_VARIABLE} environment variable, or at its default "
+        "path: %(default)s",
+    )
+    parser.add_argument(
+        "--memory-cap",
+        metavar="MiB",
+        type=int,
+        default=DEFAULT_MEMORY_CAP_MIB,
+        help="Memory the decks may take, in MiB. Default is %(default)s",
+    )
+    options = parser.parse_args(args)
+    socket_directory = path.dirname(path.abspath(options.socket))
+    if not path.isdir(socket_directory):
+        # The private directory of the default path
+        os.mkdir(socket_directory, 0o700)
+    elif os.stat(socket_directory).st_uid not in (os.getuid(), 0):
+        # Its owner could replace the socket
+        parser.error(f"{socket_directory} belongs to another user")
+    if _is_running(options.socket):
+        parser.error(f"A daemon is already listening on {options.socket}")
+    with contextlib.suppress(FileNotFoundError):
+        # Left by a daemon which didn't exit cleanly
+        os.unlink(options.socket)
+    # Only the user may connect, and read their decks
+    os.umask(0o077)
+    daemon = DeckDaemon(options.socket, options.memory_cap * 1024 * 1024)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Keeping decks warm on {options.socket}", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+        os.unlink(options.socket)
@@ -0,0 +1,88 @@
+"""
+Get the decks kept in memory by the daemon.
+
+Games import this module, rather than the daemon itself, so that they start
+without importing the readers of every deck format.
+"""
+import json
+import mmap
+import os
+import socket
+import struct
+from os import path
+from typing import Optional
+
+from flashcards.extensions import APKG_EXTENSIONS
+from flashcards.shareddeck import SharedDeck, SharedDeckProvider
+
+# sqlite decks are read on demand already
+WARM_EXTENSIONS = (".csv",) + APKG_EXTENSIONS
+SOCKET_ENVIRONMENT_VARIABLE = "FLASHCARDS_DAEMON_SOCKET"
+# Give up on the daemon, and load the deck without it, after this many seconds
+CLIENT_TIMEOUT = 60
+_REPLY_SIZE = 4096
+
+
+def default_socket_path() -> str:
+    """
+    :return: the path of the socket of the daemon of the current user
+    """
+    socket_path = os.environ.get(SOCKET_ENVIRONMENT_VARIABLE)
+    if socket_path:
+        return socket_path
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if directory:
+        return path.join(directory, f"flashcards-{os.getuid()}.sock")
+    # pylint: disable=import-outside-toplevel
+    # Only needed without a runtime directory: tempfile is slow to import
+    import tempfile
+
+    # Other users can create files in the temporary directory: the socket goes
+    # in a directory only the user can access, which the daemon creates
+    return path.join(tempfile.gettempdir(), f"flashcards-{os.getuid()}", "daemon.sock")
+
+
+def _is_own_process(connection: socket.socket) -> bool:
+    """
+    :return: whether the process at the other end of the connection runs as
+    the current user, or True where the system can't tell
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid == os.getuid()
+
+
+def fetch_deck(
+    deck_path: str, socket_path: Optional[str] = None
+) -> Optional[SharedDeckProvider]:
+    """
+    Get a deck from the daemon
+    :return: the flashcards of the deck, mapped from the memory of the daemon,
+    or None if the daemon isn't running or can't read the deck
+    """
+    request = json.dumps({"path": path.abspath(deck_path)}).encode() + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(CLIENT_TIMEOUT)
+            connection.connect(socket_path or default_socket_path())
+            if not _is_own_process(connection):
+                # Someone else is listening on the path: don't play their deck
+                return None
+            connection.sendall(request)
+            reply, fds, _, _ = socket.recv_fds(connection, _REPLY_SIZE, 1)
+    except OSError:
+        return None
+    if not fds:
+        return None
+    try:
+        buffer = mmap.mmap(fds[0], 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fds[0])
+    max_key_length, max_answer_length = json.loads(reply)["max_lengths"]
+    return SharedDeckProvider(
+        SharedDeck.from_buffer(buffer), (max_key_length, max_answer_length)
+    )
@@ -0,0 +1,205 @@
+"""
+Decide the order in which the flashcards of a deck are played
+"""
+import abc
+import random
+from typing import Iterable, Optional, Sequence
+
+from flashcards.fenwick import FenwickTree
+
+
+class Dealer(metaclass=abc.ABCMeta):
+    """
+    Deal the flashcards of a deck, one at a time
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """
+        :return: the number of flashcards dealt in this round, including the ones
+        already played
+        """
+
+    @abc.abstractmethod
+    def next_key(self) -> Optional[str]:
+        """
+        :return: the key of the next flashcard to play, or None if the round is over
+        """
+
+    def add(self, key: str):
+        """
+        Add a flashcard to the cards which haven't been dealt yet
+        """
+
+    def remove(self, key: str):
+        """
+        Remove a flashcard from the cards which haven't been dealt yet
+        """
+
+    def answered(self, key: str, correct: bool):
+        """
+        Called after the user guessed a flashcard
+        :param correct: whether the guess was correct
+        """
+
+
+class ShuffledDealer(Dealer):
+    """
+    Deal every flashcard once, in a random order
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self._keys = list(keys)
+        random.shuffle(self._keys)
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def next_key(self) -> Optional[str]:
+        if self._position >= len(self._keys):
+            return None
+        key = self._keys[self._position]
+        self._position += 1
+        return key
+
+    def add(self, key: str):
+        # Insert the card somewhere in the rest of the deck, leaving the order of
+        # the other cards untouched.
+        self._keys.insert(random.randint(self._position, len(self._keys)), key)
+
+    def remove(self, key: str):
+        try:
+            index = self._keys.index(key, self._position)
+        except ValueError:
+            return
+        del self._keys[index]
+
+
+# Ignore too few public methods: it's indexed like a sequence
+# pylint: disable=too-few-public-methods
+class RandomPermutation:
+    """
+    Pseudo-random permutation of range(size), computed one element at a time
+    without storing it.
+
+    A small Feistel network shuffles the bits of the index within the smallest
+    even number of bits covering size, and values outside the range are skipped
+    by applying it again ("cycle walking").
+    """
+
+    _ROUNDS = 4
+
+    def __init__(self, size: int):
+        self._size = size
+        self._half_bits = max((size - 1).bit_length() + 1, 2) // 2
+        self._mask = (1 << self._half_bits) - 1
+        self._round_keys = [random.getrandbits(64) for _ in range(self._ROUNDS)]
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ (hash((right, round_key)) & self._mask)
+        return (left << self._half_bits) | right
+
+    def __getitem__(self, index: int) -> int:
+        value = self._encrypt(index)
+        while value >= self._size:
+            value = self._encrypt(value)
+        return value
+
+
+class PermutationDealer(Dealer):
+    """
+    Deal every flashcard of a sequence once, in a random order, without copying
+    or shuffling the sequence. Only the keys dealt are read: a deck shared
+    between processes isn't copied by each process dealing it.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self._keys = keys
+        self._permutation = RandomPermutation(len(keys))
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def next_key(self) -> Optional[str]:
+        if self._position >= len(self._keys):
+            return None
+        key = self._keys[self._permutation[self._position]]
+        self._position += 1
+        return key
+
+
+class WeightedDealer(Dealer):
+    """
+    Deal flashcards at random, in proportion to weights which increase when the
+    user misses a card and decrease when they get it right. Cards can be dealt
+    several times, but never twice in a row.
+
+    The weights are kept in a Fenwick tree, so that both picking a card and
+    updating its weight take O(log n).
+    """
+
+    # Weights are powers of 2, to keep them integers
+    INITIAL_LEVEL = 4
+    MAX_LEVEL = 10
+    WRONG_GUESS_LEVELS = 2
+    RIGHT_GUESS_LEVELS = -1
+
+    def __init__(self, keys: Iterable[str], rounds: Optional[int] = None):
+        """
+        :param rounds: how many cards to deal. Default is the number of cards.
+        """
+        self._keys = list(keys)
+        self._indexes = {key: index for index, key in enumerate(self._keys)}
+        self._levels = [self.INITIAL_LEVEL] * len(self._keys)
+        self._weights = FenwickTree([1 << self.INITIAL_LEVEL] * len(self._keys))
+        self._rounds = len(self._keys) if rounds is None else rounds
+        self._dealt = 0
+        self._previous = None
+
+    def __len__(self) -> int:
+        return self._rounds
+
+    def next_key(self) -> Optional[str]:
+        if self._dealt >= self._rounds:
+            return None
+        # Leave out the previous card while picking the next one
+        previous_weight = 0
+        if self._previous is not None:
+            previous_weight = self._weights[self._previous]
+            self._weights[self._previous] = 0
+        total = self._weights.total
+        index = self._weights.find(random.randrange(total)) if total else None
+        if self._previous is not None:
+            self._weights[self._previous] = previous_weight
+            if index is None and previous_weight:
+                # It's the only card left
+                index = self._previous
+        if index is None:
+            return None
+        self._dealt += 1
+        self._previous = index
+        return self._keys[index]
+
+    def add(self, key: str):
+        self._indexes[key] = len(self._keys)
+        self._keys.append(key)
+        self._levels.append(self.INITIAL_LEVEL)
+        self._weights.append(1 << self.INITIAL_LEVEL)
+
+    def remove(self, key: str):
+        index = self._indexes.pop(key, None)
+        if index is not None:
+            self._weights[index] = 0
+
+    def answered(self, key: str, correct: bool):
+        index = self._indexes.get(key)
+        if index is None:
+            return
+        change = self.RIGHT_GUESS_LEVELS if correct else self.WRONG_GUESS_LEVELS
+        level = min(max(self._levels[index] + change, 0), self.MAX_LEVEL)
+        self._levels[index] = level
+        self._weights[index] = 1 << level
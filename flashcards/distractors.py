@@ -0,0 +1,121 @@
+"""
+Index of the answers of a deck, to find the wrong choices offered with the
+right answer in multiple choice games.
+
+The wrong choices are the answers of the deck which look the most like the
+right one: they share the most character trigrams with it, and have about the
+same length. The trigrams of the answers are indexed when the deck is loaded,
+each with the list of the answers it's part of. To find the answers like a
+given one, only the lists of its rarest trigrams are read, up to a fixed number
+of answers: common trigrams tell little about which answers look alike, and
+the time taken doesn't grow with the size of the deck.
+"""
+import random
+from array import array
+from collections import Counter
+from typing import Iterable
+
+GRAM_SIZE = 3
+# How many answers are read from the lists of the trigrams, at most
+MAX_CANDIDATES = 2000
+# The number of answers sharing the most rare trigrams with the right one
+# which are compared to it on all their trigrams
+RERANKED = 32
+
+
+def _grams(text: str) -> set[str]:
+    # Padded, so that the start and end of the text count, and short texts
+    # have at least one trigram
+    padded = f" {text} "
+    return {
+        padded[start : start + GRAM_SIZE]
+        for start in range(len(padded) - GRAM_SIZE + 1)
+    }
+
+
+class DistractorIndex:
+    """
+    The distinct answers of a deck, indexed by their trigrams
+    """
+
+    def __init__(self, answers: Iterable[str]):
+        self._answers: list[str] = []
+        self._postings: dict[str, array] = {}
+        self._seen: set[str] = set()
+        self.add(answers)
+
+    def add(self, answers: Iterable[str]):
+        """
+        Add answers to the index, such as the ones of flashcards added during
+        the game
+        """
+        for answer in answers:
+            answer = answer.strip()
+            key = answer.casefold()
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            for gram in _grams(key):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("I")
+                postings.append(len(self._answers))
+            self._answers.append(answer)
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def similar(self, answer: str, count: int) -> list[str]:
+        """
+        :return: count other answers of the deck, the most similar to the
+        answer first. Random answers make up the count when too few are alike,
+        and fewer are returned if the deck doesn't have that many.
+        """
+        key = answer.strip().casefold()
+        grams = _grams(key)
+        similar = self._rank(key, grams, self._candidates(key, grams))[:count]
+        if len(similar) < count:
+            # Enough random answers that count of them are other answers
+            sample_size = min(len(self._answers), count + 1)
+            for number in random.sample(range(len(self._answers)), sample_size):
+                if len(similar) == count:
+                    break
+                if number not in similar and self._answers[number].casefold() != key:
+                    similar.append(number)
+        return [self._answers[number] for number in similar]
+
+    def _candidates(self, key: str, grams: set[str]) -> list[int]:
+        """
+        :return: the other answers sharing the most trigrams with the key,
+        counting the rarest trigrams first
+        """
+        postings = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings), key=len
+        )
+        shared = Counter()
+        budget = MAX_CANDIDATES
+        for gram_postings in postings:
+            if budget <= 0:
+                break
+            shared.update(gram_postings[:budget])
+            budget -= len(gram_postings)
+        return [
+            number
+            for number, _ in shared.most_common(RERANKED)
+            if self._answers[number].casefold() != key
+        ]
+
+    def _rank(self, key: str, grams: set[str], candidates: list[int]) -> list[int]:
+        """
+        :return: the candidates, the most similar to the key first: on all their
+        trigrams, then on their length
+        """
+        scores = {}
+        for number in candidates:
+            candidate = self._answers[number].casefold()
+            candidate_grams = _grams(candidate)
+            scores[number] = (
+                -2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams)),
+                abs(len(candidate) - len(key)),
+            )
+        return sorted(candidates, key=scores.__getitem__)
@@ -2,40 +2,122 @@
 Flashcards engine
 """
 import random
+import time
+from typing import TYPE_CHECKING, Optional
 
+from flashcards.dealer import Dealer, WeightedDealer
+from flashcards.distractors import DistractorIndex
 from flashcards.provider import FlashcardProvider
 from flashcards.ui import Ui
 
+if TYPE_CHECKING:
+    # Importing the history imports numpy, which would slow down every start
+    from flashcards.history import HistoryRecorder
 
+
+# pylint: disable=too-many-instance-attributes
 class Engine:
     """
     Flashcards engine
     """
 
-    def __init__(self, game_ui: Ui, provider: FlashcardProvider):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        game_ui: Ui,
+        provider: FlashcardProvider,
+        history: Optional["HistoryRecorder"] = None,
+        weighted: bool = False,
+        choices: int = 0,
+    ):
+        """
+        :param history: where to record the result of each guess
+        :param weighted: if True, deal the cards the user misses more often than
+        the ones they get right, instead of dealing every card once
+        :param choices: if not 0, the user picks the answer among this many
+        choices, the wrong ones being the answers of the deck most like it
+        """
         self.game_ui = game_ui
         self.correct_count = 0
         self.guessed_count = 0
         self.provider = provider
+        self.history = history
+        self.weighted = weighted
+        self.choices = choices
+        self._distractors: Optional[DistractorIndex] = None
+        self._max_key_length = 0
+        self._max_answer_length = 0
 
-    def _play_deck(
-        self, deck: dict[str, str], max_key_length: int, max_answer_length: int
+    def _apply_deck_changes(
+        self, deck: dict[str, str], dealer: Dealer, accept_new_cards: bool
     ):
-        keys = list(deck.keys())
-        random.shuffle(keys)
+        """
+        Update the deck being played with the changes made to the flashcards
+        since the game started.
+        :param accept_new_cards: if False, new flashcards are not added to this
+        round. This is the case when replaying missed cards.
+        """
+        changes = self.provider.poll_changes()
+        if changes is None:
+            return
+        for key in changes.removed:
+            deck.pop(key, None)
+            dealer.remove(key)
+        for key, answer in changes.updated.items():
+            if key in deck:
+                deck[key] = answer
+        if accept_new_cards:
+            for key, answer in changes.added.items():
+                deck[key] = answer
+                dealer.add(key)
+        new_flashcards = changes.added | changes.updated
+        for key, answer in new_flashcards.items():
+            self._max_key_length = max(self._max_key_length, len(key))
+            self._max_answer_length = max(self._max_answer_length, len(answer))
+        if new_flashcards:
+            if self._distractors:
+                self._distractors.add(new_flashcards.values())
+            self.game_ui.add_flashcards(new_flashcards)
+
+    def _input_guess(self, key: str, correct_answer: str) -> str:
+        if not self._distractors:
+            return self.game_ui.input_guess(key, self._max_answer_length)
+        choices = [correct_answer] + self._distractors.similar(
+            correct_answer, self.choices - 1
+        )
+        random.shuffle(choices)
+        return self.game_ui.input_choice(key, choices)
+
+    def _play_deck(self, deck: dict[str, str], accept_new_cards: bool = True):
+        if self.weighted and accept_new_cards:
+            dealer = WeightedDealer(deck.keys())
+        else:
+            dealer = self.provider.dealer(deck)
         self.correct_count = 0
         self.guessed_count = 0
         wrong_guesses = {}
-        for index, key in enumerate(keys):
+        index = 0
+        while True:
+            self._apply_deck_changes(deck, dealer, accept_new_cards)
+            key = dealer.next_key()
+            if key is None:
+                break
+            index += 1
             self.game_ui.display_flashcard(
-                index=index + 1,
-                total=len(keys),
+                index=index,
+                total=len(dealer),
                 flashcard=key,
-                max_key_length=max_key_length,
+                max_key_length=self._max_key_length,
             )
-            guess = self.game_ui.input_guess(key, max_answer_length).strip()
             correct_answer = deck[key]
-            if guess.casefold() == correct_answer.casefold():
+            guess_start = time.monotonic()
+            guess = self._input_guess(key, correct_answer).strip()
+            latency = time.monotonic() - guess_start
+            is_correct = guess.casefold() == correct_answer.casefold()
+            if self.history:
+                self.history.record(key, is_correct, time.time(), latency)
+            dealer.answered(key, is_correct)
+            if is_correct:
                 self.correct_count += 1
                 self.game_ui.display_right_guess(key, guess)
             else:
@@ -45,16 +127,18 @@ class Engine:
         self.game_ui.display_score(self.correct_count, self.guessed_count)
         if wrong_guesses:
             if self.game_ui.input_replay_missed_cards():
-                self._play_deck(wrong_guesses, max_key_length, max_answer_length)
+                self._play_deck(wrong_guesses, accept_new_cards=False)
 
     def play(self):
         """
         Play a game
         """
         flashcards = self.provider.flashcards()
-        max_key_length = max([len(x) for x in flashcards.keys()])
-        max_answer_length = max([len(x) for x in flashcards.values()])
-        self._play_deck(flashcards, max_key_length, max_answer_length)
+        self._max_key_length, self._max_answer_length = self.provider.max_lengths()
+        if self.choices:
+            self._distractors = DistractorIndex(flashcards.values())
+        self.game_ui.prepare(flashcards)
+        self._play_deck(flashcards)
         self.game_ui.game_over()
 
     def game_interrupted(self):
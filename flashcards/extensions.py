@@ -0,0 +1,5 @@
+"""
+File extensions of the deck formats, known without importing their readers
+"""
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+APKG_EXTENSIONS = (".apkg",)
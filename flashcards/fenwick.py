@@ -0,0 +1,80 @@
+"""
+Fenwick tree (binary indexed tree) of integer weights
+"""
+from typing import Iterable
+
+
+class FenwickTree:
+    """
+    Integer weights supporting, in O(log n): updating a weight, appending a
+    weight, and finding which weight a running total falls in. This is what's
+    needed to pick items at random in proportion to weights which keep changing.
+    """
+
+    def __init__(self, weights: Iterable[int]):
+        self._weights = list(weights)
+        # 1-based: self._tree[i] is the sum of the weights in (i - lowbit(i), i]
+        self._tree = [0] + self._weights
+        for index in range(1, len(self._tree)):
+            parent = index + (index & -index)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[index]
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __getitem__(self, index: int) -> int:
+        return self._weights[index]
+
+    def __setitem__(self, index: int, weight: int):
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        index += 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, count: int) -> int:
+        """
+        :return: the sum of the first count weights
+        """
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+
+    @property
+    def total(self) -> int:
+        """
+        :return: the sum of all the weights
+        """
+        return self.prefix_sum(len(self._weights))
+
+    def append(self, weight: int):
+        """
+        Add a weight at the end
+        """
+        index = len(self._tree)
+        lowbit = index & -index
+        self._tree.append(
+            weight + self.prefix_sum(index - 1) - self.prefix_sum(index - lowbit)
+        )
+        self._weights.append(weight)
+
+    def find(self, value: int) -> int:
+        """
+        :param value: a number between 0 and total - 1
+        :return: the index of the weight which the value falls in: the smallest
+        index such that the sum of the weights up to and including it is greater
+        than the value
+        """
+        position = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            next_position = position + step
+            if next_position < len(self._tree) and self._tree[next_position] <= value:
+                position = next_position
+                value -= self._tree[next_position]
+            step >>= 1
+        return position
@@ -0,0 +1,25 @@
+"""
+Provide the flashcards of another provider which match a tag filter
+"""
+from flashcards.provider import FlashcardProvider
+from flashcards.tags import FilterSyntaxError
+
+
+class FilteredFlashcardProvider(FlashcardProvider):
+    """
+    Provide the flashcards of another provider which match a tag filter
+    """
+
+    def __init__(self, provider: FlashcardProvider, expression: str):
+        """
+        :raise FilterSyntaxError: if the flashcards have no tags, or the filter
+        expression isn't valid
+        """
+        tag_index = provider.tag_index()
+        if tag_index is None:
+            raise FilterSyntaxError("The flashcards have no tags")
+        cards = provider.flashcards()
+        self.cards = {key: cards[key] for key in tag_index.select(expression)}
+
+    def flashcards(self) -> dict[str, str]:
+        return self.cards
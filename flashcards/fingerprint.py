@@ -0,0 +1,93 @@
+"""
+Identify flashcards by their content, and decks by the flashcards they hold.
+
+The id of a card is a hash of its key and answer: it doesn't depend on where the
+card is in the deck, nor on the other cards. The fingerprint of a deck is a hash
+of the sorted ids of its cards, the same whatever their order.
+"""
+import argparse
+import hashlib
+import sys
+from collections.abc import Mapping
+from os import path
+
+from flashcards.convert import READERS
+from flashcards.provider import DeckChanges
+
+ID_SIZE = 16
+
+
+def card_id(key: str, answer: str) -> bytes:
+    """
+    :return: the id of a card, a hash of its key and answer
+    """
+    key_bytes = key.encode("utf-8")
+    # Prefix the key with its length, so that moving text from the key to the
+    # answer changes the id
+    data = len(key_bytes).to_bytes(4, "little") + key_bytes + answer.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=ID_SIZE).digest()
+
+
+def deck_fingerprint(cards: Mapping[str, str]) -> str:
+    """
+    :return: the fingerprint of a deck: equal for decks holding the same cards,
+    in whatever order
+    """
+    hasher = hashlib.blake2b(digest_size=ID_SIZE)
+    for id_ in sorted(card_id(key, answer) for key, answer in cards.items()):
+        hasher.update(id_)
+    return hasher.hexdigest()
+
+
+def diff_decks(old: Mapping[str, str], new: Mapping[str, str]) -> DeckChanges:
+    """
+    :return: the changes turning the old deck into the new one. A card whose
+    answer changed is updated, a card whose key changed is removed and added.
+    """
+    changes = DeckChanges(removed=old.keys() - new.keys())
+    for key, answer in new.items():
+        old_answer = old.get(key)
+        if old_answer is None:
+            changes.added[key] = answer
+        elif old_answer != answer:
+            changes.updated[key] = answer
+    return changes
+
+
+def _load_deck(parser: argparse.ArgumentParser, file_path: str) -> dict[str, str]:
+    reader = READERS.get(path.splitext(file_path)[1].lower())
+    if reader is None:
+        parser.error(f"Unsupported file format: {file_path}")
+    try:
+        cards = dict(reader(file_path))
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    return cards
+
+
+def main(args: list[str]):
+    """
+    Entry point of the diff command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards diff",
+        description="Show the flashcards added, updated and removed between two "
+        "versions of a deck, and their fingerprints. The exit status is 1 if the "
+        f"decks differ. Supported file extensions: {', '.join(READERS)}",
+    )
+    parser.add_argument("old", help="Path to the old version of the deck")
+    parser.add_argument("new", help="Path to the new version of the deck")
+    options = parser.parse_args(args)
+    old = _load_deck(parser, options.old)
+    new = _load_deck(parser, options.new)
+    changes = diff_decks(old, new)
+    for key in sorted(changes.removed):
+        print(f"- {key}")
+    for key, answer in sorted(changes.added.items()):
+        print(f"+ {key}: {answer}")
+    for key, answer in sorted(changes.updated.items()):
+        print(f"~ {key}: {answer}")
+    print(f"{options.old}: {len(old)} cards, fingerprint {deck_fingerprint(old)}")
+    print(f"{options.new}: {len(new)} cards, fingerprint {deck_fingerprint(new)}")
+    if changes != DeckChanges():
+        sys.exit(1)
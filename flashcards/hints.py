@@ -0,0 +1,96 @@
+"""
+Index of the answers of a deck, to complete what the user is typing.
+
+The answers are normalized like the guesses are compared to them, then sorted
+once when the deck is loaded. The answers starting with a prefix are next to
+each other in the sorted array: two binary searches find them without scanning
+the deck. A sorted list of strings takes far less memory than a trie of Python
+objects, which matters for decks of millions of cards.
+"""
+import bisect
+from os import path
+from typing import Iterable
+
+_LAST_CHAR = chr(0x10FFFF)
+
+
+def _normalize_prefix(text: str) -> str:
+    # The guesses are stripped and compared regardless of case: spaces typed
+    # after the prefix are part of it
+    return text.lstrip().casefold()
+
+
+class AnswerIndex:
+    """
+    The distinct answers of a deck, sorted by their normalized text
+    """
+
+    def __init__(self, answers: Iterable[str]):
+        keys = set()
+        # The answers which differ from their normalized text, the first one of
+        # those which only differ by case
+        self._answers: dict[str, str] = {}
+        for answer in answers:
+            answer = answer.strip()
+            key = answer.casefold()
+            if key == answer:
+                # Share the string
+                key = answer
+            elif key not in keys:
+                self._answers[key] = answer
+            keys.add(key)
+        self._keys = sorted(keys)
+
+    def add(self, answers: Iterable[str]):
+        """
+        Add answers to the index, such as the ones of flashcards added during
+        the game
+        """
+        for answer in answers:
+            answer = answer.strip()
+            key = answer.casefold()
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                continue
+            if key != answer:
+                self._answers[key] = answer
+            self._keys.insert(index, key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + _LAST_CHAR, lo=start)
+        return start, end
+
+    def count(self, text: str) -> int:
+        """
+        :return: the number of answers starting with the text
+        """
+        start, end = self._range(_normalize_prefix(text))
+        return end - start
+
+    def candidates(self, text: str, limit: int) -> list[str]:
+        """
+        :return: the first answers starting with the text, in alphabetical
+        order, at most limit of them
+        """
+        start, end = self._range(_normalize_prefix(text))
+        return [
+            self._answers.get(key, key)
+            for key in self._keys[start : min(end, start + limit)]
+        ]
+
+    def completion(self, text: str) -> str:
+        """
+        :return: the characters which all the answers starting with the text
+        have after it, normalized. Empty if no answers start with the text.
+        """
+        prefix = _normalize_prefix(text)
+        start, end = self._range(prefix)
+        if start == end:
+            return ""
+        # The keys are sorted: what the first and last have in common, all have
+        common = path.commonprefix([self._keys[start], self._keys[end - 1]])
+        return common[len(prefix) :]
@@ -0,0 +1,147 @@
+"""
+Record the result of each guess, and read the results back for analysis.
+
+A history is a directory holding two files:
+- cards.csv: the key of each flashcard which was played, one per row. The row
+  number is the card id.
+- events.bin: one fixed size record per guess: the timestamp, the time taken to
+  answer in seconds, the card id and whether the guess was correct.
+
+The fixed size records let the events be read straight into columnar arrays.
+"""
+import array
+import csv
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from os import path
+from typing import Any
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+CARDS_FILE = "cards.csv"
+EVENTS_FILE = "events.bin"
+
+_RECORD = struct.Struct("<dfI?")
+
+# name, array typecode, numpy type, offset in the record, size
+_FIELDS = (
+    ("timestamp", "d", "<f8", 0, 8),
+    ("latency", "f", "<f4", 8, 4),
+    ("card", "I", "<u4", 12, 4),
+    ("correct", "B", "<u1", 16, 1),
+)
+
+
+@dataclass
+class History:
+    """
+    Columns of the recorded guesses. The columns are numpy arrays if numpy is
+    installed, array.array otherwise.
+    """
+
+    cards: list[str]
+    timestamp: Any
+    latency: Any
+    card: Any
+    correct: Any
+
+    def __len__(self) -> int:
+        return len(self.card)
+
+
+class HistoryRecorder:
+    """
+    Append the result of each guess to a history directory.
+    Only one game at a time should record to a given directory.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        cards_path = path.join(directory, CARDS_FILE)
+        self._card_ids = {
+            key: card_id for card_id, key in enumerate(_read_cards(cards_path))
+        }
+        # pylint: disable=consider-using-with
+        self._cards_file = open(cards_path, "a", encoding="utf-8", newline="")
+        self._cards_writer = csv.writer(self._cards_file)
+        self._events_file = open(path.join(directory, EVENTS_FILE), "ab")
+
+    def record(self, key: str, correct: bool, timestamp: float, latency: float):
+        """
+        Record the result of a guess
+        :param key: the flashcard side which was displayed
+        :param correct: whether the guess was correct
+        :param timestamp: when the guess was made, in seconds since the epoch
+        :param latency: how long the user took to guess, in seconds
+        """
+        card_id = self._card_ids.get(key)
+        if card_id is None:
+            card_id = len(self._card_ids)
+            self._card_ids[key] = card_id
+            # Make sure the card is saved before any event refers to it
+            self._cards_writer.writerow([key])
+            self._cards_file.flush()
+        self._events_file.write(_RECORD.pack(timestamp, latency, card_id, correct))
+
+    def close(self):
+        """
+        Flush and close the history files
+        """
+        self._events_file.close()
+        self._cards_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _read_cards(cards_path: str) -> list[str]:
+    if not path.exists(cards_path):
+        return []
+    with open(cards_path, encoding="utf-8", newline="") as cards_file:
+        return [row[0] for row in csv.reader(cards_file)]
+
+
+def load_history(directory: str) -> History:
+    """
+    Read the guesses recorded in a history directory
+    """
+    cards = _read_cards(path.join(directory, CARDS_FILE))
+    events_path = path.join(directory, EVENTS_FILE)
+    # Ignore a partially written record at the end of the file
+    count = os.path.getsize(events_path) // _RECORD.size
+    if numpy is not None:
+        columns = _read_numpy_columns(events_path, count)
+    else:
+        columns = _read_array_columns(events_path, count)
+    return History(cards=cards, **columns)
+
+
+def _read_numpy_columns(events_path: str, count: int) -> dict[str, Any]:
+    dtype = numpy.dtype([(name, numpy_type) for name, _, numpy_type, *_ in _FIELDS])
+    records = numpy.fromfile(events_path, dtype=dtype, count=count)
+    return {name: numpy.ascontiguousarray(records[name]) for name, *_ in _FIELDS}
+
+
+def _read_array_columns(events_path: str, count: int) -> dict[str, Any]:
+    with open(events_path, "rb") as events_file:
+        data = events_file.read(count * _RECORD.size)
+    columns = {}
+    for name, typecode, _, offset, size in _FIELDS:
+        # Gather the bytes of this field from every record with extended slices,
+        # which copy in C rather than looping over the records in python.
+        field_bytes = bytearray(count * size)
+        for byte in range(size):
+            field_bytes[byte::size] = data[offset + byte :: _RECORD.size]
+        column = array.array(typecode, field_bytes)
+        if sys.byteorder == "big":
+            column.byteswap()
+        columns[name] = column
+    return columns
@@ -0,0 +1,287 @@
+"""
+Check a csv file of flashcards for problems which would spoil a game.
+
+Large files are split into byte ranges ending on row boundaries, which are
+checked in parallel by a pool of processes. The results of the ranges are then
+merged, to find the keys duplicated across ranges and the rows whose width is
+far above the rest of the deck.
+"""
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import sys
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# A width is suspicious if it's this many times the 99th percentile...
+OUTLIER_FACTOR = 3
+# ... and wider than this
+MIN_OUTLIER_WIDTH = 40
+
+
+@dataclass
+class Issue:
+    """
+    A problem found in a row of the file
+    """
+
+    line: int
+    kind: str
+    message: str
+
+
+@dataclass
+class ChunkResult:
+    """
+    What was found in a byte range of the file
+    """
+
+    rows: int = 0
+    issues: list[Issue] = field(default_factory=list)
+    # The first line of each key
+    keys: dict[str, int] = field(default_factory=dict)
+    key_widths: Counter = field(default_factory=Counter)
+    answer_widths: Counter = field(default_factory=Counter)
+    # (width, line, column) of the keys and answers wider than MIN_OUTLIER_WIDTH
+    wide: list[tuple[int, int, str]] = field(default_factory=list)
+
+
+@dataclass
+class LintReport:
+    """
+    The result of checking a file
+    """
+
+    path: str
+    rows: int
+    issues: list[Issue]
+
+
+def _text_width(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    wide_char_count = sum(1 for ch in text if unicodedata.east_asian_width(ch) == "W")
+    return wide_char_count + len(text)
+
+
+def _find_chunks(path: str, chunk_size: int) -> list[tuple[int, int, int]]:
+    """
+    :return: the start and end offsets, and the first line number, of byte ranges
+    of about chunk_size bytes. Each range ends after a newline which isn't
+    inside a quoted field.
+    """
+    size = os.path.getsize(path)
+    if size <= chunk_size:
+        return [(0, size, 1)]
+    chunks = []
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        start, line, quotes = 0, 1, 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            quotes += data[start:end].count(b'"')
+            # Move to the next newline outside of a quoted field
+            while end < size:
+                newline = data.find(b"\n", end)
+                if newline < 0:
+                    newline = size - 1
+                quotes += data[end : newline + 1].count(b'"')
+                end = newline + 1
+                if quotes % 2 == 0:
+                    break
+            chunks.append((start, end, line))
+            line += data[start:end].count(b"\n")
+            start = end
+    return chunks
+
+
+def _decode(data: bytes, first_line: int, encoding: str, issues: list[Issue]) -> str:
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError:
+        pass
+    lines = []
+    for number, raw_line in enumerate(data.split(b"\n"), start=first_line):
+        try:
+            lines.append(raw_line.decode(encoding))
+        except UnicodeDecodeError as error:
+            issues.append(Issue(number, "encoding", f"Not valid {encoding}: {error}"))
+            lines.append(raw_line.decode(encoding, errors="replace"))
+    return "\n".join(lines)
+
+
+def _check_row(row: list[str], line: int, result: ChunkResult):
+    if len(row) < 2:
+        result.issues.append(
+            Issue(line, "malformed", f"Expected 2 columns, found {len(row)}")
+        )
+        return
+    key, answer = row[0], row[1]
+    if not key.strip():
+        result.issues.append(Issue(line, "empty_key", "The key is empty"))
+    if not answer.strip():
+        result.issues.append(Issue(line, "empty_answer", f"{key}: the answer is empty"))
+    if key in result.keys:
+        result.issues.append(
+            Issue(line, "duplicate_key", f"{key}: also on line {result.keys[key]}")
+        )
+    else:
+        result.keys[key] = line
+    key_width, answer_width = _text_width(key), _text_width(answer)
+    result.key_widths[key_width] += 1
+    result.answer_widths[answer_width] += 1
+    # Narrower keys and answers can't be outliers, whatever the rest of the deck
+    for width, column in ((key_width, "key"), (answer_width, "answer")):
+        if width > MIN_OUTLIER_WIDTH:
+            result.wide.append((width, line, column))
+
+
+def lint_chunk(
+    path: str, start: int, end: int, first_line: int, encoding: str = "utf-8"
+) -> ChunkResult:
+    """
+    Check the rows of a byte range of the file
+    """
+    result = ChunkResult()
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    if start == 0 and data.startswith(b"\xef\xbb\xbf") and encoding == "utf-8":
+        data = data[3:]
+    text = _decode(data, first_line, encoding, result.issues)
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    row_line = first_line
+    for row in reader:
+        line = row_line
+        row_line = first_line + reader.line_num
+        result.rows += 1
+        _check_row(row, line, result)
+    return result
+
+
+def _percentile(widths: Counter, percentile: float) -> int:
+    rank = sum(widths.values()) * percentile / 100
+    seen = 0
+    for width in sorted(widths):
+        seen += widths[width]
+        if seen >= rank:
+            return width
+    return 0
+
+
+def _merge(path: str, results: list[ChunkResult]) -> LintReport:
+    issues = []
+    keys = {}
+    key_widths, answer_widths = Counter(), Counter()
+    for result in results:
+        issues += result.issues
+        for key, line in result.keys.items():
+            if key in keys:
+                issues.append(
+                    Issue(line, "duplicate_key", f"{key}: also on line {keys[key]}")
+                )
+            else:
+                keys[key] = line
+        key_widths.update(result.key_widths)
+        answer_widths.update(result.answer_widths)
+
+    usual_widths = {
+        "key": _percentile(key_widths, 99),
+        "answer": _percentile(answer_widths, 99),
+    }
+    for result in results:
+        for width, line, column in result.wide:
+            usual_width = usual_widths[column]
+            if width > max(OUTLIER_FACTOR * usual_width, MIN_OUTLIER_WIDTH):
+                issues.append(
+                    Issue(
+                        line,
+                        "width_outlier",
+                        f"The {column} is {width} columns wide, "
+                        f"99% are at most {usual_width}",
+                    )
+                )
+    issues.sort(key=lambda issue: issue.line)
+    return LintReport(
+        path=path, rows=sum(result.rows for result in results), issues=issues
+    )
+
+
+def lint(
+    path: str,
+    jobs: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+) -> LintReport:
+    """
+    Check a csv file of flashcards
+    :param jobs: how many processes to use. Default is the number of cpus.
+    :param chunk_size: approximate size in bytes of the ranges checked in parallel
+    """
+    chunks = _find_chunks(path, chunk_size)
+    if len(chunks) == 1 or jobs == 1:
+        results = [lint_chunk(path, *chunk, encoding) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(lint_chunk, path, *chunk, encoding) for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+    return _merge(path, results)
+
+
+def main(args: list[str]):
+    """
+    Entry point of the lint command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards lint", description="Check a csv file of flashcards"
+    )
+    parser.add_argument(
+        "input", metavar="flashcards_csv_file", help="Path to flashcards csv file"
+    )
+    parser.add_argument(
+        "--format",
+        default="text",
+        choices=["text", "json"],
+        help="Output format. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of processes. Default is the number of cpus",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Size in bytes of the parts of the file checked in parallel. "
+        "Default is %(default)s",
+    )
+    parser.add_argument(
+        "--encoding", default="utf-8", help="File encoding. Default is %(default)s"
+    )
+    options = parser.parse_args(args)
+    try:
+        report = lint(options.input, options.jobs, options.chunk_size, options.encoding)
+    except (OSError, LookupError) as error:
+        parser.error(str(error))
+    if options.format == "json":
+        json.dump(asdict(report), sys.stdout, ensure_ascii=False)
+        print()
+    else:
+        for issue in report.issues:
+            print(f"{report.path}:{issue.line}: {issue.kind}: {issue.message}")
+        print(f"{report.rows} rows, {len(report.issues)} issues")
+    if report.issues:
+        sys.exit(1)
@@ -2,9 +2,24 @@
 Interface to provide flashcards
 """
 import abc
+from dataclasses import dataclass, field
+from typing import Optional
+
+from flashcards.dealer import Dealer, ShuffledDealer
+from flashcards.tags import TagIndex
+
+
+@dataclass
+class DeckChanges:
+    """
+    Flashcards which were added, updated or removed since the deck was loaded
+    """
+
+    added: dict[str, str] = field(default_factory=dict)
+    updated: dict[str, str] = field(default_factory=dict)
+    removed: set[str] = field(default_factory=set)
 
 
-# pylint: disable=too-few-public-methods
 class FlashcardProvider(metaclass=abc.ABCMeta):
     """
     Interface to provide flashcards
@@ -15,3 +30,37 @@ class FlashcardProvider(metaclass=abc.ABCMeta):
         """
         :return: a mapping of flashcards: one side mapped to the other side
         """
+
+    # Ignore no-self-use: providers override these defaults with their own state
+    # pylint: disable=no-self-use
+    def poll_changes(self) -> Optional[DeckChanges]:
+        """
+        :return: the changes made to the flashcards since the last call, or None if
+        there were no changes
+        """
+        return None
+
+    def max_lengths(self) -> tuple[int, int]:
+        """
+        :return: the length of the longest key and of the longest answer
+        """
+        flashcards = self.flashcards()
+        return max(len(x) for x in flashcards.keys()), max(
+            len(x) for x in flashcards.values()
+        )
+
+    # pylint: disable=no-self-use
+    def dealer(self, deck: dict[str, str]) -> Dealer:
+        """
+        :param deck: the flashcards to play: all of them, or the ones to replay
+        :return: the dealer deciding in which order to play the flashcards
+        """
+        return ShuffledDealer(deck.keys())
+
+    # pylint: disable=no-self-use
+    def tag_index(self) -> Optional[TagIndex]:
+        """
+        :return: the index of the tags of the flashcards, or None if the
+        flashcards have no tags
+        """
+        return None
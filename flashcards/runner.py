@@ -3,14 +3,20 @@ Application entry point
 """
 import argparse
 import gettext
+import importlib
 import os
 from os import path
 import sys
 
-from flashcards.cursesui.cursesui import CursesUi
-from flashcards.textui import TextUi
+from flashcards.cursesui.cursesui import HINT_MODES, CursesUi
+from flashcards.textui import PipedTextUi, TextUi
+from flashcards.daemonclient import WARM_EXTENSIONS, fetch_deck
 from flashcards.engine import Engine
-from flashcards.csvprovider import CsvFlashcardProvider
+from flashcards.extensions import APKG_EXTENSIONS, SQLITE_EXTENSIONS
+from flashcards.filteredprovider import FilteredFlashcardProvider
+from flashcards.provider import FlashcardProvider
+from flashcards.tags import FilterSyntaxError
+from flashcards.csvprovider import CsvFlashcardProvider, WatchingCsvFlashcardProvider
 
 BUNDLE_DIR = getattr(
     sys, "_MEIPASS", path.abspath(path.dirname(path.dirname(__file__)))
@@ -23,34 +29,203 @@ translations = gettext.translation(
 translations.install()
 _ = translations.gettext
 
+# The modules of the other commands, only imported when the command is run
+COMMANDS = {
+    "analyze": "flashcards.analyze",
+    "convert": "flashcards.convert",
+    "daemon": "flashcards.daemon",
+    "diff": "flashcards.fingerprint",
+    "lint": "flashcards.lint",
+    "serve": "flashcards.server",
+}
+
+
+def _run_command(command: str, args: list[str]):
+    module = importlib.import_module(COMMANDS[command])
+    if command == "serve":
+        module.main(args, translator=_)
+    else:
+        module.main(args)
+
+
+def _open_deck(
+    parser: argparse.ArgumentParser, options: argparse.Namespace
+) -> FlashcardProvider:
+    extension = path.splitext(options.input.name)[1].lower()
+    if extension in WARM_EXTENSIONS and not options.watch and not options.filter:
+        # Play the deck kept in memory by the daemon, if it's running
+        provider = fetch_deck(options.input.name)
+        if provider is not None:
+            options.input.close()
+            return provider
+    if extension in SQLITE_EXTENSIONS + APKG_EXTENSIONS:
+        if options.watch:
+            parser.error("--watch is only supported for csv files")
+        options.input.close()
+        # pylint: disable=import-outside-toplevel
+        # The readers of the other formats take longer to import than a csv
+        # deck of usual size takes to read: only import the one needed
+        if extension in APKG_EXTENSIONS:
+            if options.filter:
+                parser.error("--filter isn't supported for Anki packages")
+            from flashcards.ankiprovider import AnkiFlashcardProvider
+
+            try:
+                return AnkiFlashcardProvider(options.input.name)
+            except ValueError as error:
+                parser.error(str(error))
+        from flashcards.sqliteprovider import SqliteFlashcardProvider
+
+        try:
+            return SqliteFlashcardProvider(options.input.name)
+        except ValueError as error:
+            parser.error(str(error))
+    if options.watch:
+        if options.filter:
+            parser.error("--watch can't be used with --filter")
+        return WatchingCsvFlashcardProvider(options.input)
+    return CsvFlashcardProvider(options.input)
+
+
+def _make_provider(
+    parser: argparse.ArgumentParser, options: argparse.Namespace
+) -> FlashcardProvider:
+    provider = _open_deck(parser, options)
+    if options.filter:
+        try:
+            provider = FilteredFlashcardProvider(provider, options.filter)
+        except FilterSyntaxError as error:
+            parser.error(str(error))
+        if not provider.flashcards():
+            parser.error("No flashcards match the filter")
+    return provider
+
+
+def _choose_ui(parser: argparse.ArgumentParser, options: argparse.Namespace) -> str:
+    """
+    :return: the ui to play with, piped when no ui is given and the input and
+    output are both redirected
+    """
+    terminal = sys.stdin.isatty() and sys.stdout.isatty()
+    ui_type = options.ui
+    if ui_type is None:
+        if not sys.stdin.isatty() and not sys.stdout.isatty():
+            ui_type = "piped"
+        else:
+            # The curses ui can't run with only one of them redirected either
+            ui_type = "curses" if terminal else "text"
+    elif ui_type == "curses" and not terminal:
+        parser.error("The curses ui needs the input and output to be a terminal")
+    if options.time_limit and ui_type != "curses":
+        parser.error("--time-limit is only supported by the curses ui")
+    if options.hints and ui_type != "curses":
+        parser.error("--hints is only supported by the curses ui")
+    return ui_type
+
 
 def main():
     """
     Application entry point
     """
-    parser = argparse.ArgumentParser(prog="flashcards", description="Flashcards game")
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        _run_command(sys.argv[1], sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        prog="flashcards",
+        description="Flashcards game",
+        epilog="Other commands: "
+        + ", ".join(COMMANDS)
+        + ". Run flashcards <command> --help for their usage.",
+    )
     parser.add_argument(
         "input",
-        metavar="flashcards_csv_file",
+        metavar="flashcards_file",
         type=argparse.FileType("r"),
-        help="Path to flashcards csv file",
+        help="Path to flashcards csv file, sqlite database "
+        f"({', '.join(SQLITE_EXTENSIONS)}) or Anki package "
+        f"({', '.join(APKG_EXTENSIONS)})",
     )
     parser.add_argument(
         "--ui",
         nargs="?",
-        default="curses",
         choices=["text", "curses"],
-        help="Ui type. Default is %(default)s",
+        help="Ui type. Default is curses, or when the input and output aren't "
+        "a terminal, a text ui reading the guesses one per line, without "
+        "prompts",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Pick up changes made to the flashcards csv file during the game",
+    )
+    parser.add_argument(
+        "--filter",
+        metavar="expression",
+        help="Only play the flashcards whose tags match the expression, "
+        'for example "irregular and chapter3 and not mastered". '
+        "Tags are the csv columns after the answer, or the deck and tags of "
+        "the flashcards of a sqlite database",
+    )
+    parser.add_argument(
+        "--weighted",
+        action="store_true",
+        help="Deal the flashcards you miss more often than the ones you get "
+        "right, instead of dealing every flashcard once",
+    )
+    parser.add_argument(
+        "--time-limit",
+        metavar="seconds",
+        type=float,
+        help="Time allowed to answer each flashcard, in the curses ui",
+    )
+    parser.add_argument(
+        "--hints",
+        choices=HINT_MODES,
+        help="In the curses ui, tab completes the guess with the answers of "
+        "the deck. With candidates, the answers starting with the guess are "
+        "also shown as it's typed",
+    )
+    parser.add_argument(
+        "--choices",
+        metavar="count",
+        type=int,
+        help="Multiple choice: pick the answer among this many, from 2 to 9. "
+        "The wrong choices are the answers of other flashcards which look the "
+        "most like it",
+    )
+    parser.add_argument(
+        "--history",
+        metavar="history_dir",
+        help="Record the result of each guess in this directory, "
+        "for use by the analyze command",
     )
     options = parser.parse_args()
 
-    if options.ui == "curses":
-        game_ui = CursesUi(_)
+    ui_type = _choose_ui(parser, options)
+    if options.choices is not None and not 2 <= options.choices <= 9:
+        parser.error("--choices must be between 2 and 9")
+    if options.choices and options.hints:
+        parser.error("--hints can't be used with --choices")
+    provider = _make_provider(parser, options)
+    if ui_type == "piped":
+        game_ui = PipedTextUi(_)
+    elif ui_type == "curses":
+        game_ui = CursesUi(_, time_limit=options.time_limit, hints=options.hints)
     else:
         game_ui = TextUi(_)
-    provider = CsvFlashcardProvider(options.input)
-    engine = Engine(game_ui, provider)
+    history = None
+    if options.history:
+        # pylint: disable=import-outside-toplevel
+        # The history imports numpy: only import it when it's needed
+        from flashcards.history import HistoryRecorder
+
+        history = HistoryRecorder(options.history)
+    engine = Engine(game_ui, provider, history, options.weighted, options.choices or 0)
     try:
         engine.play()
     except (KeyboardInterrupt, EOFError):
         engine.game_interrupted()
+    finally:
+        if history:
+            history.close()
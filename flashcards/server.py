@@ -0,0 +1,317 @@
+"""
+Serve flashcard games over tcp, to several players at once.
+
+The server is pre-forked: the parent process loads the deck once, then forks
+the workers, which share its memory copy-on-write. A sqlite deck isn't loaded
+at all: each worker maps the same read-only file.
+
+The workers accept the connections of the listening socket of the parent, or
+of their own sockets bound to the same port with SO_REUSEPORT, and play one
+game per connection, one line per message: the server sends the progress and
+the flashcard, the client answers with its guess.
+"""
+import argparse
+import contextlib
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from os import path
+from typing import Callable, Optional
+
+from flashcards.csvprovider import CsvFlashcardProvider
+from flashcards.engine import Engine
+from flashcards.provider import FlashcardProvider
+from flashcards.shareddeck import SharedDeckProvider
+from flashcards.extensions import SQLITE_EXTENSIONS
+from flashcards.sqliteprovider import SqliteFlashcardProvider
+from flashcards.textui import PipedTextUi, Translator
+
+DEFAULT_PORT = 8023
+DEFAULT_TIMEOUT = 300
+LISTEN_BACKLOG = 128
+# Map sqlite decks up to this size
+SQLITE_MMAP_SIZE = 1 << 30
+# A worker dying sooner than this many seconds after it was forked failed to
+# start: the next one is forked after a delay, doubled at each failure in a row
+WORKER_STARTUP_TIME = 1.0
+STARTUP_RETRY_DELAY = 0.1
+# Stop serving after this many workers in a row failed to start
+MAX_STARTUP_FAILURES = 5
+
+ProviderFactory = Callable[[], FlashcardProvider]
+
+
+class SessionUi(PipedTextUi):
+    """
+    Text ui of a game played over a connection: the output is buffered, and
+    sent when the client has to answer
+    """
+
+    def input_guess(self, flashcard: str, max_answer_length: int) -> str:
+        self._output.flush()
+        return super().input_guess(flashcard, max_answer_length)
+
+    def input_replay_missed_cards(self) -> bool:
+        self._output.flush()
+        return super().input_replay_missed_cards()
+
+
+def load_deck(deck_path: str) -> ProviderFactory:
+    """
+    Load the deck in the parent process
+    :return: the function creating the provider of a worker
+    :raise OSError, ValueError: if the deck can't be read
+    """
+    if path.splitext(deck_path)[1].lower() in SQLITE_EXTENSIONS:
+        # A sqlite connection can't be used across a fork: each worker opens its
+        # own. Open it once before forking, to report an invalid deck.
+        SqliteFlashcardProvider(deck_path).close()
+        return lambda: SqliteFlashcardProvider(deck_path, mmap_size=SQLITE_MMAP_SIZE)
+    with open(deck_path, encoding="utf-8") as file:
+        provider = SharedDeckProvider.pack(CsvFlashcardProvider(file))
+    return lambda: provider
+
+
+def bind(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    """
+    :return: a socket bound to the address, not listening yet
+    """
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    family, _, _, _, address = addresses[0]
+    if reuse_port and port == 0:
+        # With SO_REUSEPORT, the kernel may pick a port already shared by other
+        # sockets: pick a free port without it
+        with socket.socket(family, socket.SOCK_STREAM) as probe:
+            probe.bind(address)
+            address = probe.getsockname()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(address)
+    return sock
+
+
+def play_session(
+    connection: socket.socket,
+    provider: FlashcardProvider,
+    translator: Translator,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+):
+    """
+    Play a game with the client of a connection, until it's over or the client
+    goes away
+    :param timeout: how long to wait for the client to answer, in seconds
+    """
+    connection.settimeout(timeout)
+    reader = connection.makefile("r", encoding="utf-8", newline="\n")
+    writer = connection.makefile("w", encoding="utf-8")
+    engine = Engine(SessionUi(translator, reader, writer), provider)
+    try:
+        try:
+            engine.play()
+        except EOFError:
+            engine.game_interrupted()
+        writer.close()
+    except (OSError, ValueError):
+        # The client went away, took too long to answer, or sent text which
+        # isn't utf-8
+        pass
+
+
+# pylint: disable=too-many-instance-attributes
+class PreforkServer:
+    """
+    Fork the workers, and fork new ones when they die
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        listener: socket.socket,
+        provider_factory: ProviderFactory,
+        translator: Translator,
+        workers: int,
+        reuse_port: bool = False,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+    ):
+        """
+        :param listener: the socket bound to the address to serve. Unless
+        reuse_port is True, the workers accept the connections of this socket.
+        :param reuse_port: if True, each worker listens on its own socket bound
+        to the same address, and the kernel spreads the connections
+        """
+        self._listener = listener
+        self._provider_factory = provider_factory
+        self._translator = translator
+        self._workers = workers
+        self._reuse_port = reuse_port
+        self._timeout = timeout
+        # The start time of each worker
+        self._pids: dict[int, float] = {}
+        self._running = False
+
+    def start(self):
+        """
+        Fork the workers. Until serve_forever is called, the workers which die
+        aren't replaced.
+        """
+        if not self._reuse_port:
+            self._listener.listen(LISTEN_BACKLOG)
+        self._running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        # Keep the garbage collector of the workers from writing to the objects
+        # created so far, which would copy the shared memory pages
+        gc.freeze()
+        for _ in range(self._workers):
+            self._fork_worker()
+
+    def serve_forever(self):
+        """
+        Replace the workers which die, until SIGTERM or SIGINT
+        :raise RuntimeError: if the workers keep dying as soon as they start
+        """
+        if not self._running:
+            self.start()
+        failures = 0
+        while self._pids:
+            pid, _ = os.wait()
+            started = self._pids.pop(pid)
+            if not self._running:
+                continue
+            if time.monotonic() - started >= WORKER_STARTUP_TIME:
+                failures = 0
+            else:
+                failures += 1
+                if failures == MAX_STARTUP_FAILURES:
+                    self._stop()
+                    continue
+                time.sleep(STARTUP_RETRY_DELAY * 2 ** (failures - 1))
+            self._fork_worker()
+        if failures == MAX_STARTUP_FAILURES:
+            raise RuntimeError(f"{failures} workers in a row failed to start")
+
+    def _stop(self, *_):
+        self._running = False
+        for pid in self._pids:
+            # The worker may have exited already
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    def _fork_worker(self):
+        # Block the signals until the worker has its own signal handlers, and
+        # the parent knows the pid of the worker
+        signals = {signal.SIGTERM, signal.SIGINT}
+        signal.pthread_sigmask(signal.SIG_BLOCK, signals)
+        if not self._running:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+            return
+        pid = os.fork()
+        if pid:
+            self._pids[pid] = time.monotonic()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+            return
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, signals)
+            self._run_worker()
+        except BaseException:  # pylint: disable=broad-except
+            traceback.print_exc()
+            status = 1
+        finally:
+            # Never return to the loop of the parent
+            os._exit(status)  # pylint: disable=protected-access
+
+    def _run_worker(self):
+        listener = self._listener
+        if self._reuse_port:
+            host, port = listener.getsockname()[:2]
+            listener = bind(host, port, reuse_port=True)
+            listener.listen(LISTEN_BACKLOG)
+        provider = self._provider_factory()
+        while True:
+            connection, _ = listener.accept()
+            with connection:
+                play_session(connection, provider, self._translator, self._timeout)
+
+
+def main(args: list[str], translator: Translator):
+    """
+    Entry point of the serve command
+    """
+    parser = argparse.ArgumentParser(
+        prog="flashcards serve",
+        description="Serve flashcard games over tcp. A game is played per "
+        "connection: the server sends the progress and the flashcard, one per "
+        "line, and the client answers with its guess",
+    )
+    parser.add_argument(
+        "input",
+        metavar="flashcards_file",
+        help="Path to flashcards csv file, or sqlite database "
+        f"({', '.join(SQLITE_EXTENSIONS)})",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="Port to listen on, 0 for any free port. Default is %(default)s",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes. Default is the number of cpus",
+    )
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        help="Give each worker its own socket, and let the kernel spread the "
+        "connections between them with SO_REUSEPORT",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Seconds to wait for a guess before closing the connection. "
+        "Default is %(default)s",
+    )
+    options = parser.parse_args(args)
+    try:
+        provider_factory = load_deck(options.input)
+    except (OSError, ValueError) as error:
+        parser.error(f"Can't load {options.input}: {error}")
+    try:
+        listener = bind(options.host, options.port, options.reuse_port)
+    except OSError as error:
+        parser.error(f"Can't listen on {options.host}:{options.port}: {error}")
+    server = PreforkServer(
+        listener,
+        provider_factory,
+        translator,
+        options.workers,
+        options.reuse_port,
+        options.timeout,
+    )
+    server.start()
+    host, port = listener.getsockname()[:2]
+    print(
+        f"Serving {options.input} on {host}:{port} with {options.workers} workers",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except RuntimeError as error:
+        sys.exit(str(error))
@@ -0,0 +1,137 @@
+"""
+Flashcards packed in a single buffer, to be shared between processes: the
+workers of the server, or the daemon and the games.
+"""
+import itertools
+import struct
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from typing import BinaryIO
+
+from flashcards.dealer import Dealer, PermutationDealer
+from flashcards.provider import FlashcardProvider
+
+# The end of a written deck: the size of the text with its padding, and the
+# number of cards
+_TRAILER = struct.Struct("=QQ")
+
+
+class SharedDeck(Mapping):
+    """
+    Flashcards packed in a single buffer, sorted by key, to be shared by the
+    workers.
+
+    Python objects shared copy-on-write end up copied by each process anyway:
+    just reading them updates their reference counts. The buffer and the array
+    of offsets are single objects, and only their headers get written to.
+    """
+
+    def __init__(self, flashcards: Mapping[str, str]):
+        cards = sorted(
+            (key.encode("utf-8"), answer.encode("utf-8"))
+            for key, answer in flashcards.items()
+        )
+        self._text = b"".join(key + answer for key, answer in cards)
+        # The key of card n starts at offsets[2n], its answer at offsets[2n + 1],
+        # and the next card at offsets[2n + 2]
+        lengths = (len(text) for card in cards for text in card)
+        self._offsets = array("Q", itertools.accumulate(lengths, initial=0))
+        self._count = len(cards)
+
+    @classmethod
+    def from_buffer(cls, buffer) -> "SharedDeck":
+        """
+        :param buffer: a deck written by SharedDeck.write, for example a memory
+        mapped file. Its slices must be bytes. The flashcards are read from the
+        buffer, without copying it.
+        """
+        deck = cls({})
+        end = len(buffer) - _TRAILER.size
+        text_size, deck._count = _TRAILER.unpack_from(buffer, end)
+        deck._text = buffer
+        deck._offsets = memoryview(buffer)[text_size:end].cast("Q")
+        return deck
+
+    def write(self, file: BinaryIO):
+        """
+        Write the deck to a binary file, to be read back with from_buffer
+        """
+        # Align the offsets on their size
+        padding = bytes(-len(self._text) % self._offsets.itemsize)
+        file.write(self._text)
+        file.write(padding)
+        file.write(self._offsets)
+        file.write(_TRAILER.pack(len(self._text) + len(padding), self._count))
+
+    def key_bytes(self, index: int) -> bytes:
+        """
+        :return: the key of the nth card, encoded in utf-8
+        """
+        return self._text[self._offsets[2 * index] : self._offsets[2 * index + 1]]
+
+    def _index(self, key: str) -> int:
+        key_bytes = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_bytes(middle) < key_bytes:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._count or self.key_bytes(low) != key_bytes:
+            raise KeyError(key)
+        return low
+
+    def __getitem__(self, key: str) -> str:
+        index = self._index(key)
+        answer = self._text[self._offsets[2 * index + 1] : self._offsets[2 * index + 2]]
+        return answer.decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self.key_bytes(index).decode("utf-8")
+
+
+class _SharedDeckKeys(Sequence):
+    def __init__(self, deck: SharedDeck):
+        self._deck = deck
+
+    def __len__(self) -> int:
+        return len(self._deck)
+
+    def __getitem__(self, index: int) -> str:
+        return self._deck.key_bytes(index).decode("utf-8")
+
+
+class SharedDeckProvider(FlashcardProvider):
+    """
+    Flashcards loaded by the parent process, and shared with the workers.
+
+    What a game reads from the whole deck is computed once, before forking, so
+    that the workers only read the flashcards they deal.
+    """
+
+    def __init__(self, deck: SharedDeck, max_lengths: tuple[int, int]):
+        self._deck = deck
+        self._max_lengths = max_lengths
+
+    @classmethod
+    def pack(cls, provider: FlashcardProvider) -> "SharedDeckProvider":
+        """
+        :return: the flashcards of another provider, packed in a shared deck
+        """
+        return cls(SharedDeck(provider.flashcards()), provider.max_lengths())
+
+    def flashcards(self) -> Mapping[str, str]:
+        return self._deck
+
+    def max_lengths(self) -> tuple[int, int]:
+        return self._max_lengths
+
+    def dealer(self, deck: Mapping[str, str]) -> Dealer:
+        if deck is not self._deck:
+            return super().dealer(deck)
+        return PermutationDealer(_SharedDeckKeys(self._deck))
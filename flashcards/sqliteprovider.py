@@ -0,0 +1,238 @@
+"""
+Read flashcards from a sqlite database.
+
+The database is meant for large decks, shared with other tools. Nothing is read
+up front: the number of cards and the longest key and answer are kept up to date
+by the database itself, and the text of a card is only fetched when it is played.
+
+Each card may belong to a deck, or chapter, and have tags. Both are used like
+the tags of a csv deck to filter the flashcards.
+"""
+import sqlite3
+from collections import defaultdict
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Iterable, Optional
+
+from flashcards.dealer import Dealer, RandomPermutation
+from flashcards.provider import FlashcardProvider
+from flashcards.tags import TagIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    answer TEXT NOT NULL,
+    deck TEXT
+);
+CREATE INDEX IF NOT EXISTS cards_answer ON cards(answer);
+CREATE INDEX IF NOT EXISTS cards_deck ON cards(deck);
+CREATE INDEX IF NOT EXISTS cards_key_length ON cards(length(key));
+CREATE INDEX IF NOT EXISTS cards_answer_length ON cards(length(answer));
+
+CREATE TABLE IF NOT EXISTS card_tags (
+    tag TEXT NOT NULL,
+    card_id INTEGER NOT NULL REFERENCES cards(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, card_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS card_tags_card_id ON card_tags(card_id);
+
+CREATE TABLE IF NOT EXISTS deck_stats (card_count INTEGER NOT NULL);
+INSERT INTO deck_stats SELECT count(*) FROM cards
+    WHERE NOT EXISTS (SELECT * FROM deck_stats);
+CREATE TRIGGER IF NOT EXISTS cards_insert AFTER INSERT ON cards
+    BEGIN UPDATE deck_stats SET card_count = card_count + 1; END;
+CREATE TRIGGER IF NOT EXISTS cards_delete AFTER DELETE ON cards
+    BEGIN UPDATE deck_stats SET card_count = card_count - 1; END;
+"""
+
+
+def write_sqlite_deck(
+    database_path: str,
+    cards: Iterable[tuple[str, str]],
+    tags: Optional[Mapping[str, list[str]]] = None,
+    deck: Optional[str] = None,
+):
+    """
+    Add flashcards to a sqlite database, creating it if needed. A card whose key
+    is already in the database gets the new answer.
+    :param cards: the key and answer of each card
+    :param tags: the tags of the cards which have tags, replacing those they
+    had. Read once all the cards are written: it may be filled as they are read.
+    :param deck: the deck or chapter of the cards
+    """
+    with sqlite3.connect(database_path) as connection:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO cards (key, answer, deck) VALUES (?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET answer = excluded.answer,"
+            " deck = coalesce(excluded.deck, deck)",
+            ((key, answer, deck) for key, answer in cards),
+        )
+        if tags:
+            connection.executemany(
+                "DELETE FROM card_tags"
+                " WHERE card_id = (SELECT id FROM cards WHERE key = ?)",
+                ((key,) for key in tags),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO card_tags (tag, card_id)"
+                " SELECT ?, id FROM cards WHERE key = ?",
+                ((tag, key) for key, key_tags in tags.items() for tag in key_tags),
+            )
+    connection.close()
+
+
+def read_sqlite_deck(
+    database_path: str, tags: Optional[dict[str, list[str]]] = None
+) -> Iterator[tuple[str, str]]:
+    """
+    :param tags: if given, filled with the deck and tags of each card before
+    the card is returned
+    :return: the key and answer of each card of a sqlite database, in the order
+    they were added
+    """
+    connection = _connect(database_path)
+    try:
+        if tags is None:
+            yield from connection.execute("SELECT key, answer FROM cards ORDER BY id")
+            return
+        # Both sorted by card id: the tags of each card come after those of
+        # the cards before it
+        card_tags = connection.execute(
+            "SELECT card_id, tag FROM card_tags ORDER BY card_id"
+        )
+        next_tag = next(card_tags, None)
+        for card_id, key, answer, deck in connection.execute(
+            "SELECT id, key, answer, deck FROM cards ORDER BY id"
+        ):
+            key_tags = [deck] if deck else []
+            while next_tag and next_tag[0] <= card_id:
+                if next_tag[0] == card_id:
+                    key_tags.append(next_tag[1])
+                next_tag = next(card_tags, None)
+            if key_tags:
+                tags[key] = key_tags
+            yield key, answer
+    finally:
+        connection.close()
+
+
+def _connect(database_path: str) -> sqlite3.Connection:
+    # Open read-only: the game never changes the deck
+    uri = Path(database_path).absolute().as_uri()
+    return sqlite3.connect(f"{uri}?mode=ro", uri=True)
+
+
+class RowidDealer(Dealer):
+    """
+    Deal every card of a sqlite deck once, in a random order, by visiting the
+    rowids in a pseudo-random permutation. Rowids of deleted cards are skipped.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, card_count: int, max_rowid: int):
+        self._connection = connection
+        self._card_count = card_count
+        self._max_rowid = max_rowid
+        self._permutation = RandomPermutation(max_rowid)
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._card_count
+
+    def next_key(self) -> Optional[str]:
+        while self._position < self._max_rowid:
+            rowid = self._permutation[self._position] + 1
+            self._position += 1
+            row = self._connection.execute(
+                "SELECT key FROM cards WHERE id = ?", (rowid,)
+            ).fetchone()
+            if row:
+                return row[0]
+        return None
+
+
+class SqliteDeck(Mapping):
+    """
+    Flashcards of a sqlite database, read on demand
+    """
+
+    def __init__(self, connection: sqlite3.Connection, card_count: int):
+        self._connection = connection
+        self._card_count = card_count
+
+    def __getitem__(self, key: str) -> str:
+        row = self._connection.execute(
+            "SELECT answer FROM cards WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return row[0]
+
+    def __len__(self) -> int:
+        return self._card_count
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self._connection.execute("SELECT key FROM cards ORDER BY id"):
+            yield key
+
+
+class SqliteFlashcardProvider(FlashcardProvider):
+    """
+    Provide flashcards from a sqlite database
+    """
+
+    def __init__(self, database_path: str, mmap_size: int = 0):
+        """
+        :param mmap_size: how many bytes of the database to read through a
+        memory map rather than with read calls. The pages of a memory mapped
+        file are shared by all the processes reading it.
+        :raise ValueError: if the file isn't a flashcards database
+        """
+        try:
+            self._connection = _connect(database_path)
+            if mmap_size:
+                self._connection.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+            (card_count,) = self._connection.execute(
+                "SELECT card_count FROM deck_stats"
+            ).fetchone()
+        except sqlite3.DatabaseError as error:
+            raise ValueError(f"Invalid sqlite deck {database_path}: {error}") from error
+        self._deck = SqliteDeck(self._connection, card_count)
+
+    def close(self):
+        """
+        Close the connection to the database
+        """
+        self._connection.close()
+
+    def flashcards(self) -> Mapping[str, str]:
+        return self._deck
+
+    def max_lengths(self) -> tuple[int, int]:
+        # Both queries are answered by the indexes on the lengths
+        (max_key_length,) = self._connection.execute(
+            "SELECT max(length(key)) FROM cards"
+        ).fetchone()
+        (max_answer_length,) = self._connection.execute(
+            "SELECT max(length(answer)) FROM cards"
+        ).fetchone()
+        return max_key_length or 0, max_answer_length or 0
+
+    def dealer(self, deck: Mapping[str, str]) -> Dealer:
+        if deck is not self._deck:
+            return super().dealer(deck)
+        (max_rowid,) = self._connection.execute("SELECT max(id) FROM cards").fetchone()
+        return RowidDealer(self._connection, len(self._deck), max_rowid or 0)
+
+    def tag_index(self) -> Optional[TagIndex]:
+        # The deck of a card is one of its tags
+        tags = defaultdict(list)
+        for key, tag in self._connection.execute(
+            "SELECT key, deck FROM cards WHERE deck IS NOT NULL"
+            " UNION ALL SELECT key, tag FROM card_tags JOIN cards ON id = card_id"
+        ):
+            tags[key].append(tag)
+        if not tags:
+            return None
+        return TagIndex(list(self._deck), tags)
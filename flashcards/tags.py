@@ -0,0 +1,174 @@
+"""
+Select flashcards by their tags.
+
+Each tag is indexed as a bitmap, stored in a python int: bit n is set if the
+nth flashcard of the deck has the tag. A filter expression such as
+"irregular and chapter3 and not mastered" is evaluated with bitwise operations
+on these ints, without looking at the flashcards themselves.
+"""
+import re
+from collections import defaultdict
+from typing import Iterator
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_NON_ZERO_BYTE = re.compile(b"[^\x00]")
+_OPERATORS = {"and", "or", "not"}
+
+
+class FilterSyntaxError(ValueError):
+    """
+    The filter expression is not valid
+    """
+
+
+def _build_bitmap(ordinals: list[int]) -> int:
+    # Setting the bits of an int one at a time would copy the whole int for
+    # each bit: set them in a bytearray instead.
+    bitmap = bytearray(ordinals[-1] // 8 + 1)
+    for ordinal in ordinals:
+        bitmap[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+def _set_bits(bitmap: int) -> Iterator[int]:
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    # Let the regular expression engine skip the runs of zero bytes
+    for match in _NON_ZERO_BYTE.finditer(data):
+        byte_index = match.start()
+        byte = data[byte_index]
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield byte_index * 8 + bit
+
+
+class TagIndex:
+    """
+    Bitmaps of the flashcards having each tag
+    """
+
+    def __init__(self, keys: list[str], tags: dict[str, list[str]]):
+        """
+        :param keys: the keys of all the flashcards of the deck
+        :param tags: the tags of the flashcards which have tags
+        """
+        self._keys = keys
+        ordinals = defaultdict(list)
+        for ordinal, key in enumerate(keys):
+            for tag in tags.get(key, ()):
+                ordinals[tag].append(ordinal)
+        self._bitmaps = {
+            tag: _build_bitmap(tag_ordinals) for tag, tag_ordinals in ordinals.items()
+        }
+        self._all = (1 << len(keys)) - 1
+
+    @property
+    def tags(self) -> list[str]:
+        """
+        :return: all the tags used in the deck
+        """
+        return sorted(self._bitmaps)
+
+    def evaluate(self, expression: str) -> int:
+        """
+        :param expression: tags combined with "and", "or", "not" and parentheses.
+        Tags containing spaces or parentheses can be quoted with double quotes.
+        :return: the bitmap of the flashcards matching the expression
+        :raise FilterSyntaxError: if the expression isn't valid
+        """
+        parser = _FilterParser(expression, self._bitmaps, self._all)
+        return parser.parse()
+
+    def select(self, expression: str) -> list[str]:
+        """
+        :return: the keys of the flashcards matching the filter expression
+        :raise FilterSyntaxError: if the expression isn't valid
+        """
+        bitmap = self.evaluate(expression)
+        return [self._keys[ordinal] for ordinal in _set_bits(bitmap)]
+
+
+# Ignore too few public methods: parse is the single entry point
+# pylint: disable=too-few-public-methods
+class _FilterParser:
+    """
+    Recursive descent parser of filter expressions, evaluating them as it goes:
+    expression := term ("or" term)*
+    term := factor ("and" factor)*
+    factor := "not" factor | "(" expression ")" | tag
+    """
+
+    def __init__(self, expression: str, bitmaps: dict[str, int], all_bits: int):
+        self._tokens = self._tokenize(expression)
+        self._position = 0
+        self._bitmaps = bitmaps
+        self._all = all_bits
+
+    @staticmethod
+    def _tokenize(expression: str) -> list[tuple[str, str]]:
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN.match(expression, position)
+            if not match:
+                raise FilterSyntaxError(f"Invalid filter: {expression}")
+            opening, closing, quoted, word = match.groups()
+            if opening or closing:
+                tokens.append((opening or closing, ""))
+            elif quoted is not None:
+                tokens.append(("tag", quoted))
+            elif word.lower() in _OPERATORS:
+                tokens.append((word.lower(), ""))
+            else:
+                tokens.append(("tag", word))
+            position = match.end()
+        return tokens
+
+    def _peek(self) -> str:
+        if self._position < len(self._tokens):
+            return self._tokens[self._position][0]
+        return ""
+
+    def _next(self) -> tuple[str, str]:
+        if self._position >= len(self._tokens):
+            raise FilterSyntaxError("Unexpected end of filter")
+        token = self._tokens[self._position]
+        self._position += 1
+        return token
+
+    def parse(self) -> int:
+        """
+        :return: the bitmap of the flashcards matching the whole expression
+        """
+        result = self._expression()
+        if self._position < len(self._tokens):
+            raise FilterSyntaxError(f"Unexpected {self._tokens[self._position][0]}")
+        return result
+
+    def _expression(self) -> int:
+        result = self._term()
+        while self._peek() == "or":
+            self._next()
+            result |= self._term()
+        return result
+
+    def _term(self) -> int:
+        result = self._factor()
+        while self._peek() == "and":
+            self._next()
+            result &= self._factor()
+        return result
+
+    def _factor(self) -> int:
+        kind, tag = self._next()
+        if kind == "not":
+            return self._all & ~self._factor()
+        if kind == "(":
+            result = self._expression()
+            if self._next()[0] != ")":
+                raise FilterSyntaxError("Missing )")
+            return result
+        if kind == "tag":
+            # A tag which no flashcard has matches nothing
+            return self._bitmaps.get(tag, 0)
+        raise FilterSyntaxError(f"Unexpected {kind}")
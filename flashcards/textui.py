@@ -1,12 +1,27 @@
 """
 Simple text console user interface
 """
-from typing import Callable
+import sys
+from typing import Callable, Optional, TextIO
 
 from flashcards.ui import Ui
 
 Translator = Callable[[str], str]
 
+# Size of the buffers of the piped ui: large enough that a scripted game
+# makes few read and write system calls
+PIPE_BUFFER_SIZE = 1024 * 1024
+
+
+def _picked(guess: str, choices: list[str]) -> str:
+    """
+    :return: the choice whose number is the guess, or the guess
+    """
+    number = guess.strip()
+    if number.isdecimal() and 1 <= int(number) <= len(choices):
+        return choices[int(number) - 1]
+    return guess
+
 
 class TextUi(Ui):
     """
@@ -26,6 +41,11 @@ class TextUi(Ui):
     def input_guess(self, flashcard: str, max_answer_length: int) -> str:
         return input(self._("guess_prompt"))
 
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        for number, choice in enumerate(choices, 1):
+            print(f"{number}. {choice}")
+        return _picked(self.input_guess(flashcard, max(map(len, choices))), choices)
+
     def input_replay_missed_cards(self) -> bool:
         return input(self._("play_again")).casefold() == self._("answer_yes").casefold()
 
@@ -41,3 +61,99 @@ class TextUi(Ui):
                 correct_count=correct_count, guessed_count=guessed_count
             )
         )
+
+
+# pylint: disable=too-many-instance-attributes
+class PipedTextUi(TextUi):
+    """
+    Text interface for when the input and output are redirected, for example
+    in scripted drills: the guesses are read one per line without prompts, and
+    the output is only written when the buffer is full or the game is over.
+    """
+
+    def __init__(
+        self,
+        translator: Translator,
+        input_stream: Optional[TextIO] = None,
+        output_stream: Optional[TextIO] = None,
+    ):
+        """
+        :param input_stream: where to read the guesses. Default is stdin.
+        :param output_stream: where to write the game. Default is stdout.
+        """
+        super().__init__(translator)
+        # pylint: disable=consider-using-with
+        # The streams share the fds of stdin and stdout, which aren't closed
+        # with them (closefd=False): they live as long as the ui
+        if input_stream is None:
+            input_stream = open(
+                sys.stdin.fileno(),
+                encoding=sys.stdin.encoding,
+                buffering=PIPE_BUFFER_SIZE,
+                closefd=False,
+            )
+        if output_stream is None:
+            sys.stdout.flush()
+            output_stream = open(
+                sys.stdout.fileno(),
+                "w",
+                encoding=sys.stdout.encoding,
+                buffering=PIPE_BUFFER_SIZE,
+                closefd=False,
+            )
+        self._readline = input_stream.readline
+        self._write = output_stream.write
+        self._output = output_stream
+        # Translate the messages once, rather than for each flashcard
+        self._progress = self._("progress") + "\n"
+        self._flashcard = self._("display_flashcard") + "\n"
+        self._right_guess = self._("right_guess") + "\n"
+        self._wrong_guess = self._("wrong_guess") + "\n"
+        self._game_score = self._("game_score") + "\n"
+        self._answer_yes = self._("answer_yes").casefold()
+
+    def _read_line(self) -> Optional[str]:
+        line = self._readline()
+        if not line:
+            return None
+        return line.rstrip("\r\n")
+
+    def display_flashcard(
+        self, index: int, total: int, flashcard: str, max_key_length: int
+    ):
+        self._write(
+            self._progress.format(index=index, total=total)
+            + self._flashcard.format(key=flashcard)
+        )
+
+    def input_guess(self, flashcard: str, max_answer_length: int) -> str:
+        guess = self._read_line()
+        if guess is None:
+            raise EOFError
+        return guess
+
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        self._write(
+            "".join(f"{number}. {choice}\n" for number, choice in enumerate(choices, 1))
+        )
+        return _picked(self.input_guess(flashcard, max(map(len, choices))), choices)
+
+    def input_replay_missed_cards(self) -> bool:
+        answer = self._read_line()
+        return answer is not None and answer.casefold() == self._answer_yes
+
+    def display_right_guess(self, key: str, correct_answer: str):
+        self._write(self._right_guess)
+
+    def display_wrong_guess(self, key: str, guess: str, correct_answer: str):
+        self._write(self._wrong_guess.format(correct_answer=correct_answer))
+
+    def display_score(self, correct_count: int, guessed_count: int):
+        self._write(
+            self._game_score.format(
+                correct_count=correct_count, guessed_count=guessed_count
+            )
+        )
+
+    def game_over(self):
+        self._output.flush()
@@ -2,6 +2,7 @@
 Define the Ui functions for the flashcard game
 """
 import abc
+from typing import Mapping
 
 
 class Ui(metaclass=abc.ABCMeta):
@@ -9,6 +10,17 @@ class Ui(metaclass=abc.ABCMeta):
     Interface to interact with the user in the flashcard game
     """
 
+    def prepare(self, flashcards: Mapping[str, str]):
+        """
+        Called once the flashcards of the game are loaded, before the first
+        one is displayed
+        """
+
+    def add_flashcards(self, flashcards: Mapping[str, str]):
+        """
+        Called when flashcards are added or updated during the game
+        """
+
     @abc.abstractmethod
     def display_flashcard(
         self, index: int, total: int, flashcard: str, max_key_length: int
@@ -23,6 +35,13 @@ class Ui(metaclass=abc.ABCMeta):
         Input the user's guess for the given flaskcard
         """
 
+    @abc.abstractmethod
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        """
+        Input the user's guess for the given flashcard, among the choices
+        :return: the choice picked by the user, or what they typed
+        """
+
     @abc.abstractmethod
     def input_replay_missed_cards(self) -> bool:
         """
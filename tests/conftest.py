@@ -6,6 +6,9 @@ from os import path
 
 import pytest
 
+from flashcards.cursesui.screen import Screen
+from flashcards.cursesui.virtualscreen import VirtualScreen
+from flashcards.engine import Engine
 from flashcards.provider import FlashcardProvider
 from tests.fakes import FakeCursesUi, FakeUi, FakeFlashcardProvider
 
@@ -22,18 +25,43 @@ def fixture_ui_factory():
     return _make_ui
 
 
+@pytest.fixture(name="play_game")
+def fixture_play_game(ui_factory):
+    """
+    :return: Function playing a game of a provider with hardcoded guesses, and
+    returning the number of right guesses and of guesses
+    """
+
+    def _play_game(
+        provider: FlashcardProvider, guesses: dict[str, str]
+    ) -> tuple[int, int]:
+        game_ui = ui_factory(guesses)
+        Engine(game_ui=game_ui, provider=provider).play()
+        return game_ui.correct_count, game_ui.guessed_count
+
+    return _play_game
+
+
 @pytest.fixture(name="curses_ui_factory")
 def fixture_curses_ui_factory(translations):
     """
     :return: Factory to create a curses Ui with hardcoded guesses
     """
 
-    def _make_curses_ui(guesses: dict[str:str]) -> FakeCursesUi:
-        return FakeCursesUi(translations=translations, guesses=guesses)
+    def _make_curses_ui(guesses: dict[str:str], screen: Screen = None) -> FakeCursesUi:
+        return FakeCursesUi(translations=translations, guesses=guesses, screen=screen)
 
     return _make_curses_ui
 
 
+@pytest.fixture(name="virtual_screen")
+def fixture_virtual_screen():
+    """
+    :return: an in-memory screen, to run the curses ui without a terminal
+    """
+    return VirtualScreen(lines=24, cols=80)
+
+
 @pytest.fixture(name="provider_factory")
 def fixture_provider_factory():
     """
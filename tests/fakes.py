@@ -1,9 +1,10 @@
 """
 Provide fake implementations of classes for tests
 """
-import curses
+from typing import Optional
 
 from flashcards.cursesui.cursesui import CursesUi, Translator
+from flashcards.cursesui.screen import Screen
 from flashcards.provider import FlashcardProvider
 from flashcards.ui import Ui
 
@@ -30,6 +31,7 @@ class FakeUi(Ui):
         self.correct_count = 0
         self.guessed_count = 0
         self.guesses = guesses
+        self.choices = []
 
     def display_flashcard(
         self, index: int, total: int, flashcard: str, max_key_length: int
@@ -45,6 +47,10 @@ class FakeUi(Ui):
     def input_guess(self, flashcard: str, max_answer_length: int) -> str:
         return self.guesses.get(flashcard)
 
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        self.choices = choices
+        return self.guesses.get(flashcard)
+
     def input_replay_missed_cards(self) -> bool:
         return False
 
@@ -58,16 +64,20 @@ class FakeCursesUi(CursesUi):
     Simlate a curses ui. The user input is done with calls to ungetch
     """
 
-    def __init__(self, translations: Translator, guesses: dict[str:str]):
-        super().__init__(translations)
+    def __init__(
+        self,
+        translations: Translator,
+        guesses: dict[str:str],
+        screen: Optional[Screen] = None,
+    ):
+        super().__init__(translations, screen)
         self.correct_count = 0
         self.guessed_count = 0
         self.guesses = guesses
 
-    @staticmethod
-    def _fake_user_input(text: str):
+    def _fake_user_input(self, text: str):
         for char in text[::-1]:
-            curses.ungetch(ord(char))
+            self._screen.ungetch(ord(char))
 
     def input_guess(self, flashcard: str, max_answer_length: int) -> str:
         guess = self.guesses.get(flashcard)
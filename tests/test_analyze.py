@@ -0,0 +1,93 @@
+"""
+Tests for recording guesses and analyzing them
+"""
+import datetime
+
+import pytest
+
+from flashcards import analyze, history
+from flashcards.engine import Engine
+from flashcards.history import HistoryRecorder, load_history
+
+
+def _record_events(directory):
+    day = 86400
+    with HistoryRecorder(directory) as recorder:
+        recorder.record("hello", True, 10 * day, 1.0)
+        recorder.record("goodbye", False, 10 * day + 5, 4.0)
+        recorder.record("cold", False, 11 * day, 2.0)
+    with HistoryRecorder(directory) as recorder:
+        recorder.record("goodbye", True, 11 * day + 1, 3.0)
+        recorder.record("cold", False, 11 * day + 2, 5.0)
+
+
+@pytest.fixture(name="without_numpy", params=[True, False])
+def fixture_without_numpy(request, monkeypatch):
+    """
+    Run the test with and without numpy
+    """
+    if request.param:
+        monkeypatch.setattr(history, "numpy", None)
+        monkeypatch.setattr(analyze, "numpy", None)
+    elif history.numpy is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+# pylint: disable=unused-argument
+def test_load_history(tmp_path, without_numpy):
+    """
+    Check that the recorded guesses are read back into columns
+    """
+    _record_events(tmp_path)
+    # A partially written record is ignored
+    with open(tmp_path / history.EVENTS_FILE, "ab") as events_file:
+        events_file.write(b"\0\0\0")
+
+    loaded = load_history(tmp_path)
+    assert loaded.cards == ["hello", "goodbye", "cold"]
+    assert list(loaded.card) == [0, 1, 2, 1, 2]
+    assert list(loaded.correct) == [1, 0, 0, 1, 0]
+    assert list(loaded.latency) == [1.0, 4.0, 2.0, 3.0, 5.0]
+    assert loaded.timestamp[1] == 864005
+
+
+# pylint: disable=unused-argument
+def test_analyze(tmp_path, without_numpy):
+    """
+    Check the accuracy and latency statistics
+    """
+    _record_events(tmp_path)
+    report = analyze.analyze(load_history(tmp_path), top=2)
+    assert report.reviews == 5
+    assert report.accuracy == pytest.approx(0.4)
+    assert report.latency_percentiles[50] == pytest.approx(3.0)
+    assert report.latency_percentiles[90] == pytest.approx(4.6)
+    assert [(day.day, day.reviews) for day in report.days] == [
+        (datetime.date(1970, 1, 11), 2),
+        (datetime.date(1970, 1, 12), 3),
+    ]
+    assert report.days[1].accuracy == pytest.approx(1 / 3)
+    assert [(card.card, card.reviews) for card in report.hardest_cards] == [
+        ("cold", 2),
+        ("goodbye", 2),
+    ]
+    assert report.hardest_cards[1].accuracy == pytest.approx(0.5)
+    assert "cold" in analyze.format_report(report)
+
+
+def test_engine_records_history(tmp_path, provider_factory, ui_factory):
+    """
+    Check that the engine records the result of each guess
+    """
+    provider = provider_factory({"hello": "hola", "goodbye": "adiós"})
+    game_ui = ui_factory({"hello": "hola", "goodbye": "au revoir"})
+    with HistoryRecorder(tmp_path) as recorder:
+        Engine(game_ui=game_ui, provider=provider, history=recorder).play()
+
+    loaded = load_history(tmp_path)
+    results = {
+        loaded.cards[card_id]: correct
+        for card_id, correct in zip(loaded.card, loaded.correct)
+    }
+    assert results == {"hello": 1, "goodbye": 0}
@@ -0,0 +1,120 @@
+"""
+Tests for the Anki package provider
+"""
+import sqlite3
+import tempfile
+import zipfile
+
+import pytest
+
+from flashcards.ankiprovider import (
+    COLLECTION_SCHEMA,
+    AnkiFlashcardProvider,
+    html_to_text,
+    read_apkg_deck,
+)
+from flashcards.convert import convert
+from flashcards.engine import Engine
+
+
+def _write_package(apkg_path, collection_name, notes):
+    collection_path = apkg_path.with_suffix(".db")
+    with sqlite3.connect(collection_path) as connection:
+        connection.executescript(COLLECTION_SCHEMA)
+        connection.executemany(
+            "INSERT INTO notes VALUES (?, '', 1, 0, -1, '', ?, '', 0, 0, '')",
+            enumerate(notes, start=1),
+        )
+    connection.close()
+    with zipfile.ZipFile(apkg_path, "w") as archive:
+        archive.write(collection_path, collection_name)
+        archive.writestr("media", '{"0": "hello.mp3"}')
+        archive.writestr("0", b"not really a sound")
+
+
+def test_html_to_text():
+    """
+    Check that the markup of the Anki fields is removed
+    """
+    assert html_to_text("<b>hello</b>") == "hello"
+    assert html_to_text("cold<br>weather") == "cold weather"
+    assert html_to_text("<div>one</div><div>two</div>") == "one two"
+    assert html_to_text("bread &amp; butter&nbsp;") == "bread & butter"
+    assert html_to_text("hello [sound:hello.mp3]") == "hello"
+
+
+def test_read_apkg_deck(tmp_path):
+    """
+    Check that we are able to read the notes of a package exported by Anki
+    """
+    apkg_path = tmp_path / "deck.apkg"
+    _write_package(
+        apkg_path,
+        "collection.anki21",
+        [
+            "<b>hello</b>\x1fbonjour [sound:hello.mp3]",
+            "cold\x1ffroid\x1fextra field",
+            "lonely field",
+        ],
+    )
+    assert list(read_apkg_deck(apkg_path)) == [
+        ("hello", "bonjour"),
+        ("cold", "froid"),
+    ]
+
+
+def test_read_apkg_deck_errors(tmp_path):
+    """
+    Check that the packages we can't read are reported
+    """
+    apkg_path = tmp_path / "deck.apkg"
+    with zipfile.ZipFile(apkg_path, "w") as archive:
+        archive.writestr("collection.anki21b", b"compressed")
+    with pytest.raises(ValueError, match="compressed"):
+        list(read_apkg_deck(apkg_path))
+
+    not_a_zip_path = tmp_path / "deck.csv.apkg"
+    not_a_zip_path.write_text("hello,bonjour\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Not an Anki package"):
+        list(read_apkg_deck(not_a_zip_path))
+
+
+def test_anki_engine_score(tmp_path, ui_factory, monkeypatch):
+    """
+    Test that the engine calculates the expected score with an Anki package
+    converted from a csv file, that closing the provider removes its temporary
+    database, and that the package converts back to the same csv file
+    """
+    csv_path = tmp_path / "deck.csv"
+    csv_path.write_text(
+        "hello,hola\ngoodbye,adiós\nfish & chips,<pescado> y patatas\n",
+        encoding="utf-8",
+    )
+    apkg_path = tmp_path / "deck.apkg"
+    convert(str(csv_path), str(apkg_path))
+
+    temporary_dir = tmp_path / "tmp"
+    temporary_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temporary_dir))
+    provider = AnkiFlashcardProvider(str(apkg_path))
+    assert provider.max_lengths() == (12, 19)
+    game_ui = ui_factory(
+        {
+            "hello": "hola",
+            "goodbye": "au revoir",
+            "fish & chips": "<pescado> y patatas",
+        }
+    )
+    engine = Engine(game_ui=game_ui, provider=provider)
+    engine.play()
+    assert game_ui.guessed_count == 3
+    assert game_ui.correct_count == 2
+    provider.close()
+    assert not list(temporary_dir.iterdir())
+
+    convert(str(apkg_path), str(tmp_path / "copy.csv"))
+    assert (tmp_path / "copy.csv").read_text(encoding="utf-8").splitlines() == [
+        "hello,hola",
+        "goodbye,adiós",
+        "fish & chips,<pescado> y patatas",
+    ]
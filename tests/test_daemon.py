@@ -0,0 +1,136 @@
+"""
+Tests of the daemon keeping decks in memory
+"""
+import io
+import mmap
+import os
+import socket
+import threading
+
+from flashcards.daemon import (
+    DeckCache,
+    DeckDaemon,
+    _DeckRequestHandler,
+    load_warm_deck,
+)
+from flashcards.daemonclient import fetch_deck
+from flashcards.shareddeck import SharedDeck
+
+
+def _read_deck(deck_fd: int) -> dict[str, str]:
+    try:
+        with mmap.mmap(deck_fd, 0, access=mmap.ACCESS_READ) as buffer:
+            return dict(SharedDeck.from_buffer(buffer))
+    finally:
+        os.close(deck_fd)
+
+
+def test_shared_deck_buffer():
+    """
+    Check that a written deck can be read back from a buffer
+    """
+    flashcards = {"hello": "hola", "goodbye": "adiós", "猫": "gato", "": "nada"}
+    file = io.BytesIO()
+    SharedDeck(flashcards).write(file)
+    deck = SharedDeck.from_buffer(file.getvalue())
+    assert len(deck) == 4
+    assert dict(deck) == flashcards
+    assert "hell" not in deck
+
+    file = io.BytesIO()
+    SharedDeck({}).write(file)
+    assert not SharedDeck.from_buffer(file.getvalue())
+
+
+def test_deck_cache(tmp_path):
+    """
+    Check that the decks are loaded once, reloaded when they change, and that
+    the least recently used ones are dropped to stay under the memory cap
+    """
+    paths = []
+    for index in range(3):
+        deck_path = tmp_path / f"deck{index}.csv"
+        deck_path.write_text(f"hello,hola {index}\ncold,frío\n", encoding="utf-8")
+        paths.append(str(deck_path))
+    deck_size = load_warm_deck(paths[0]).size
+    cache = DeckCache(memory_cap=2 * deck_size)
+
+    deck_fd, max_lengths = cache.open(paths[0])
+    assert _read_deck(deck_fd) == {"hello": "hola 0", "cold": "frío"}
+    assert max_lengths == (5, 6)
+    cache.open(paths[1])
+    os.close(cache.open(paths[0])[0])
+    assert cache.paths == [paths[1], paths[0]]
+    os.close(cache.open(paths[2])[0])
+    assert cache.paths == [paths[0], paths[2]]
+    assert cache.size == 2 * deck_size
+
+    (tmp_path / "deck0.csv").write_text("hello,salut\n", encoding="utf-8")
+    deck_fd, max_lengths = cache.open(paths[0])
+    assert _read_deck(deck_fd) == {"hello": "salut"}
+    assert max_lengths == (5, 5)
+    assert cache.paths == [paths[2], paths[0]]
+    cache.close()
+    assert not cache.paths
+
+
+def test_fetch_deck(tmp_path, play_game):
+    """
+    Check that a game plays the deck sent by the daemon, and that games load
+    their decks themselves when the daemon isn't running
+    """
+    deck_path = tmp_path / "deck.csv"
+    deck_path.write_text("hello,hola\ngoodbye,adiós\ncold,frío\n", encoding="utf-8")
+    socket_path = str(tmp_path / "daemon.sock")
+    assert fetch_deck(str(deck_path), socket_path) is None
+
+    daemon = DeckDaemon(socket_path, memory_cap=1024 * 1024)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        provider = fetch_deck(str(deck_path), socket_path)
+        assert provider.max_lengths() == (7, 5)
+        guesses = {"hello": "hola", "goodbye": "au revoir", "cold": "frío"}
+        assert play_game(provider, guesses) == (2, 3)
+
+        assert fetch_deck(str(tmp_path / "missing.csv"), socket_path) is None
+        assert daemon.cache.paths == [str(deck_path)]
+    finally:
+        daemon.shutdown()
+        daemon.server_close()
+        thread.join()
+
+
+def test_fetch_deck_of_other_user(tmp_path, monkeypatch):
+    """
+    Check that games don't play the deck of a daemon run by another user, who
+    could listen on the path of the socket
+    """
+    deck_path = tmp_path / "deck.csv"
+    deck_path.write_text("hello,hola\n", encoding="utf-8")
+    socket_path = str(tmp_path / "daemon.sock")
+    daemon = DeckDaemon(socket_path, memory_cap=1024 * 1024)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        assert fetch_deck(str(deck_path), socket_path) is not None
+        user = os.getuid()
+        monkeypatch.setattr(os, "getuid", lambda: user + 1)
+        assert fetch_deck(str(deck_path), socket_path) is None
+    finally:
+        daemon.shutdown()
+        daemon.server_close()
+        thread.join()
+
+
+def test_client_gone():
+    """
+    Check that the daemon doesn't fail on the requests of clients which went
+    away before the reply
+    """
+    for request in (b"", b"not json\n"):
+        server_connection, client_connection = socket.socketpair()
+        with client_connection:
+            client_connection.sendall(request)
+        with server_connection:
+            _DeckRequestHandler(server_connection, "", None)
@@ -0,0 +1,93 @@
+"""
+Tests for the order in which flashcards are dealt
+"""
+import random
+from collections import Counter
+
+from flashcards.dealer import PermutationDealer, RandomPermutation, WeightedDealer
+from flashcards.engine import Engine
+from flashcards.fenwick import FenwickTree
+
+
+def test_random_permutation():
+    """
+    Check that every index is visited exactly once
+    """
+    for size in (1, 2, 3, 10, 1000, 1025):
+        permutation = RandomPermutation(size)
+        assert sorted(permutation[index] for index in range(size)) == list(range(size))
+
+
+def test_permutation_dealer():
+    """
+    Check that every card of the sequence is dealt once, without changing it
+    """
+    keys = ("hello", "goodbye", "cold", "hot")
+    dealer = PermutationDealer(keys)
+    dealt = [dealer.next_key() for _ in range(len(keys))]
+    assert dealer.next_key() is None
+    assert sorted(dealt) == sorted(keys)
+    assert len(dealer) == 4
+
+
+def test_fenwick_tree():
+    """
+    Compare the Fenwick tree with sums of a plain list of weights
+    """
+    rng = random.Random(42)
+    weights = [rng.randint(0, 5) for _ in range(37)]
+    tree = FenwickTree(weights)
+    for _ in range(200):
+        index = rng.randrange(len(weights))
+        weights[index] = tree[index] = rng.randint(0, 5)
+        if rng.random() < 0.2:
+            weight = rng.randint(0, 5)
+            weights.append(weight)
+            tree.append(weight)
+        assert tree.total == sum(weights)
+        for count in range(len(weights) + 1):
+            assert tree.prefix_sum(count) == sum(weights[:count])
+        for value in range(0, tree.total, 3):
+            index = tree.find(value)
+            assert sum(weights[:index]) <= value < sum(weights[: index + 1])
+
+
+def test_weighted_dealer_prefers_missed_cards():
+    """
+    Check that the cards the user misses are dealt more often, but never twice
+    in a row
+    """
+    random.seed(1)
+    dealer = WeightedDealer(["hello", "goodbye", "cold", "hot"], rounds=2000)
+    dealt = []
+    while (key := dealer.next_key()) is not None:
+        dealt.append(key)
+        dealer.answered(key, correct=key != "cold")
+    assert len(dealt) == 2000
+    counts = Counter(dealt)
+    assert counts["cold"] > 2 * max(counts["hello"], counts["goodbye"], counts["hot"])
+    assert all(first != second for first, second in zip(dealt, dealt[1:]))
+
+
+def test_weighted_dealer_changes():
+    """
+    Check that cards can be added and removed during the game
+    """
+    dealer = WeightedDealer(["hello"], rounds=10)
+    assert [dealer.next_key() for _ in range(2)] == ["hello", "hello"]
+    dealer.add("goodbye")
+    dealer.remove("hello")
+    assert [dealer.next_key() for _ in range(2)] == ["goodbye", "goodbye"]
+    dealer.remove("goodbye")
+    assert dealer.next_key() is None
+
+
+def test_engine_weighted(provider_factory, ui_factory):
+    """
+    Test that the weighted engine deals as many cards as the deck has
+    """
+    provider = provider_factory({"hello": "hola", "goodbye": "adiós", "cold": "frío"})
+    game_ui = ui_factory({"hello": "hola", "goodbye": "au revoir", "cold": "frío"})
+    engine = Engine(game_ui=game_ui, provider=provider, weighted=True)
+    engine.play()
+    assert game_ui.guessed_count == 3
@@ -0,0 +1,95 @@
+"""
+Tests of the multiple choice games
+"""
+from flashcards.cursesui.cursesui import CursesUi
+from flashcards.distractors import DistractorIndex
+from flashcards.engine import Engine
+
+ANSWERS = ["manger", "mangez", "mange", "Manger", "ranger", "bouger", "chat", "x"]
+
+
+def test_similar():
+    """
+    Check that the answers which look the most like the given one come first
+    """
+    index = DistractorIndex(ANSWERS)
+    assert len(index) == 7
+    assert index.similar("manger", 1) == ["mange"]
+    assert set(index.similar("MANGER ", 3)) == {"mange", "mangez", "ranger"}
+    assert index.similar("manger", 4)[3] == "bouger"
+    # Answers which aren't in the deck
+    assert index.similar("mangé", 1) == ["mange"]
+
+
+def test_similar_fills_with_other_answers():
+    """
+    Check that other answers are picked when too few look alike, and that
+    the answer itself never is
+    """
+    index = DistractorIndex(ANSWERS)
+    similar = index.similar("chat", 6)
+    assert len(similar) == 6
+    assert len(set(similar)) == 6
+    assert "chat" not in similar
+    assert len(index.similar("chat", 10)) == 6
+    assert not DistractorIndex(["chat"]).similar("chat", 3)
+
+
+def test_add():
+    """
+    Check that the answers added to the index are offered like the others
+    """
+    index = DistractorIndex(["chat", "chien"])
+    index.add(["mangez", "CHAT", "manger"])
+    assert len(index) == 4
+    assert set(index.similar("mange", 2)) == {"manger", "mangez"}
+
+
+def test_multiple_choice_game(provider_factory, ui_factory):
+    """
+    Check that the user picks the answer of each flashcard among the choices
+    """
+    flashcards = {"eat": "manger", "tidy": "ranger", "move": "bouger", "cat": "chat"}
+    game_ui = ui_factory(
+        {"eat": "manger", "tidy": "bouger", "move": "bouger", "cat": "mange"}
+    )
+    engine = Engine(game_ui, provider_factory(flashcards), choices=3)
+    engine.play()
+    assert game_ui.guessed_count == 4
+    assert game_ui.correct_count == 2
+    assert len(game_ui.choices) == 3
+    assert len(set(game_ui.choices)) == 3
+
+
+def test_curses_choices(translations, virtual_screen, monkeypatch):
+    """
+    Check that the choices are shown under the flashcard, picked by their
+    number, and hidden once one is picked or the time is up
+    """
+    curses_ui = CursesUi(translations, virtual_screen, time_limit=5)
+    curses_ui.display_flashcard(index=1, total=3, flashcard="eat", max_key_length=5)
+    # The screen each time the user is about to press a key
+    screens = []
+    getch = virtual_screen.getch
+
+    def record_screen(delay: int = -1) -> int:
+        screens.append(virtual_screen.lines())
+        return getch(delay)
+
+    monkeypatch.setattr(virtual_screen, "getch", record_screen)
+    virtual_screen.type_keys("x2")
+    choices = ["mange", "manger", "mangez"]
+    assert curses_ui.input_choice("eat", choices) == "manger"
+    assert [line.strip() for line in screens[0][13:16]] == [
+        "1  mange",
+        "2  manger",
+        "3  mangez",
+    ]
+    assert "mange" not in "".join(virtual_screen.lines())
+
+    # Not a choice
+    virtual_screen.type_keys("9")
+    virtual_screen.pause(10)
+    assert not curses_ui.input_choice("eat", choices)
+    assert virtual_screen.monotonic() == 5
+    assert "mange" not in "".join(virtual_screen.lines())
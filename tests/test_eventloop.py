@@ -0,0 +1,57 @@
+"""
+Event loop tests, with the virtual time of an in-memory screen
+"""
+from curses.ascii import BEL
+
+from flashcards.cursesui.eventloop import EventLoop
+
+
+def test_timers_run_while_waiting_for_a_key(virtual_screen):
+    """
+    Check that the timers run on time, in order, while getch waits for a key
+    """
+    event_loop = EventLoop(virtual_screen)
+    runs = []
+    event_loop.call_every(1, lambda: runs.append(("tick", virtual_screen.monotonic())))
+    event_loop.call_later(
+        2.5, lambda: runs.append(("once", virtual_screen.monotonic()))
+    )
+    cancelled = event_loop.call_later(1.5, lambda: runs.append(("cancelled", 0)))
+    cancelled.cancel()
+    virtual_screen.pause(3.2)
+    virtual_screen.type_keys("a")
+    assert event_loop.getch(virtual_screen.stdscr) == ord("a")
+    assert runs == [("tick", 1), ("tick", 2), ("once", 2.5), ("tick", 3)]
+    # Only woken up when a timer was due
+    assert len(virtual_screen.frames) == 6
+
+
+def test_late_periodic_timer(virtual_screen):
+    """
+    Check that a periodic timer which is late doesn't run several times in a
+    row to catch up
+    """
+    event_loop = EventLoop(virtual_screen)
+    runs = []
+    event_loop.call_every(1, lambda: runs.append(virtual_screen.monotonic()))
+    # Blocked for a while, for example by a slow redraw
+    virtual_screen.stdscr.timeout(-1)
+    virtual_screen.pause(3.5)
+    virtual_screen.type_keys("a")
+    virtual_screen.stdscr.getch()
+    virtual_screen.pause(1)
+    virtual_screen.type_keys("b")
+    assert event_loop.getch(virtual_screen.stdscr) == ord("b")
+    assert runs == [3.5]
+
+
+def test_post_key(virtual_screen):
+    """
+    Check that a timer can end the wait for a key
+    """
+    event_loop = EventLoop(virtual_screen)
+    event_loop.call_later(1, lambda: event_loop.post_key(BEL))
+    virtual_screen.pause(5)
+    virtual_screen.type_keys("a")
+    assert event_loop.getch(virtual_screen.stdscr) == BEL
+    assert virtual_screen.monotonic() == 1
@@ -0,0 +1,82 @@
+"""
+Tests for the card ids and deck fingerprints
+"""
+import random
+
+import pytest
+
+from flashcards import fingerprint
+from flashcards.fingerprint import card_id, deck_fingerprint, diff_decks
+from flashcards.provider import DeckChanges
+
+
+def test_card_id():
+    """
+    Check that the id of a card only depends on its key and answer
+    """
+    assert card_id("hello", "bonjour") == card_id("hello", "bonjour")
+    assert card_id("hello", "bonjour") != card_id("hello", "salut")
+    assert card_id("ab", "c") != card_id("a", "bc")
+    assert len(card_id("hello", "bonjour")) == fingerprint.ID_SIZE
+
+
+def test_fingerprint_ignores_order():
+    """
+    Check that decks holding the same cards have the same fingerprint
+    """
+    cards = [(f"key {i}", f"answer {i}") for i in range(1000)]
+    digest = deck_fingerprint(dict(cards))
+    random.shuffle(cards)
+    assert deck_fingerprint(dict(cards)) == digest
+    assert deck_fingerprint(dict(cards[1:])) != digest
+
+
+@pytest.mark.parametrize("size", [0, 10, 5000])
+def test_diff(size):
+    """
+    Check that the diff of two versions of a deck finds every change
+    """
+    old_cards = {f"key {i}": f"answer {i}" for i in range(size)}
+    new_cards = dict(old_cards)
+    for i in range(0, size, 7):
+        new_cards[f"key {i}"] = "updated"
+    for i in range(3, size, 11):
+        new_cards.pop(f"key {i}", None)
+    for i in range(size // 10 + 1):
+        new_cards[f"new key {i}"] = f"new answer {i}"
+
+    changes = diff_decks(old_cards, new_cards)
+    assert changes.added == {
+        key: answer for key, answer in new_cards.items() if key not in old_cards
+    }
+    assert changes.updated == {
+        key: answer
+        for key, answer in new_cards.items()
+        if key in old_cards and old_cards[key] != answer
+    }
+    assert changes.removed == old_cards.keys() - new_cards.keys()
+
+    reverse = diff_decks(new_cards, old_cards)
+    assert reverse.added.keys() == changes.removed
+    assert reverse.removed == changes.added.keys()
+    assert diff_decks(old_cards, dict(old_cards)) == DeckChanges()
+
+
+def test_diff_command(tmp_path, capsys):
+    """
+    Check that the diff command prints the changes between two decks
+    """
+    old_path = tmp_path / "old.csv"
+    old_path.write_text("hello,bonjour\ngoodbye,au revoir\ncold,froid\n")
+    new_path = tmp_path / "new.csv"
+    new_path.write_text("cold,froid\nhello,salut\nyes,oui\n")
+    with pytest.raises(SystemExit) as exit_info:
+        fingerprint.main([str(old_path), str(new_path)])
+    assert exit_info.value.code == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:3] == ["- goodbye", "+ yes: oui", "~ hello: salut"]
+    assert lines[3].startswith(f"{old_path}: 3 cards, fingerprint ")
+
+    fingerprint.main([str(old_path), str(old_path)])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
@@ -1,9 +1,11 @@
 """
 Flashcard tests
 """
+import io
 
 from flashcards.csvprovider import CsvFlashcardProvider
 from flashcards.engine import Engine
+from flashcards.textui import PipedTextUi
 
 
 def test_csv_provider(tmp_path):
@@ -48,3 +50,44 @@ def test_curses_engine_score(provider_factory, curses_ui_factory):
     engine.play()
     assert game_ui.guessed_count == 3
     assert game_ui.correct_count == 2
+
+
+def test_piped_text_ui(provider_factory, translations):
+    """
+    Test that the piped ui reads one guess per line, and writes the game
+    without prompts once it's over
+    """
+    provider = provider_factory({"hello": "hola"})
+    output = io.StringIO()
+    game_ui = PipedTextUi(
+        translations, io.StringIO("adios\ny\nhola\n"), output_stream=output
+    )
+    engine = Engine(game_ui=game_ui, provider=provider)
+    engine.play()
+    assert engine.correct_count == 1
+    assert output.getvalue().splitlines() == [
+        "1 of 1",
+        "hello",
+        "Wrong answer 😭. The right answer is hola",
+        "Correctly guessed 0 out of 1.",
+        "1 of 1",
+        "hello",
+        "Correct! 👏",
+        "Correctly guessed 1 out of 1.",
+    ]
+
+
+def test_piped_text_ui_end_of_input(provider_factory, translations):
+    """
+    Test that the game is interrupted when the guesses run out
+    """
+    provider = provider_factory({"hello": "hola", "goodbye": "adiós"})
+    output = io.StringIO()
+    game_ui = PipedTextUi(translations, io.StringIO("hola"), output_stream=output)
+    engine = Engine(game_ui=game_ui, provider=provider)
+    try:
+        engine.play()
+    except EOFError:
+        engine.game_interrupted()
+    assert engine.guessed_count == 1
+    assert output.getvalue().endswith("out of 1.\n")
@@ -0,0 +1,79 @@
+"""
+Tests of the answer hints
+"""
+from flashcards.cursesui.cursesui import CursesUi
+from flashcards.hints import AnswerIndex
+
+ANSWERS = ["apple pie", "Apple tart", "apricot", "banana", "APPLE PIE", "cherry"]
+
+
+def test_candidates():
+    """
+    Check the answers found for a prefix, whatever its case
+    """
+    index = AnswerIndex(ANSWERS)
+    assert len(index) == 5
+    assert index.candidates("ap", limit=10) == ["apple pie", "Apple tart", "apricot"]
+    assert index.candidates("  APP", limit=1) == ["apple pie"]
+    assert index.candidates("apple ", limit=10) == ["apple pie", "Apple tart"]
+    assert not index.candidates("apples", limit=10)
+    assert index.count("a") == 3
+    assert index.count("") == 5
+    assert index.count("z") == 0
+
+
+def test_completion():
+    """
+    Check that the completion is what all the answers starting with the text
+    have in common
+    """
+    index = AnswerIndex(ANSWERS)
+    assert index.completion("Ap") == ""
+    assert index.completion("App") == "le "
+    assert index.completion("apple t") == "art"
+    assert index.completion("b") == "anana"
+    assert index.completion("banana") == ""
+    assert index.completion("x") == ""
+    assert AnswerIndex([]).completion("a") == ""
+
+
+def test_add():
+    """
+    Check that the answers added to the index are found like the others
+    """
+    index = AnswerIndex(ANSWERS)
+    index.add(["Apricot jam", "APPLE tart", "date"])
+    assert len(index) == 7
+    assert index.candidates("apr", limit=10) == ["apricot", "Apricot jam"]
+    assert index.candidates("apple t", limit=10) == ["Apple tart"]
+    assert index.completion("d") == "ate"
+
+
+def test_curses_hints(translations, virtual_screen, monkeypatch):
+    """
+    Check that tab completes the guess, and that the candidates are shown
+    under the input as it's typed
+    """
+    curses_ui = CursesUi(translations, virtual_screen, hints="candidates")
+    curses_ui.prepare({"pie": "apple pie", "tart": "apple tart", "fruit": "apricot"})
+    curses_ui.display_flashcard(index=1, total=3, flashcard="tart", max_key_length=5)
+    virtual_screen.type_keys("Ap")
+    virtual_screen.pause(1)
+    virtual_screen.type_keys("p\tt\t\n")
+    hints_line = 24 // 2 + 4
+    # The hints on the screen each time the user is about to press a key
+    screens = []
+    getch = virtual_screen.getch
+
+    def record_hints(delay: int = -1) -> int:
+        screens.append(virtual_screen.lines()[hints_line].strip())
+        return getch(delay)
+
+    monkeypatch.setattr(virtual_screen, "getch", record_hints)
+    guess = curses_ui.input_guess("tart", max_answer_length=10)
+    assert guess.strip() == "Apple tart"
+    assert "apple pie   apple tart   apricot" in screens
+    assert "apple pie   apple tart" in screens
+    assert "apple tart" in screens
+    # The candidates are hidden once the guess is sent
+    assert not virtual_screen.lines()[hints_line].strip()
@@ -0,0 +1,76 @@
+"""
+Tests for checking csv files of flashcards
+"""
+import pytest
+
+from flashcards.lint import lint, main
+
+INPUT_TEXT = """hello,bonjour
+goodbye,au revoir
+short
+
+"poem","roses
+are red"
+hello,salut
+empty,
+,no key
+"""
+
+
+@pytest.mark.parametrize("chunk_size, jobs", [(1024, None), (10, 1), (10, 2)])
+def test_lint(tmp_path, chunk_size, jobs):
+    """
+    Check that the problems are reported with their line numbers, whether the
+    file is checked in one or several chunks
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_bytes(INPUT_TEXT.encode("utf-8") + b"bad,\xff\n")
+    report = lint(str(input_file), jobs=jobs, chunk_size=chunk_size)
+    assert report.rows == 9
+    assert [(issue.line, issue.kind) for issue in report.issues] == [
+        (3, "malformed"),
+        (4, "malformed"),
+        (7, "duplicate_key"),
+        (8, "empty_answer"),
+        (9, "empty_key"),
+        (10, "encoding"),
+    ]
+    assert report.issues[2].message == "hello: also on line 1"
+
+
+def test_width_outlier(tmp_path):
+    """
+    Check that answers much wider than the others are reported
+    """
+    rows = [f"key{index},answer{index}" for index in range(200)]
+    rows[150] = "key150," + "very long answer " * 10
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("\n".join(rows), encoding="utf-8")
+    report = lint(str(input_file), jobs=2, chunk_size=500)
+    assert [(issue.line, issue.kind) for issue in report.issues] == [
+        (151, "width_outlier")
+    ]
+
+
+def test_many_width_outliers(tmp_path):
+    """
+    Check that every answer much wider than the others is reported, however
+    many there are in a chunk
+    """
+    rows = [f"key{index},answer{index}" for index in range(5000)]
+    for index in range(0, 5000, 100):
+        rows[index] = f"key{index}," + "very long answer " * 10
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("\n".join(rows), encoding="utf-8")
+    report = lint(str(input_file), jobs=1)
+    assert [issue.line for issue in report.issues] == list(range(1, 5001, 100))
+
+
+def test_missing_file(tmp_path, capsys):
+    """
+    Check that a missing file is reported as a usage error
+    """
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path / "missing.csv")])
+    assert exit_info.value.code == 2
+    assert "missing.csv" in capsys.readouterr().err
@@ -0,0 +1,151 @@
+"""
+Tests of the pre-forked server
+"""
+import re
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from flashcards.server import MAX_STARTUP_FAILURES, play_session
+from flashcards.shareddeck import SharedDeck, SharedDeckProvider
+from tests.fakes import FakeFlashcardProvider
+
+
+def test_shared_deck():
+    """
+    Check that the packed flashcards can be read like a dict
+    """
+    flashcards = {"hello": "hola", "goodbye": "adiós", "猫": "gato", "": "nada"}
+    deck = SharedDeck(flashcards)
+    assert len(deck) == 4
+    assert dict(deck) == flashcards
+    with pytest.raises(KeyError):
+        _ = deck["hell"]
+    with pytest.raises(KeyError):
+        _ = deck["zzz"]
+
+
+def test_shared_deck_dealer():
+    """
+    Check that every card of the shared deck is dealt once
+    """
+    flashcards = {f"key {index}": f"answer {index}" for index in range(100)}
+    provider = SharedDeckProvider.pack(FakeFlashcardProvider(flashcards))
+    assert provider.max_lengths() == (len("key 10"), len("answer 10"))
+    dealer = provider.dealer(provider.flashcards())
+    dealt = [dealer.next_key() for _ in range(len(flashcards))]
+    assert dealer.next_key() is None
+    assert sorted(dealt) == sorted(flashcards)
+
+
+def _play(connection: socket.socket, guesses: list[str]) -> list[str]:
+    reader = connection.makefile("r", encoding="utf-8")
+    writer = connection.makefile("w", encoding="utf-8")
+    lines = []
+    for guess in guesses:
+        lines += [reader.readline(), reader.readline()]
+        writer.write(f"{guess}\n")
+        writer.flush()
+    connection.shutdown(socket.SHUT_WR)
+    lines += reader.readlines()
+    return [line.rstrip("\n") for line in lines]
+
+
+def test_play_session(translations):
+    """
+    Check that a game is played over a connection, and that the output is sent
+    when the client has to answer
+    """
+    server_connection, client_connection = socket.socketpair()
+    provider = FakeFlashcardProvider({"hello": "hola"})
+
+    def _serve():
+        with server_connection:
+            play_session(server_connection, provider, translations, timeout=5)
+
+    server = threading.Thread(target=_serve)
+    server.start()
+    with client_connection:
+        lines = _play(client_connection, ["hola"])
+    server.join()
+    assert lines == ["1 of 1", "hello", "Correct! 👏", "Correctly guessed 1 out of 1."]
+
+
+def test_play_session_invalid_text(translations):
+    """
+    Check that a client sending text which isn't utf-8 only ends its own game
+    """
+    server_connection, client_connection = socket.socketpair()
+    provider = FakeFlashcardProvider({"hello": "hola"})
+    with client_connection:
+        client_connection.sendall(b"\xff\xfe\n")
+        with server_connection:
+            play_session(server_connection, provider, translations, timeout=5)
+
+
+@pytest.mark.parametrize("reuse_port", [False, True])
+def test_prefork_server(tmp_path, reuse_port):
+    """
+    Check that the workers serve the games, and stop with the server
+    """
+    deck_path = tmp_path / "deck.csv"
+    deck_path.write_text("hello,hola\n", encoding="utf-8")
+    command = [sys.executable, "-m", "flashcards", "serve", str(deck_path)]
+    command += ["--port", "0", "--workers", "2"]
+    if reuse_port:
+        command.append("--reuse-port")
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as server:
+        try:
+            port = int(re.search(r":(\d+) ", server.stdout.readline()).group(1))
+            for _ in range(4):
+                with socket.create_connection(("127.0.0.1", port)) as connection:
+                    assert _play(connection, ["adios"])[:3] == [
+                        "1 of 1",
+                        "hello",
+                        "Wrong answer 😭. The right answer is hola",
+                    ]
+        finally:
+            server.terminate()
+        assert server.wait(timeout=5) == 0
+
+
+def test_serve_invalid_deck(tmp_path):
+    """
+    Check that a deck which can't be read is reported before forking workers
+    """
+    deck_path = tmp_path / "deck.db"
+    deck_path.write_text("not a database", encoding="utf-8")
+    for path in (deck_path, tmp_path / "missing.csv"):
+        command = [sys.executable, "-m", "flashcards", "serve", str(path)]
+        result = subprocess.run(
+            command, capture_output=True, text=True, timeout=10, check=False
+        )
+        assert result.returncode == 2
+        assert f"Can't load {path}" in result.stderr
+
+
+def test_prefork_server_failing_workers():
+    """
+    Check that the server stops when its workers keep dying as they start
+    """
+    script = (
+        "import socket\n"
+        "from flashcards.server import PreforkServer\n"
+        "def fail():\n"
+        "    raise RuntimeError('broken deck')\n"
+        "server = PreforkServer(socket.socket(), fail, None, workers=2)\n"
+        "server.serve_forever()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=False,
+    )
+    assert result.returncode == 1
+    assert "workers in a row failed to start" in result.stderr
+    assert result.stderr.count("broken deck") >= MAX_STARTUP_FAILURES
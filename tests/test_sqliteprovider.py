@@ -0,0 +1,104 @@
+"""
+Tests for the sqlite flashcard provider
+"""
+import sqlite3
+
+import pytest
+
+from flashcards.convert import convert
+from flashcards.filteredprovider import FilteredFlashcardProvider
+from flashcards.sqliteprovider import SqliteFlashcardProvider, write_sqlite_deck
+
+
+def test_sqlite_provider(tmp_path):
+    """
+    Check that we are able to read flashcards from a sqlite database, even after
+    other tools removed some of them
+    """
+    database_path = tmp_path / "deck.db"
+    write_sqlite_deck(
+        database_path,
+        [("hello", "bonjour"), ("goodbye", "au revoir"), ("cold", "froid")],
+    )
+    write_sqlite_deck(database_path, [("hello", "salut"), ("yes", "oui")])
+    with sqlite3.connect(database_path) as connection:
+        connection.execute("DELETE FROM cards WHERE key = 'cold'")
+    connection.close()
+
+    provider = SqliteFlashcardProvider(database_path)
+    flashcards = provider.flashcards()
+    assert len(flashcards) == 3
+    assert flashcards["hello"] == "salut"
+    assert "cold" not in flashcards
+    assert provider.max_lengths() == (7, 9)
+
+    dealer = provider.dealer(flashcards)
+    keys = [dealer.next_key() for _ in range(len(dealer))]
+    assert sorted(keys) == ["goodbye", "hello", "yes"]
+    assert dealer.next_key() is None
+
+
+def test_sqlite_engine_score(tmp_path, play_game):
+    """
+    Test that the engine calculates the expected score with a sqlite deck
+    converted from a csv file
+    """
+    csv_path = tmp_path / "deck.csv"
+    csv_path.write_text("hello,hola\ngoodbye,adiós\ncold,frío\n", encoding="utf-8")
+    database_path = tmp_path / "deck.sqlite"
+    convert(str(csv_path), str(database_path))
+
+    provider = SqliteFlashcardProvider(database_path)
+    guesses = {"hello": "hola", "goodbye": "au revoir", "cold": "frío"}
+    assert play_game(provider, guesses) == (2, 3)
+
+    convert(str(database_path), str(tmp_path / "copy.csv"))
+    assert (tmp_path / "copy.csv").read_text(encoding="utf-8").splitlines() == [
+        "hello,hola",
+        "goodbye,adiós",
+        "cold,frío",
+    ]
+
+
+def test_invalid_database(tmp_path):
+    """
+    Check that files which aren't flashcards databases are reported
+    """
+    not_database = tmp_path / "text.db"
+    not_database.write_text("hello,hola\n", encoding="utf-8")
+    other_database = tmp_path / "other.db"
+    with sqlite3.connect(other_database) as connection:
+        connection.execute("CREATE TABLE notes (text TEXT)")
+    connection.close()
+    for database_path in (not_database, other_database, tmp_path / "missing.db"):
+        with pytest.raises(ValueError, match="Invalid sqlite deck"):
+            SqliteFlashcardProvider(str(database_path))
+
+
+def test_sqlite_tags(tmp_path):
+    """
+    Check that the tags of a csv deck, and the deck given to convert, are
+    stored in the database, filter the flashcards, and convert back to csv
+    """
+    csv_path = tmp_path / "deck.csv"
+    csv_path.write_text(
+        "hello,hola,greeting\ngoodbye,adiós,greeting,polite\ncold,frío\n",
+        encoding="utf-8",
+    )
+    database_path = tmp_path / "deck.db"
+    convert(str(csv_path), str(database_path), deck="chapter3")
+
+    provider = SqliteFlashcardProvider(str(database_path))
+    assert provider.tag_index().tags == ["chapter3", "greeting", "polite"]
+    filtered = FilteredFlashcardProvider(provider, "chapter3 and not polite")
+    assert filtered.flashcards() == {"hello": "hola", "cold": "frío"}
+    provider.close()
+
+    # The tags of the cards added again are replaced
+    write_sqlite_deck(database_path, [("hello", "hola")], tags={"hello": ["formal"]})
+    convert(str(database_path), str(tmp_path / "copy.csv"))
+    assert (tmp_path / "copy.csv").read_text(encoding="utf-8").splitlines() == [
+        "hello,hola,chapter3,formal",
+        "goodbye,adiós,chapter3,greeting,polite",
+        "cold,frío,chapter3",
+    ]
@@ -0,0 +1,103 @@
+"""
+Tests for selecting flashcards by their tags
+"""
+import pytest
+
+from flashcards.csvprovider import CsvFlashcardProvider
+from flashcards.filteredprovider import FilteredFlashcardProvider
+from flashcards.tags import FilterSyntaxError, TagIndex
+
+
+@pytest.fixture(name="tag_index")
+def fixture_tag_index() -> TagIndex:
+    """
+    :return: a tag index of a few french verbs
+    """
+    return TagIndex(
+        keys=["être", "avoir", "aller", "parler", "finir"],
+        tags={
+            "être": ["irregular", "chapter 1", "mastered"],
+            "avoir": ["irregular", "chapter 1"],
+            "aller": ["irregular", "chapter3"],
+            "parler": ["chapter3"],
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("irregular", ["être", "avoir", "aller"]),
+        ("irregular and not mastered", ["avoir", "aller"]),
+        ('"chapter 1" or chapter3', ["être", "avoir", "aller", "parler"]),
+        ("NOT (irregular OR chapter3)", ["finir"]),
+        ("not irregular and not chapter3", ["finir"]),
+        ("irregular and chapter3 or mastered", ["être", "aller"]),
+        ("unknown", []),
+        ("not unknown", ["être", "avoir", "aller", "parler", "finir"]),
+    ],
+)
+def test_select(tag_index, expression, expected):
+    """
+    Check the evaluation of filter expressions
+    """
+    assert tag_index.select(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression", ["", "irregular and", "(irregular", "irregular)", "not", "and"]
+)
+def test_invalid_filter(tag_index, expression):
+    """
+    Check that invalid filter expressions are reported
+    """
+    with pytest.raises(FilterSyntaxError):
+        tag_index.select(expression)
+
+
+def test_filtered_provider(tmp_path):
+    """
+    Check that only the flashcards matching the filter are provided
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text(
+        "être,essere,irregular,mastered\navoir,avere,irregular\nparler,parlare\n",
+        encoding="utf-8",
+    )
+    with open(input_file, encoding="utf-8") as csv_file:
+        provider = CsvFlashcardProvider(csv_file)
+    assert provider.tag_index().tags == ["irregular", "mastered"]
+    filtered = FilteredFlashcardProvider(provider, "not mastered")
+    assert filtered.flashcards() == {"avoir": "avere", "parler": "parlare"}
+
+
+class _CountingList(list):
+    """
+    A list counting how many of its items are read
+    """
+
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+    def __iter__(self):
+        self.reads += len(self)
+        return super().__iter__()
+
+
+def test_large_deck():
+    """
+    Check that selecting a subset of a large deck doesn't scan the flashcards
+    """
+    keys = _CountingList(str(ordinal) for ordinal in range(200_000))
+    tags = {key: ["even" if int(key) % 2 == 0 else "odd"] for key in keys}
+    tags.update({key: tags[key] + ["chapter3"] for key in keys[1000:2000]})
+    tag_index = TagIndex(keys, tags)
+
+    keys.reads = 0
+    selected = tag_index.select("chapter3 and not odd")
+    # Only the selected keys are read
+    assert keys.reads == len(selected)
+    assert selected == keys[1000:2000:2]
@@ -0,0 +1,157 @@
+"""
+Render cost tests of the curses ui, drawn on an in-memory screen
+"""
+import curses
+
+import pytest
+
+from flashcards.cursesui.cursesui import RESIZE_REDRAW_DELAY, CursesUi
+from flashcards.engine import Engine
+
+
+@pytest.fixture(name="curses_ui")
+def fixture_curses_ui(translations, virtual_screen) -> CursesUi:
+    """
+    :return: a curses ui drawn on the virtual screen, after its initial frame
+    """
+    curses_ui = CursesUi(translations, virtual_screen)
+    virtual_screen.reset_stats()
+    return curses_ui
+
+
+def _find(screen, text: str) -> tuple[int, int]:
+    for row, line in enumerate(screen.lines()):
+        if text in line:
+            return row, line.index(text)
+    raise AssertionError(f"{text} is not displayed")
+
+
+def test_virtual_curses_engine_score(
+    provider_factory, curses_ui_factory, virtual_screen
+):
+    """
+    Test that the engine calculates the expected score with a curses ui,
+    without a terminal
+    """
+    provider = provider_factory({"hello": "hola", "goodbye": "adiós", "cold": "frío"})
+    game_ui = curses_ui_factory(
+        guesses={"hello": "hola", "goodbye": "au revoir", "cold": "frío"},
+        screen=virtual_screen,
+    )
+    engine = Engine(game_ui=game_ui, provider=provider)
+    engine.play()
+    assert game_ui.guessed_count == 3
+    assert game_ui.correct_count == 2
+
+
+def test_display_flashcard_cost(curses_ui, virtual_screen):
+    """
+    Check the cost of displaying a flashcard
+    """
+    curses_ui.display_flashcard(index=1, total=3, flashcard="hello", max_key_length=7)
+    assert _find(virtual_screen, "hello") == (9, 37)
+    assert _find(virtual_screen, "1 of 3") == (23, 73)
+    stats = virtual_screen.total_stats()
+    assert stats.refreshes <= 6
+    assert stats.cells_written <= 200
+    assert stats.bytes_emitted <= 400
+
+
+def test_resize_storm_cost(curses_ui, virtual_screen):
+    """
+    Check that a burst of resizes redraws the widgets once, at their new
+    position, when the terminal stops changing size
+    """
+    curses_ui.display_flashcard(index=1, total=3, flashcard="hello", max_key_length=7)
+    typed = "hola"
+    sizes = range(30, 40)
+    virtual_screen.type_keys(typed)
+    for lines in sizes:
+        virtual_screen.resize(lines, 100)
+    virtual_screen.pause(RESIZE_REDRAW_DELAY * 2)
+    virtual_screen.type_keys("\n")
+    assert curses_ui.input_guess("hello", max_answer_length=7).strip() == "hola"
+
+    assert _find(virtual_screen, "hello") == (39 // 2 - 3, 47)
+    assert _find(virtual_screen, "hola") == (39 // 2 + 2, 46)
+    # The first frame is drawn before reading a key, the next ones each after
+    # reading a key: the typed keys, the resizes, then the end of the pause
+    first_resize = 1 + len(typed)
+    resize_frames = virtual_screen.frames[first_resize : first_resize + len(sizes)]
+    for frame in resize_frames:
+        assert frame.refreshes <= 1
+    redraw_frame = virtual_screen.frames[first_resize + len(sizes)]
+    assert redraw_frame.refreshes <= 18
+    assert redraw_frame.cells_written <= 2 * 40 * 100
+
+
+def test_clock(curses_ui, virtual_screen, monkeypatch):
+    """
+    Check that the status bar shows the time played, updated while waiting
+    for the user
+    """
+    curses_ui.display_flashcard(index=1, total=3, flashcard="hello", max_key_length=7)
+    virtual_screen.type_keys("ho")
+    virtual_screen.pause(61.5)
+    # The cursor each time the ui waits for a key or for the clock to tick
+    cursor_positions = []
+    getch = virtual_screen.getch
+
+    def record_cursor(delay: int = -1) -> int:
+        cursor_positions.append(virtual_screen.cursor)
+        return getch(delay)
+
+    monkeypatch.setattr(virtual_screen, "getch", record_cursor)
+    virtual_screen.type_keys("la\n")
+    curses_ui.input_guess("hello", max_answer_length=7)
+    assert virtual_screen.lines()[-1].startswith(" 1:01 ")
+    # The cursor stays in the input while the clock ticks
+    input_line = 24 // 2 + 2
+    assert {line for line, _ in cursor_positions} == {input_line}
+    assert cursor_positions[-1] == (input_line, 40)
+    # The bar is only redrawn when the clock changes
+    assert virtual_screen.total_stats().refreshes < 61 * 6
+
+
+def test_time_limit(translations, virtual_screen):
+    """
+    Check that the input ends with what was typed when the time is up
+    """
+    curses_ui = CursesUi(translations, virtual_screen, time_limit=5)
+    curses_ui.display_flashcard(index=1, total=3, flashcard="hello", max_key_length=7)
+    virtual_screen.type_keys("ho")
+    virtual_screen.pause(2.5)
+    virtual_screen.type_keys("l")
+    virtual_screen.pause(10)
+    virtual_screen.type_keys("a\n")
+    assert curses_ui.input_guess("hello", max_answer_length=7).strip() == "hol"
+    assert virtual_screen.monotonic() == 5
+    # Back to the time played once the flashcard is answered
+    assert virtual_screen.lines()[-1].startswith(" 0:05 ")
+
+
+def test_replay_prompt_cost(curses_ui, virtual_screen):
+    """
+    Check the cost of asking to replay the missed cards
+    """
+    curses_ui.display_score(correct_count=1, guessed_count=2)
+    virtual_screen.reset_stats()
+    virtual_screen.type_keys("n")
+    assert not curses_ui.input_replay_missed_cards()
+    prompt_frame, answer_frame = virtual_screen.frames
+    # The prompt and the score are hidden once the user answered
+    assert "Replay" not in "".join(virtual_screen.lines())
+    assert "Correctly guessed" not in "".join(virtual_screen.lines())
+    assert prompt_frame.refreshes <= 8
+    assert answer_frame.refreshes <= 3
+
+
+def test_bottom_right_corner(virtual_screen):
+    """
+    Like curses, writing to the bottom right corner of a window is an error,
+    but the character is written
+    """
+    win = virtual_screen.newwin(1, 3)
+    with pytest.raises(curses.error):
+        win.addstr(0, 0, "abc")
+    assert win.instr(0, 0) == b"abc"
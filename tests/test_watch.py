@@ -0,0 +1,159 @@
+"""
+Tests for picking up changes to the flashcards file during a game
+"""
+from flashcards.csvprovider import WatchingCsvFlashcardProvider
+from flashcards.engine import Engine
+from tests.fakes import FakeUi
+
+
+def _make_provider(input_file) -> WatchingCsvFlashcardProvider:
+    # pylint: disable=consider-using-with
+    return WatchingCsvFlashcardProvider(open(input_file, encoding="utf-8"))
+
+
+def test_poll_changes(tmp_path):
+    """
+    Check that only the added, updated and removed rows are reported
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("hello,bonjour\ngoodbye,au revoir\ncold,froid\n")
+    provider = _make_provider(input_file)
+    assert provider.poll_changes() is None
+
+    input_file.write_text("hello,salut\ncold,froid\nhot,chaud\nyes,oui\n")
+    changes = provider.poll_changes()
+    assert changes.added == {"hot": "chaud", "yes": "oui"}
+    assert changes.updated == {"hello": "salut"}
+    assert changes.removed == {"goodbye"}
+    assert provider.flashcards() == {
+        "hello": "salut",
+        "cold": "froid",
+        "hot": "chaud",
+        "yes": "oui",
+    }
+    assert provider.poll_changes() is None
+
+
+def test_poll_changes_duplicate_key(tmp_path):
+    """
+    Check that when a key is on several rows and some are removed, the answer
+    is the one of the last row left, and that the flashcards returned before
+    don't change
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("hello,bonjour\ncold,froid\nhello,salut\n")
+    provider = _make_provider(input_file)
+    flashcards = provider.flashcards()
+    assert flashcards == {"hello": "salut", "cold": "froid"}
+
+    input_file.write_text("hello,bonjour\ncold,froid\n")
+    changes = provider.poll_changes()
+    assert changes.updated == {"hello": "bonjour"}
+    assert not changes.added and not changes.removed
+    assert provider.flashcards() == {"hello": "bonjour", "cold": "froid"}
+    assert flashcards == {"hello": "salut", "cold": "froid"}
+
+    input_file.write_text("hello,bonjour\ncold,froid\nhello,salut\nhello,allo\n")
+    changes = provider.poll_changes()
+    assert changes.updated == {"hello": "allo"}
+    input_file.write_text("cold,froid\nhello,salut\n")
+    changes = provider.poll_changes()
+    assert changes.updated == {"hello": "salut"}
+    assert not changes.removed
+    assert provider.flashcards() == {"hello": "salut", "cold": "froid"}
+
+
+def test_poll_changes_multiline_field(tmp_path):
+    """
+    Check that changes to quoted fields spanning several lines are detected
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text('hello,bonjour\npoem,"roses\nare red"\n')
+    provider = _make_provider(input_file)
+
+    input_file.write_text('hello,bonjour\npoem,"violets\nare blue"\n')
+    changes = provider.poll_changes()
+    assert not changes.added
+    assert changes.updated == {"poem": "violets\nare blue"}
+    assert not changes.removed
+
+
+class _EditingUi(FakeUi):
+    """
+    Ui which rewrites the flashcards file after the first guess
+    """
+
+    def __init__(self, guesses: dict[str, str], input_file, new_text: str):
+        super().__init__(guesses)
+        self.input_file = input_file
+        self.new_text = new_text
+        self.displayed = []
+        self.added = {}
+        self.offered = {}
+
+    def display_flashcard(
+        self, index: int, total: int, flashcard: str, max_key_length: int
+    ):
+        self.displayed.append((index, total, flashcard))
+
+    def _edit(self):
+        if self.new_text:
+            self.input_file.write_text(self.new_text)
+            self.new_text = None
+
+    def input_guess(self, flashcard: str, max_answer_length: int) -> str:
+        self._edit()
+        return super().input_guess(flashcard, max_answer_length)
+
+    def input_choice(self, flashcard: str, choices: list[str]) -> str:
+        self._edit()
+        self.offered[flashcard] = set(choices)
+        return super().input_choice(flashcard, choices)
+
+    def add_flashcards(self, flashcards):
+        self.added.update(flashcards)
+
+
+def test_engine_picks_up_changes(tmp_path):
+    """
+    Check that cards added or removed during the game are played or skipped
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("hello,bonjour\ngoodbye,au revoir\n")
+    provider = _make_provider(input_file)
+    guesses = {"hello": "bonjour", "goodbye": "au revoir", "hot": "chaud"}
+    game_ui = _EditingUi(guesses, input_file, "hello,bonjour\nhot,chaud\n")
+    engine = Engine(game_ui=game_ui, provider=provider)
+    engine.play()
+
+    first_card = game_ui.displayed[0][2]
+    if first_card == "hello":
+        # goodbye was removed before we got to it
+        assert game_ui.displayed == [(1, 2, "hello"), (2, 2, "hot")]
+        assert game_ui.guessed_count == 2
+    else:
+        assert game_ui.displayed in (
+            [(1, 2, "goodbye"), (2, 3, "hello"), (3, 3, "hot")],
+            [(1, 2, "goodbye"), (2, 3, "hot"), (3, 3, "hello")],
+        )
+        assert game_ui.guessed_count == 3
+    assert game_ui.correct_count == game_ui.guessed_count
+    assert game_ui.added == {"hot": "chaud"}
+
+
+def test_engine_offers_added_answers(tmp_path):
+    """
+    Check that the answers of cards added during a multiple choice game are
+    offered as wrong choices
+    """
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("hello,bonjour\n")
+    provider = _make_provider(input_file)
+    guesses = {"hello": "bonjour", "hot": "chaud", "cold": "froid"}
+    new_text = "hello,bonjour\nhot,chaud\ncold,froid\n"
+    game_ui = _EditingUi(guesses, input_file, new_text)
+    engine = Engine(game_ui=game_ui, provider=provider, choices=3)
+    engine.play()
+    assert game_ui.offered["hello"] == {"bonjour"}
+    assert game_ui.offered["hot"] == {"chaud", "bonjour", "froid"}
+    assert game_ui.offered["cold"] == {"froid", "bonjour", "chaud"}